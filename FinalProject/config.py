@@ -0,0 +1,38 @@
+import os
+
+# Яку БД використовувати: "sqlserver" (основна) або "sqlite" (вбудована, для симуляцій)
+DB_BACKEND = os.environ.get("WAREHOUSE_DB", "sqlserver")
+
+# Файл SQLite; ":memory:" — база лише в пам'яті процесу
+SQLITE_PATH = os.environ.get("WAREHOUSE_SQLITE_PATH", ":memory:")
+
+# Роботи, які створюються в новій вбудованій БД (ті ж id, що й у test.py)
+SQLITE_SEED_ROBOTS = list(range(76, 86))
+
+# Відкладений запис телеметрії роботів: інтервал (с) і кількість роботів, після якої пишемо одразу
+TELEMETRY_FLUSH_INTERVAL = 0.5
+TELEMETRY_MAX_PENDING = 64
+
+# Скільки маршрутів тримати в LRU-кеші (logic/path_cache.py)
+PATH_CACHE_SIZE = 1024
+
+# Скільки полів відстаней до точок інтересу тримати в LRU-кеші (logic/distance_fields.py).
+# Має вміщати всі точки інтересу — до 5 полів на палету (сама палета й вільні клітинки біля неї)
+DISTANCE_FIELDS_CACHE_SIZE = 4096
+
+# Ієрархічний пошук шляху (logic/hierarchy.py): розмір кластера і з якої площі складу "auto" вмикає HPA*
+HPA_CLUSTER_SIZE = 16
+HPA_MIN_CELLS = 20000
+
+# Асинхронний парк роботів (logic/runtime.py): скільки потоків виконують блокуючі кроки роботів
+FLEET_EXECUTOR_WORKERS = 16
+
+# Адмін-панель (simulation/gui_worker.py): скільки фонових потоків виконують запити до БД
+GUI_WORKERS = 2
+
+SQLSERVER_CONN_STR = (
+    "DRIVER={SQL Server};"
+    "SERVER=localhost\\MSSQLSERVER1;"
+    "DATABASE=robotic_warehouse;"
+    "Trusted_Connection=yes;"
+)
@@ -0,0 +1,190 @@
+import sqlite3
+from datetime import datetime
+
+
+class SqlServerBackend:
+    """Основна БД складу — SQL Server через pyodbc."""
+
+    name = "sqlserver"
+    pool_size = 16
+    idle_timeout = 300
+
+    def __init__(self, conn_str):
+        self.conn_str = conn_str
+        import pyodbc  # імпортуємо лише тоді, коли цей драйвер справді потрібен
+        self._pyodbc = pyodbc
+        self.errors = (pyodbc.Error,)
+
+    def connect(self):
+        return self._pyodbc.connect(self.conn_str)
+
+    def select_first(self, columns, rest):
+        """SELECT, що повертає лише перший рядок"""
+        return f"SELECT TOP 1 {columns} {rest}"
+
+    def insert_returning_ids(self, cursor, table, columns, rows):
+        """Вставити рядки та повернути їх id (у тому ж порядку)"""
+        placeholders = ", ".join(["(" + ", ".join(["?"] * len(columns)) + ")"] * len(rows))
+        params = [value for row in rows for value in row]
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) OUTPUT INSERTED.id VALUES {placeholders}",
+            params
+        )
+        return sorted(int(row[0]) for row in cursor.fetchall())
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    description TEXT
+);
+CREATE TABLE IF NOT EXISTS orders (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT,
+    status TEXT NOT NULL DEFAULT 'pending'
+);
+CREATE TABLE IF NOT EXISTS order_items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    order_id INTEGER NOT NULL REFERENCES orders(id),
+    item_id INTEGER NOT NULL REFERENCES items(id),
+    quantity INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS shelves (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    shelf_code TEXT NOT NULL UNIQUE,
+    capacity INTEGER NOT NULL DEFAULT 6,
+    status TEXT NOT NULL DEFAULT 'free',
+    current_order_id INTEGER REFERENCES orders(id),
+    x INTEGER,
+    y INTEGER
+);
+CREATE TABLE IF NOT EXISTS pallets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    label TEXT,
+    x INTEGER,
+    y INTEGER
+);
+CREATE TABLE IF NOT EXISTS robots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'idle',
+    x INTEGER NOT NULL DEFAULT 0,
+    y INTEGER NOT NULL DEFAULT 0,
+    battery REAL NOT NULL DEFAULT 100,
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS inventory (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    item_id INTEGER NOT NULL REFERENCES items(id),
+    location_type TEXT NOT NULL,
+    location_id INTEGER NOT NULL,
+    quantity INTEGER NOT NULL,
+    x INTEGER,
+    y INTEGER
+);
+CREATE INDEX IF NOT EXISTS ix_orders_status ON orders(status);
+CREATE INDEX IF NOT EXISTS ix_order_items_order ON order_items(order_id);
+CREATE INDEX IF NOT EXISTS ix_inventory_location ON inventory(location_type, location_id);
+CREATE INDEX IF NOT EXISTS ix_inventory_item ON inventory(item_id, location_type);
+CREATE INDEX IF NOT EXISTS ix_shelves_order ON shelves(current_order_id);
+"""
+
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _getdate():
+    return datetime.now().strftime(DATETIME_FORMAT)
+
+
+# datetime у параметрах зберігаємо в тому ж форматі, що й GETDATE()
+sqlite3.register_adapter(datetime, lambda value: value.strftime(DATETIME_FORMAT))
+
+
+class SqliteBackend:
+    """Вбудована БД (файл SQLite або повністю в пам'яті) з тією ж схемою.
+
+    Для ":memory:" усі потоки працюють через одне спільне з'єднання (pool_size = 1),
+    інакше кожне з'єднання бачило б свою окрему порожню базу.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path=":memory:", seed=None):
+        self.path = path
+        self.seed = seed  # функція seed(conn), що заповнює щойно створену БД
+        # Помилки SQLite не псують з'єднання, тож пул не повинен їх закривати
+        self.errors = ()
+        self.pool_size = 1 if path == ":memory:" else 8
+        self.idle_timeout = None if path == ":memory:" else 300
+        self._created = False
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        # Щоб SQL, написаний під SQL Server, працював без змін
+        conn.create_function("GETDATE", 0, _getdate)
+        conn.execute("PRAGMA foreign_keys = ON")
+        if self.path != ":memory:":
+            conn.execute("PRAGMA journal_mode = WAL")
+        if not self._created:
+            conn.executescript(SQLITE_SCHEMA)
+            if self.seed:
+                self.seed(conn)
+            self._created = True
+        return conn
+
+    def select_first(self, columns, rest):
+        """SELECT, що повертає лише перший рядок"""
+        return f"SELECT {columns} {rest} LIMIT 1"
+
+    def insert_returning_ids(self, cursor, table, columns, rows):
+        """Вставити рядки та повернути їх id (у тому ж порядку)"""
+        placeholders = ", ".join(["(" + ", ".join(["?"] * len(columns)) + ")"] * len(rows))
+        params = [value for row in rows for value in row]
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES {placeholders} RETURNING id",
+            params
+        )
+        return sorted(int(row[0]) for row in cursor.fetchall())
+
+
+def seed_demo_data(conn, shelf_coords, pallet_coords, robot_ids, items=None, pallet_stock=20, robot_positions=None):
+    """Заповнити порожню БД полицями, палетами, роботами та товарами на палетах.
+
+    robot_positions — стартові клітинки роботів (за замовчуванням колонка 18).
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM shelves")
+    if cursor.fetchone()[0]:
+        return  # БД вже заповнена
+
+    cursor.executemany(
+        "INSERT INTO shelves (shelf_code, capacity, status, x, y) VALUES (?, 6, 'free', ?, ?)",
+        [(code, x, y) for code, (x, y) in shelf_coords.items()]
+    )
+    cursor.executemany(
+        "INSERT INTO pallets (id, label, x, y) VALUES (?, ?, ?, ?)",
+        [(pallet_id, f"P{pallet_id}", x, y) for pallet_id, (x, y) in pallet_coords.items()]
+    )
+    # Роботи стоять у колонці 18 — там, куди вони повертаються без замовлень
+    robot_positions = robot_positions or [(18, 2 + i) for i in range(len(robot_ids))]
+    cursor.executemany(
+        "INSERT INTO robots (id, name, status, x, y, battery, updated_at) VALUES (?, ?, 'idle', ?, ?, 100, GETDATE())",
+        [(robot_id, f"R{robot_id}", x, y) for robot_id, (x, y) in zip(robot_ids, robot_positions)]
+    )
+
+    items = items or [f"Товар {i}" for i in range(1, 11)]
+    cursor.executemany("INSERT INTO items (name, description) VALUES (?, '')", [(name,) for name in items])
+    cursor.execute("SELECT id FROM items ORDER BY id")
+    item_ids = [row[0] for row in cursor.fetchall()]
+
+    # Кожна палета зберігає один товар
+    cursor.executemany(
+        "INSERT INTO inventory (item_id, location_type, location_id, quantity, x, y) VALUES (?, 'pallet', ?, ?, ?, ?)",
+        [
+            (item_ids[i % len(item_ids)], pallet_id, pallet_stock, x, y)
+            for i, (pallet_id, (x, y)) in enumerate(pallet_coords.items())
+        ]
+    )
+    conn.commit()
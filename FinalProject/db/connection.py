@@ -1,22 +1,210 @@
-import pyodbc
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+import config
+from db.backends import SqlServerBackend, SqliteBackend, seed_demo_data
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def _seed_demo_warehouse(conn):
+    """Заповнити вбудовану БД планом складу з simulation/warehouse_map.py"""
+    from simulation.warehouse_map import shelf_coords, pallet_coords
+    seed_demo_data(conn, shelf_coords, pallet_coords, config.SQLITE_SEED_ROBOTS)
+
+
+def create_backend(name=None):
+    """Створити драйвер БД за назвою з config.DB_BACKEND"""
+    name = name or config.DB_BACKEND
+    if name == "sqlite":
+        return SqliteBackend(config.SQLITE_PATH, seed=_seed_demo_warehouse)
+    return SqlServerBackend(config.SQLSERVER_CONN_STR)
 
-def get_connection():
-    conn_str = (
-        "DRIVER={SQL Server};"
-        "SERVER=localhost\\MSSQLSERVER1;"  
-        "DATABASE=robotic_warehouse;"
-        "Trusted_Connection=yes;"
-    )
 
+def get_backend():
+    """Поточний драйвер БД (створюється при першому зверненні)"""
+    global _backend, pool
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend()
+            pool = ConnectionPool(_backend.connect, errors=_backend.errors, max_size=_backend.pool_size,
+                                  idle_timeout=_backend.idle_timeout)
+        return _backend
+
+
+def use_backend(backend):
+    """Перемкнути всю програму на інший драйвер БД (наприклад, SqliteBackend для симуляцій)"""
+    global _backend, pool
+    with _backend_lock:
+        old_pool = pool
+        _backend = backend
+        pool = ConnectionPool(backend.connect, errors=backend.errors, max_size=backend.pool_size,
+                              idle_timeout=backend.idle_timeout)
+    if old_pool is not None:
+        old_pool.close_all()
+    return backend
+
+
+def get_connection():
     try:
         # Встановлюємо з'єднання
-        conn = pyodbc.connect(conn_str)
+        conn = get_backend().connect()
         return conn
-    
+
     except Exception as e:
         print("Помилка підключення до БД", e)
         return None
 
 
+class ConnectionPool:
+    """Обмежений пул з'єднань з БД, безпечний для використання з кількох потоків.
+
+    Потік отримує з'єднання через `with pool.connection() as conn:`; вкладені
+    блоки в тому ж потоці повторно використовують вже видане з'єднання.
+    """
+
+    def __init__(self, connect, errors=(), max_size=16, idle_timeout=300, health_check_after=30, acquire_timeout=30):
+        self._connect = connect
+        self._errors = errors  # помилки драйвера, після яких з'єднання вважається зламаним
+        self.max_size = max_size  # максимальна кількість відкритих з'єднань
+        self.idle_timeout = idle_timeout  # через скільки секунд простою з'єднання закривається (None — ніколи)
+        self.health_check_after = health_check_after  # перевіряти з'єднання, якщо воно простоювало довше
+        self.acquire_timeout = acquire_timeout  # скільки чекати на вільне з'єднання
+        self._idle = deque()  # (conn, час повернення в пул)
+        self._opened = 0
+        self._cond = threading.Condition()
+        self._local = threading.local()
+
+    def _is_alive(self, conn):
+        """Перевірити, що з'єднання ще працює"""
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, conn):
+        """Закрити з'єднання та звільнити місце в пулі"""
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._opened -= 1
+            self._cond.notify()
+
+    def _evict_idle(self, now):
+        """Закрити з'єднання, які простоювали довше за idle_timeout (викликати під self._cond)"""
+        expired = []
+        if self.idle_timeout is None:
+            return expired
+        while self._idle and now - self._idle[0][1] > self.idle_timeout:
+            expired.append(self._idle.popleft()[0])
+        self._opened -= len(expired)
+        return expired
+
+    def acquire(self):
+        """Отримати з'єднання з пулу (або відкрити нове, якщо є місце)"""
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            conn = None
+            with self._cond:
+                now = time.monotonic()
+                expired = self._evict_idle(now)
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                elif self._opened < self.max_size:
+                    self._opened += 1
+                else:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        raise TimeoutError("Немає вільних з'єднань у пулі")
+                    self._cond.wait(remaining)
+                    continue
+
+            for old in expired:
+                try:
+                    old.close()
+                except Exception:
+                    pass
+
+            if conn is None:
+                try:
+                    return self._connect()
+                except Exception:
+                    with self._cond:
+                        self._opened -= 1
+                        self._cond.notify()
+                    raise
+
+            if now - returned_at > self.health_check_after and not self._is_alive(conn):
+                self._discard(conn)
+                continue
+            return conn
+
+    def release(self, conn, broken=False):
+        """Повернути з'єднання в пул"""
+        if not broken:
+            try:
+                conn.rollback()  # не залишаємо незавершених транзакцій
+            except Exception:
+                broken = True
+        if broken:
+            self._discard(conn)
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Контекстний менеджер: з'єднання закріплюється за потоком до виходу з блоку"""
+        held = getattr(self._local, "held", None)
+        if held is not None:
+            # Вкладений виклик у тому ж потоці — використовуємо те саме з'єднання
+            conn, depth = held
+            self._local.held = (conn, depth + 1)
+            try:
+                yield conn
+            finally:
+                self._local.held = (conn, depth)
+            return
+
+        conn = self.acquire()
+        self._local.held = (conn, 1)
+        broken = False
+        try:
+            yield conn
+        except self._errors:
+            broken = True
+            raise
+        finally:
+            self._local.held = None
+            self.release(conn, broken=broken)
+
+    def close_all(self):
+        """Закрити всі вільні з'єднання (наприклад, при завершенні програми)"""
+        with self._cond:
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._opened -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+pool = None
 
 
+def db_connection():
+    """Отримати з'єднання з пулу: `with db_connection() as conn: ...`"""
+    get_backend()
+    return pool.connection()
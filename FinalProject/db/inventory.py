@@ -0,0 +1,247 @@
+import threading
+
+from db.connection import db_connection, get_backend
+
+
+class InventoryIndex:
+    """Залишки товарів на палетах у пам'яті процесу, із записом у БД одразу (write-through).
+
+    Рядки inventory з location_type = 'pallet' завантажуються одним запитом
+    при першому зверненні (і заново після перемикання драйвера БД або
+    invalidate()). Далі пошук палети з товаром — це звернення до словника.
+    Усі зміни залишків на палетах мають іти через take(), put_back() або
+    reserve_many() / write_taken_many() / apply_taken(),
+    тоді індекс і БД не розходяться.
+
+    Робот може зарезервувати частину залишку (reserve), поки їде до палети:
+    для інших роботів available() цю частину вже не показує.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._backend = None  # драйвер БД, з якого завантажено індекс
+        self._rows = {}  # id рядка inventory: [item_id, pallet_id, кількість, x, y]
+        self._by_item = {}  # item_id: {id рядка, ...}
+        self._reserved = {}  # id рядка: {власник: кількість}
+
+    def _ensure_loaded(self):
+        """Завантажити індекс, якщо його ще немає або змінився драйвер БД (викликати під self._lock)"""
+        backend = get_backend()
+        if self._backend is backend:
+            return
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT i.id, i.item_id, i.location_id, i.quantity, p.x, p.y
+                FROM inventory i
+                JOIN pallets p ON i.location_id = p.id
+                WHERE i.location_type = 'pallet'
+            """)
+            rows = cursor.fetchall()
+        self._rows = {}
+        self._by_item = {}
+        self._reserved = {}
+        for row_id, item_id, pallet_id, quantity, x, y in rows:
+            self._rows[row_id] = [item_id, pallet_id, quantity, x, y]
+            self._by_item.setdefault(item_id, set()).add(row_id)
+        self._backend = backend
+
+    def invalidate(self):
+        """Забути індекс — наступне звернення перечитає залишки з БД (після змін в обхід індексу)"""
+        with self._lock:
+            self._backend = None
+
+    def _available(self, row_id, owner=None):
+        """Залишок рядка без чужих резервувань (викликати під self._lock)"""
+        reserved = self._reserved.get(row_id)
+        quantity = self._rows[row_id][2]
+        if reserved:
+            quantity -= sum(amount for holder, amount in reserved.items() if holder != owner)
+        return quantity
+
+    def pallets(self, item_id, min_quantity=1, owner=None):
+        """Палети з товаром: [(pallet_id, доступна кількість, x, y)], лише де доступно не менше min_quantity"""
+        with self._lock:
+            self._ensure_loaded()
+            result = []
+            for row_id in self._by_item.get(item_id, ()):
+                available = self._available(row_id, owner)
+                if available >= min_quantity:
+                    _, pallet_id, _, x, y = self._rows[row_id]
+                    result.append((pallet_id, available, x, y))
+            result.sort()
+            return result
+
+    def item_cells(self):
+        """Клітинки палет для кожного товару, що є в наявності: {item_id: [(x, y), ...]}"""
+        with self._lock:
+            self._ensure_loaded()
+            cells = {}
+            for row_id, (item_id, _, _, x, y) in self._rows.items():
+                if self._available(row_id) > 0:
+                    cells.setdefault(item_id, []).append((x, y))
+            return cells
+
+    def pallet_totals(self):
+        """Скільки одиниць товару лежить на кожній палеті: {pallet_id: кількість} (палети без товару відсутні)"""
+        with self._lock:
+            self._ensure_loaded()
+            totals = {}
+            for _, pallet_id, quantity, _, _ in self._rows.values():
+                totals[pallet_id] = totals.get(pallet_id, 0) + quantity
+            return totals
+
+    def _row_for(self, pallet_id, item_id):
+        for row_id in self._by_item.get(item_id, ()):
+            if self._rows[row_id][1] == pallet_id:
+                return row_id
+        return None
+
+    def reserve(self, owner, pallet_id, item_id, quantity):
+        """Зарезервувати за owner до quantity одиниць товару на палеті; повертає скільки вдалося"""
+        with self._lock:
+            self._ensure_loaded()
+            row_id = self._row_for(pallet_id, item_id)
+            if row_id is None:
+                return 0
+            reserved = self._reserved.setdefault(row_id, {})
+            amount = max(0, min(quantity, self._available(row_id, owner)))
+            if amount:
+                reserved[owner] = amount
+            else:
+                reserved.pop(owner, None)
+            return amount
+
+    def release(self, owner):
+        """Зняти всі резервування owner (наприклад, якщо робот не доїхав)"""
+        with self._lock:
+            for row_id in list(self._reserved):
+                reserved = self._reserved[row_id]
+                reserved.pop(owner, None)
+                if not reserved:
+                    del self._reserved[row_id]
+
+    def take(self, pallet_id, item_id, quantity, owner=None, cursor=None):
+        """Забрати з палети до quantity одиниць (з урахуванням резерву owner); повертає скільки взято.
+
+        Індекс змінюється під self._lock, запис у БД — уже поза ним. З cursor
+        списання пишеться в транзакцію викликача (commit — за ним, при rollback —
+        invalidate()); без cursor — окремою транзакцією з пулу.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            row_id = self._row_for(pallet_id, item_id)
+            if row_id is None:
+                return 0
+            take = max(0, min(quantity, self._available(row_id, owner)))
+            reserved = self._reserved.get(row_id)
+            if reserved is not None:
+                reserved.pop(owner, None)
+                if not reserved:
+                    del self._reserved[row_id]
+            if take:
+                self._apply(row_id, take)
+        if not take:
+            return 0
+        try:
+            if cursor is not None:
+                self.write_taken_many(cursor, [(row_id, take)])
+            else:
+                with db_connection() as conn:
+                    self.write_taken_many(conn.cursor(), [(row_id, take)])
+                    conn.commit()
+        except Exception:
+            self.invalidate()  # індекс уже списав — перечитаємо залишки з БД
+            raise
+        return take
+
+    def put_back(self, pallet_id, item_id, quantity, x, y):
+        """Повернути на палету (x, y) quantity одиниць товару — наприклад, з рейсу, що не вдався"""
+        if quantity <= 0:
+            return
+        with self._lock:
+            self._ensure_loaded()
+            row_id = self._row_for(pallet_id, item_id)
+            if row_id is not None:
+                self._rows[row_id][2] += quantity
+        try:
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                if row_id is not None:
+                    cursor.execute("UPDATE inventory SET quantity = quantity + ? WHERE id = ?", (quantity, row_id))
+                else:
+                    # Рядок видалили, коли палета спорожніла, — створюємо заново
+                    new_id = get_backend().insert_returning_ids(
+                        cursor, "inventory", ("item_id", "location_type", "location_id", "quantity", "x", "y"),
+                        [(item_id, 'pallet', pallet_id, quantity, x, y)]
+                    )[0]
+                conn.commit()
+        except Exception:
+            self.invalidate()
+            raise
+        if row_id is None:
+            with self._lock:
+                if self._backend is not None:
+                    self._rows[new_id] = [item_id, pallet_id, quantity, x, y]
+                    self._by_item.setdefault(item_id, set()).add(new_id)
+
+    def reserve_many(self, owner, wanted):
+        """Зарезервувати за owner товар для кількох рядків замовлень одразу.
+
+        wanted — [(item_id, кількість)]; кожен рядок береться з палет із
+        найбільшим доступним залишком. Повертає для кожного рядка
+        ([(id рядка inventory, кількість), ...], недостача).
+        """
+        with self._lock:
+            self._ensure_loaded()
+            plan = []
+            for item_id, quantity in wanted:
+                rows = sorted(
+                    ((self._available(row_id), row_id) for row_id in self._by_item.get(item_id, ())),
+                    key=lambda row: (-row[0], row[1]),
+                )
+                parts = []
+                for available, row_id in rows:
+                    if quantity <= 0 or available <= 0:
+                        break
+                    take = min(available, quantity)
+                    reserved = self._reserved.setdefault(row_id, {})
+                    reserved[owner] = reserved.get(owner, 0) + take
+                    parts.append((row_id, take))
+                    quantity -= take
+                plan.append((parts, quantity))
+            return plan
+
+    def write_taken_many(self, cursor, taken):
+        """Записати списання [(id рядка, кількість)] двома пакетними запитами в транзакції викликача.
+
+        В індекс — apply_taken() після commit, при rollback — release().
+        """
+        totals = {}
+        for row_id, quantity in taken:
+            totals[row_id] = totals.get(row_id, 0) + quantity
+        cursor.executemany("UPDATE inventory SET quantity = quantity - ? WHERE id = ?",
+                           [(quantity, row_id) for row_id, quantity in totals.items()])
+        cursor.executemany("DELETE FROM inventory WHERE id = ? AND quantity <= 0", [(row_id,) for row_id in totals])
+
+    def apply_taken(self, taken, owner=None):
+        """Відобразити в індексі вже закомічені списання [(id рядка, кількість)] і зняти резерв owner"""
+        with self._lock:
+            if self._backend is None:
+                return
+            for row_id, quantity in taken:
+                if row_id in self._rows:
+                    self._apply(row_id, quantity)
+        if owner is not None:
+            self.release(owner)
+
+    def _apply(self, row_id, quantity):
+        row = self._rows[row_id]
+        row[2] -= quantity
+        if row[2] <= 0:
+            del self._rows[row_id]
+            self._by_item[row[0]].discard(row_id)
+            self._reserved.pop(row_id, None)
+
+
+inventory = InventoryIndex()
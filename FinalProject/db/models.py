@@ -1,4 +1,5 @@
-import pyodbc
+from db.inventory import inventory
+from db.shelves import shelf_allocator
 
 def get_all_items(conn):
     """Отримати всі товари з таблиці items."""
@@ -96,6 +97,7 @@ def create_shelf(conn, shelf_code, capacity):
     cursor = conn.cursor()
     cursor.execute("INSERT INTO shelves (shelf_code, capacity) VALUES (?, ?)", (shelf_code, capacity))
     conn.commit()
+    shelf_allocator.invalidate()
 
 def get_all_shelves(conn):
     cursor = conn.cursor()
@@ -111,6 +113,7 @@ def delete_shelf(conn, shelf_id):
     cursor = conn.cursor()
     cursor.execute("DELETE FROM shelves WHERE id = ?", (shelf_id,))
     conn.commit()
+    shelf_allocator.invalidate()
 
 #robots
 def create_robot(conn, name):
@@ -148,6 +151,8 @@ def add_inventory_item(conn, item_id, location_type, location_id, quantity):
         VALUES (?, ?, ?, ?)
     """, (item_id, location_type, location_id, quantity))
     conn.commit()
+    if location_type == 'pallet':
+        inventory.invalidate()
 
 #Отримати всю таблицю інвентаризації
 def get_inventory(conn):
@@ -166,9 +171,11 @@ def update_inventory_quantity(conn, inventory_id, new_quantity):
     cursor = conn.cursor()
     cursor.execute("UPDATE inventory SET quantity = ? WHERE id = ?", (new_quantity, inventory_id))
     conn.commit()
+    inventory.invalidate()
 
 #Ви  далити запис (наприклад, якщо кур'єр забрав товар з полиці)
 def delete_inventory_item(conn, inventory_id):
     cursor = conn.cursor()
     cursor.execute("DELETE FROM inventory WHERE id = ?", (inventory_id,))
     conn.commit()
+    inventory.invalidate()
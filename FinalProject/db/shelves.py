@@ -0,0 +1,178 @@
+import threading
+from collections import OrderedDict
+from heapq import heapify, heappush, heappop
+
+from db.connection import db_connection, get_backend
+
+
+class ShelfAllocator:
+    """Вільні полиці в пам'яті з атомарним резервуванням.
+
+    Полиці завантажуються одним запитом при першому зверненні (і заново після
+    перемикання драйвера БД або invalidate()). Для кожної точки відліку
+    (клітинка робота; None — порядок за id) тримається купа вільних полиць
+    за відстанню від неї: купа будується при першому запиті з цієї точки,
+    далі кожне видання — O(log n) без читання БД. Купи зберігаються в LRU
+    на max_anchors точок. Звільнені полиці пишуться в спільний журнал, і купа
+    дописує їх собі лише тоді, коли з неї знову видають полицю.
+
+    allocate() одразу знімає полицю з вільних, тож двом роботам одна полиця
+    не дістанеться. Після запису в БД (полиця 'busy') власник викликає commit(),
+    якщо передумав — release(). clear_shelf і clear_orders повертають полиці
+    через free() / free_many().
+    Застарілі записи в купах (видані полиці) відкидаються при вийманні.
+    """
+
+    def __init__(self, max_anchors=512):
+        self.max_anchors = max_anchors
+        self._lock = threading.RLock()
+        self._backend = None  # драйвер БД, з якого завантажено полиці
+        self._shelves = {}  # id: (id, shelf_code, x, y) — усі полиці
+        self._free = set()  # id вільних полиць
+        self._held = {}  # id: власник — видані, але ще не записані в БД як 'busy'
+        self._heaps = OrderedDict()  # точка відліку: [купа [(ключ, id)], функція ключа, позиція в журналі]
+        self._freed = []  # журнал полиць, що знову стали вільними
+
+    def _ensure_loaded(self):
+        """Завантажити полиці, якщо їх ще немає або змінився драйвер БД (викликати під self._lock)"""
+        backend = get_backend()
+        if self._backend is backend:
+            return
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, shelf_code, status, x, y FROM shelves")
+            rows = cursor.fetchall()
+        self._shelves = {row[0]: (row[0], row[1], row[3], row[4]) for row in rows}
+        self._free = {row[0] for row in rows if row[2] == 'free'}
+        self._held = {}
+        self._heaps.clear()
+        self._freed = []
+        self._backend = backend
+
+    def invalidate(self):
+        """Забути стан полиць — наступне звернення перечитає їх з БД"""
+        with self._lock:
+            self._backend = None
+
+    def shelf(self, shelf_id):
+        """(id, shelf_code, x, y) полиці або None"""
+        with self._lock:
+            self._ensure_loaded()
+            return self._shelves.get(shelf_id)
+
+    def statuses(self):
+        """Стан усіх полиць: {shelf_code: 'free' | 'busy'} (видані, але ще не записані — вже 'busy')"""
+        with self._lock:
+            self._ensure_loaded()
+            return {code: 'free' if shelf_id in self._free else 'busy'
+                    for shelf_id, code, _, _ in self._shelves.values()}
+
+    def free_count(self):
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._free)
+
+    def _heap(self, near, distance):
+        """Купа вільних полиць для точки відліку near (викликати під self._lock)"""
+        entry = self._heaps.get(near)
+        if entry is not None:
+            self._heaps.move_to_end(near)
+            heap, key, seen = entry
+            if len(heap) + len(self._freed) - seen <= 2 * len(self._free) + 16:
+                # Дописуємо полиці, звільнені після останнього звернення до цієї купи
+                for shelf_id in self._freed[seen:]:
+                    heappush(heap, (key(self._shelves[shelf_id]), shelf_id))
+                entry[2] = len(self._freed)
+                return heap
+            # Занадто багато застарілих записів — перебудовуємо з тим самим ключем
+        elif near is None:
+            def key(shelf):
+                return shelf[0]
+        else:
+            def key(shelf):
+                return distance(near, (shelf[2], shelf[3])), shelf[0]
+        heap = [(key(self._shelves[shelf_id]), shelf_id) for shelf_id in self._free]
+        heapify(heap)
+        self._heaps[near] = [heap, key, len(self._freed)]
+        while len(self._heaps) > self.max_anchors:
+            self._heaps.popitem(last=False)
+        return heap
+
+    def allocate(self, owner, near=None, distance=None, exclude=()):
+        """Видати owner найближчу до near вільну полицю: (id, shelf_code, x, y) або None.
+
+        distance(near, (x, y)) — відстань від точки відліку до полиці; без near —
+        полиця з найменшим id. Полиці з exclude пропускаються.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            heap = self._heap(near if distance is not None else None, distance)
+            skipped = []
+            found = None
+            while heap:
+                entry = heappop(heap)
+                shelf_id = entry[1]
+                if shelf_id not in self._free:
+                    continue  # уже видана — запис застарів
+                if shelf_id in exclude:
+                    skipped.append(entry)
+                    continue
+                found = shelf_id
+                break
+            for entry in skipped:
+                heappush(heap, entry)
+            if found is None:
+                return None
+            self._free.discard(found)
+            self._held[found] = owner
+            return self._shelves[found]
+
+    def commit(self, shelf_id):
+        """Полиця записана в БД як 'busy' — резерв більше не потрібен"""
+        with self._lock:
+            self._held.pop(shelf_id, None)
+
+    def commit_owner(self, owner):
+        """Усі полиці owner записані в БД як 'busy'"""
+        with self._lock:
+            for shelf_id in [shelf_id for shelf_id, holder in self._held.items() if holder == owner]:
+                del self._held[shelf_id]
+
+    def release(self, shelf_id):
+        """Повернути видану, але не використану полицю"""
+        with self._lock:
+            if self._held.pop(shelf_id, None) is not None:
+                self._push_free(shelf_id)
+
+    def release_owner(self, owner):
+        """Повернути всі полиці, видані owner і ще не використані"""
+        with self._lock:
+            for shelf_id in [shelf_id for shelf_id, holder in self._held.items() if holder == owner]:
+                del self._held[shelf_id]
+                self._push_free(shelf_id)
+
+    def free(self, shelf_id):
+        """Полицю звільнено в БД (clear_shelf) — знову видаємо її"""
+        with self._lock:
+            if self._backend is None or shelf_id not in self._shelves:
+                return
+            self._held.pop(shelf_id, None)
+            if shelf_id not in self._free:
+                self._push_free(shelf_id)
+
+    def free_many(self, shelf_ids):
+        """Кілька полиць звільнено в БД однією транзакцією"""
+        with self._lock:
+            for shelf_id in shelf_ids:
+                self.free(shelf_id)
+
+    def _push_free(self, shelf_id):
+        self._free.add(shelf_id)
+        self._freed.append(shelf_id)
+        if len(self._freed) > 4 * len(self._shelves) + 64:
+            # Журнал розрісся — купи дешевше перебудувати при наступних зверненнях
+            self._heaps.clear()
+            self._freed = []
+
+
+shelf_allocator = ShelfAllocator()
@@ -0,0 +1,119 @@
+import atexit
+import threading
+
+import config
+from db.connection import db_connection
+
+# Поле стану робота -> SQL, яким воно записується в БД
+_FLUSH_SQL = {
+    "position": "UPDATE robots SET x = ?, y = ?, updated_at = GETDATE() WHERE id = ?",
+    "battery": "UPDATE robots SET battery = ?, updated_at = GETDATE() WHERE id = ?",
+    "status": "UPDATE robots SET status = ?, updated_at = GETDATE() WHERE id = ?",
+}
+
+
+class TelemetryBuffer:
+    """Відкладений запис позиції, заряду та статусу роботів.
+
+    Зміни накопичуються в пам'яті (для кожного робота лише останнє значення)
+    і записуються в БД пакетом через executemany — раз на flush_interval секунд,
+    коли змінилось max_pending роботів, або при завершенні програми.
+    """
+
+    def __init__(self, flush_interval=1.0, max_pending=64):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = {}  # robot_id: {поле: значення}, ще не записані в БД
+        self._latest = {}  # robot_id: {поле: значення}, останній відомий стан
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # лише один flush одночасно
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def record(self, robot_id, **fields):
+        """Запам'ятати новий стан робота (position=(x, y), battery=..., status=...)"""
+        with self._lock:
+            self._pending.setdefault(robot_id, {}).update(fields)
+            self._latest.setdefault(robot_id, {}).update(fields)
+            pending = len(self._pending)
+            if self._thread is None:
+                self._start()
+        if pending >= self.max_pending:
+            self._wakeup.set()
+
+    def latest(self, robot_id, field, default=None):
+        """Останнє записане значення поля (навіть якщо воно ще не потрапило в БД)"""
+        with self._lock:
+            return self._latest.get(robot_id, {}).get(field, default)
+
+    def forget(self, robot_id):
+        """Прибрати робота з кешу стану (наприклад, після зміни його даних в обхід буфера)"""
+        with self._lock:
+            self._latest.pop(robot_id, None)
+
+    def reset(self):
+        """Відкинути весь накопичений стан (наприклад, перед новою симуляцією з іншою БД)"""
+        with self._lock:
+            self._pending.clear()
+            self._latest.clear()
+
+    def flush(self):
+        """Записати всі накопичені зміни в БД одним пакетом"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            rows = {field: [] for field in _FLUSH_SQL}
+            for robot_id, fields in pending.items():
+                if "position" in fields:
+                    x, y = fields["position"]
+                    rows["position"].append((x, y, robot_id))
+                if "battery" in fields:
+                    rows["battery"].append((fields["battery"], robot_id))
+                if "status" in fields:
+                    rows["status"].append((fields["status"], robot_id))
+
+            try:
+                with db_connection() as conn:
+                    cursor = conn.cursor()
+                    for field, params in rows.items():
+                        if params:
+                            cursor.executemany(_FLUSH_SQL[field], params)
+                    conn.commit()
+            except Exception as e:
+                print("Помилка запису телеметрії роботів", e)
+                # Повертаємо зміни назад, не перетираючи новіші значення
+                with self._lock:
+                    for robot_id, fields in pending.items():
+                        newer = self._pending.get(robot_id, {})
+                        fields.update(newer)
+                        self._pending[robot_id] = fields
+                return 0
+            return len(pending)
+
+    def _start(self):
+        """Запустити фоновий потік запису (викликати під self._lock)"""
+        self._thread = threading.Thread(target=self._run, name="telemetry-flush")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def close(self):
+        """Зупинити фоновий запис і записати все, що залишилось"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self.flush()
+
+
+telemetry = TelemetryBuffer(config.TELEMETRY_FLUSH_INTERVAL, config.TELEMETRY_MAX_PENDING)
+atexit.register(telemetry.close)
@@ -0,0 +1,335 @@
+import time
+from heapq import heappop, heappush
+from threading import Lock
+
+from db.connection import db_connection, get_backend
+from db.inventory import inventory
+from logic.events import events
+
+# Скільки замовлень у списку IN (...) одного запиту позицій (SQL Server приймає до 2100 параметрів)
+LOAD_CHUNK = 1000
+
+
+def hungarian(costs):
+    """Призначення мінімальної сумарної вартості (угорський алгоритм, O(n²·m)).
+
+    costs — матриця n × m (список рядків). Повертає для кожного рядка номер
+    стовпця або None, якщо рядків більше, ніж стовпців, і рядку стовпця не дісталось.
+    """
+    n = len(costs)
+    m = len(costs[0]) if n else 0
+    if not n or not m:
+        return [None] * n
+    transposed = n > m
+    if transposed:
+        costs = [list(column) for column in zip(*costs)]
+        n, m = m, n
+
+    inf = float("inf")
+    u = [0.0] * (n + 1)  # потенціали рядків
+    v = [0.0] * (m + 1)  # потенціали стовпців
+    match = [0] * (m + 1)  # стовпець -> рядок (з 1; 0 — вільний)
+    way = [0] * (m + 1)
+    for row in range(1, n + 1):
+        match[0] = row
+        col0 = 0
+        min_to = [inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[col0] = True
+            row0 = match[col0]
+            costs_row = costs[row0 - 1]
+            delta = inf
+            col1 = 0
+            for col in range(1, m + 1):
+                if not used[col]:
+                    reduced = costs_row[col - 1] - u[row0] - v[col]
+                    if reduced < min_to[col]:
+                        min_to[col] = reduced
+                        way[col] = col0
+                    if min_to[col] < delta:
+                        delta = min_to[col]
+                        col1 = col
+            for col in range(m + 1):
+                if used[col]:
+                    u[match[col]] += delta
+                    v[col] -= delta
+                else:
+                    min_to[col] -= delta
+            col0 = col1
+            if match[col0] == 0:
+                break
+        while col0:
+            col1 = way[col0]
+            match[col0] = match[col1]
+            col0 = col1
+
+    if transposed:
+        # Рядки транспонованої матриці — це стовпці вихідної
+        result = [None] * m
+        for col in range(1, m + 1):
+            if match[col]:
+                result[col - 1] = match[col] - 1
+        return result
+    result = [None] * n
+    for col in range(1, m + 1):
+        if match[col]:
+            result[match[col] - 1] = col - 1
+    return result
+
+
+class OrderDispatcher:
+    """Центральний розподіл замовлень між вільними роботами.
+
+    Вільний робот не шукає замовлення в БД сам, а звертається до request_orders():
+    той запам'ятовує робота й раз на batch_interval секунд розподіляє пакетом
+    найстаріші pending-замовлення між усіма роботами, що чекають. Призначення —
+    оптимальне за сумарною вартістю (угорський алгоритм): вартість — відстань
+    проїзду від робота до найближчої палети з першим товаром замовлення,
+    збільшена для роботів з низьким зарядом (battery_weight — на скільки
+    дорожчає проїзд для робота з порожньою батареєю).
+
+    Черга pending-замовлень — у пам'яті: її оновлюють події "order" (нові
+    замовлення, повернуті в чергу, взяті іншими). З БД за пакет читаються лише
+    позиції замовлень, яких диспетчер ще не бачив, а id pending-замовлень —
+    тільки при першому пакеті, раз на resync_interval секунд (замовлення, змінені
+    в обхід подій) і якщо підписка пропустила події. Пакет рахується й
+    записується в БД поза self._lock; одночасно — лише один пакет.
+
+    Якщо waves увімкнено, до призначеного замовлення додаються інші (хвиля),
+    поки їхні товари влазять у max_capacity робота: спершу ті, чиї палети
+    ближче до вже вибраних, серед wave_window найстаріших вільних замовлень.
+    """
+
+    def __init__(self, batch_interval=1.0, battery_weight=1.0, lookahead=2, waves=True, wave_window=50,
+                 clock=time.monotonic, resync_interval=60.0):
+        self.batch_interval = batch_interval
+        self.battery_weight = battery_weight
+        self.lookahead = lookahead  # скільки замовлень на одного робота розглядати в угорському алгоритмі
+        self.waves = waves
+        self.wave_window = wave_window  # скільки найстаріших вільних замовлень розглядати для хвилі
+        self.clock = clock  # у симуляції — віртуальний годинник
+        self.resync_interval = resync_interval  # як часто звіряти чергу з БД, с
+        self._waiting = {}  # robot_id: (робот, коли востаннє питав)
+        self._assigned = {}  # robot_id: [order_id, ...], ще не забрані роботом
+        self._last_batch = None
+        self._dispatching = False  # пакет уже рахується в іншому потоці
+        self._lock = Lock()
+        # Черга — лише для потоку, що рахує пакет (див. self._dispatching)
+        self._events = events.subscribe(("order",))
+        self._pending = set()  # id pending-замовлень
+        self._queue = []  # купа тих самих id (можуть бути застарілі записи)
+        self._lines = {}  # order_id: [(товар, кількість), ...] — позиції вже прочитаних замовлень
+        self._synced = None  # (драйвер БД, коли востаннє звіряли чергу, скільки подій пропущено на той момент)
+        self.batches = 0
+        self.assigned_total = 0
+
+    def close(self):
+        """Відписатися від подій (диспетчер більше не використовується)"""
+        self._events.close()
+
+    def request_orders(self, robot):
+        """Замовлення, призначені роботу (вже в статусі processing); порожній список — поки нічого"""
+        with self._lock:
+            order_ids = self._assigned.pop(robot.robot_id, None)
+            if order_ids:
+                return order_ids
+            now = self.clock()
+            self._waiting[robot.robot_id] = (robot, now)
+            if self._dispatching or self._last_batch is not None and now - self._last_batch < self.batch_interval:
+                return []
+            self._last_batch = now
+            self._dispatching = True
+            robots = self._waiting_robots(now)
+        try:
+            waves = self._dispatch(robots, now) if robots else []
+        finally:
+            with self._lock:
+                self._dispatching = False
+        returned = []
+        with self._lock:
+            for assignee, claimed in waves:
+                if assignee.robot_id in self._waiting:
+                    self._assigned[assignee.robot_id] = claimed
+                    del self._waiting[assignee.robot_id]
+                    self.assigned_total += len(claimed)
+                else:
+                    returned.extend(claimed)  # поки рахувався пакет, робот пішов (withdraw)
+            order_ids = self._assigned.pop(robot.robot_id, [])
+        self._return(returned)
+        return order_ids
+
+    def withdraw(self, robot_id):
+        """Робот більше не вільний (наприклад, їде заряджатись): призначене йому повертається в чергу"""
+        with self._lock:
+            self._waiting.pop(robot_id, None)
+            order_ids = self._assigned.pop(robot_id, None)
+        self._return(order_ids)
+
+    def _return(self, order_ids):
+        """Повернути замовлення з processing у pending"""
+        if not order_ids:
+            return
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany("UPDATE orders SET status = 'pending' WHERE id = ? AND status = 'processing'",
+                               [(order_id,) for order_id in order_ids])
+            conn.commit()
+        for order_id in order_ids:
+            events.publish("order", order_id, status="pending")
+
+    def _waiting_robots(self, now):
+        """Роботи, що чекають на замовлення (викликати під self._lock)"""
+        # Робот, що давно не питав, уже зайнятий чимось іншим
+        stale_after = 2 * self.batch_interval + max(robot.poll_interval for robot, _ in self._waiting.values())
+        robots = []
+        for robot_id, (robot, seen) in list(self._waiting.items()):
+            if now - seen > stale_after:
+                del self._waiting[robot_id]
+            else:
+                robots.append(robot)
+        return robots
+
+    def _dispatch(self, robots, now):
+        """Розподілити pending-замовлення між robots і взяти їх у БД; повертає [(робот, [order_id, ...])]"""
+        limit = len(robots) * self.lookahead
+        self._sync(now)
+        orders, pallets_by_item = self._load_pending(limit + (len(robots) * self.wave_window if self.waves else 0))
+        if not orders:
+            return []
+        self.batches += 1
+
+        costs = []
+        for robot in robots:
+            position = robot.get_current_position()
+            factor = 1 + self.battery_weight * (100 - robot.battery_level) / 100
+            row = []
+            for _, lines in orders[:limit]:
+                pallets = pallets_by_item.get(lines[0][0])
+                if pallets:
+                    distance = min(robot.travel_distance(position, pallet) for pallet in pallets)
+                else:
+                    # Товару немає на палетах — робот лише пропустить позицію
+                    distance = 0
+                row.append(distance * factor)
+            costs.append(row)
+
+        waves = []
+        taken = set()
+        for robot, col in zip(robots, hungarian(costs)):
+            if col is not None:
+                waves.append((robot, [orders[col]]))
+                taken.add(orders[col][0])
+        if self.waves:
+            for robot, wave in waves:
+                self._fill_wave(robot, wave, orders, taken, pallets_by_item)
+
+        result = []
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            for robot, wave in waves:
+                claimed = []
+                for order_id, _ in wave:
+                    cursor.execute("UPDATE orders SET status = 'processing' WHERE id = ? AND status = 'pending'",
+                                   (order_id,))
+                    # Замовлення могли взяти в обхід диспетчера (наприклад, з адмін-панелі) або видалити
+                    if cursor.rowcount:
+                        claimed.append(order_id)
+                    self._pending.discard(order_id)
+                    self._lines.pop(order_id, None)
+                if claimed:
+                    result.append((robot, claimed))
+            conn.commit()
+        for _, claimed in result:
+            for order_id in claimed:
+                events.publish("order", order_id, status="processing")
+        return result
+
+    def _fill_wave(self, robot, wave, orders, taken, pallets_by_item):
+        """Доповнити хвилю замовленнями, що влазять у робота, — найближчими за палетами"""
+        load = sum(quantity for _, lines in wave for _, quantity in lines)
+        cells = [cell for _, lines in wave for item_id, _ in lines for cell in pallets_by_item.get(item_id, ())]
+        while load < robot.max_capacity:
+            best = None
+            best_gap = None
+            window = 0
+            for order in orders:
+                if order[0] in taken:
+                    continue
+                window += 1
+                if window > self.wave_window:
+                    break
+                size = sum(quantity for _, quantity in order[1])
+                if load + size > robot.max_capacity:
+                    continue
+                gap = min((abs(x - cx) + abs(y - cy) for item_id, _ in order[1]
+                           for x, y in pallets_by_item.get(item_id, ()) for cx, cy in cells), default=0)
+                if best_gap is None or gap < best_gap:
+                    best, best_gap = order, gap
+            if best is None:
+                return
+            wave.append(best)
+            taken.add(best[0])
+            load += sum(quantity for _, quantity in best[1])
+            cells.extend(cell for item_id, _ in best[1] for cell in pallets_by_item.get(item_id, ()))
+
+    def _sync(self, now):
+        """Оновити чергу подіями "order" або, коли час (див. resync_interval), перечитати її з БД"""
+        backend = get_backend()
+        synced = self._synced
+        if synced is not None and synced[0] is backend and now - synced[1] < self.resync_interval \
+                and synced[2] == self._events.dropped:
+            for _, order_id, data in self._events.poll():
+                if data.get("status") == "pending":
+                    if order_id not in self._pending:
+                        self._pending.add(order_id)
+                        heappush(self._queue, order_id)
+                else:
+                    self._pending.discard(order_id)
+                    self._lines.pop(order_id, None)
+            return
+
+        # Події, що надійдуть після цього poll, застосуються наступного разу (повторно — без шкоди)
+        self._events.poll()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id FROM orders WHERE status = 'pending'")
+            self._pending = {row[0] for row in cursor.fetchall()}
+        self._queue = sorted(self._pending)
+        self._lines = {order_id: lines for order_id, lines in self._lines.items() if order_id in self._pending}
+        self._synced = (backend, now, self._events.dropped)
+
+    def _oldest(self, count):
+        """До count найстаріших id з черги (застарілі записи купи відкидаються)"""
+        order_ids = []
+        while self._queue and len(order_ids) < count:
+            order_id = heappop(self._queue)
+            if order_id in self._pending and (not order_ids or order_ids[-1] != order_id):
+                order_ids.append(order_id)
+        for order_id in order_ids:
+            heappush(self._queue, order_id)
+        return order_ids
+
+    def _load_pending(self, limit):
+        """Найстаріші pending-замовлення [(id, [(товар, кількість), ...])] і клітинки палет для кожного товару"""
+        order_ids = self._oldest(limit)
+        missing = [order_id for order_id in order_ids if order_id not in self._lines]
+        if missing:
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                for start in range(0, len(missing), LOAD_CHUNK):
+                    chunk = missing[start:start + LOAD_CHUNK]
+                    for order_id in chunk:
+                        self._lines[order_id] = []
+                    cursor.execute(f"""
+                        SELECT order_id, item_id, quantity FROM order_items
+                        WHERE order_id IN ({", ".join("?" * len(chunk))})
+                        ORDER BY order_id, id
+                    """, chunk)
+                    for order_id, item_id, quantity in cursor.fetchall():
+                        self._lines[order_id].append((item_id, quantity))
+        # Замовлення без позицій не розподіляються
+        orders = [(order_id, self._lines[order_id]) for order_id in order_ids if self._lines[order_id]]
+        if not orders:
+            return [], {}
+        return orders, inventory.item_cells()
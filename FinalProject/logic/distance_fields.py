@@ -0,0 +1,116 @@
+from array import array
+from collections import OrderedDict, deque
+from threading import Lock
+
+import config
+from logic.grid import FREE
+
+
+def distance_field(grid, goal_idx):
+    """BFS-відстані від усіх вільних клітинок до goal_idx по статичній карті (-1 — недосяжно).
+
+    Поле — компактний array: 2 байти на клітинку ('h'), для карт понад 32767 клітинок — 4 ('i').
+    """
+    width = grid.width
+    size = width * grid.height
+    cells = grid.cells
+    dist = array('h' if size <= 32767 else 'i', [-1]) * size
+    dist[goal_idx] = 0
+    queue = deque([goal_idx])
+    while queue:
+        current = queue.popleft()
+        cx = current % width
+        d = dist[current] + 1
+        for nxt, valid in (
+            (current - width, current >= width),
+            (current + 1, cx < width - 1),
+            (current + width, current + width < size),
+            (current - 1, cx > 0),
+        ):
+            if valid and dist[nxt] < 0 and cells[nxt] == FREE:
+                dist[nxt] = d
+                queue.append(nxt)
+    return dist
+
+
+class DistanceFieldCache:
+    """Справжня відстань проїзду до точок інтересу (палети й підходи до них, зарядка, видача).
+
+    Точки інтересу оголошуються через declare(); поле для такої цілі рахується
+    BFS по статичній карті при першому зверненні, після чого відстань від будь-якої
+    клітинки — це звернення до масиву. Кеш — LRU на max_size полів
+    (config.DISTANCE_FIELDS_CACHE_SIZE). Поля для інших цілей рахуються щоразу
+    заново і не зберігаються. Якщо планування складу змінилось (grid.version),
+    усі поля перераховуються заново.
+    """
+
+    def __init__(self, grid, max_size=None):
+        self.grid = grid
+        self.max_size = max_size or config.DISTANCE_FIELDS_CACHE_SIZE
+        self._targets = set()  # індекси оголошених точок інтересу
+        self._fields = OrderedDict()  # індекс цілі: поле відстаней
+        self._version = grid.version
+        self._lock = Lock()
+        self.evictions = 0
+
+    def invalidate(self):
+        with self._lock:
+            self._fields.clear()
+            self._version = self.grid.version
+
+    def declare(self, targets):
+        """Оголосити точки інтересу — лише для них поля зберігаються в кеші"""
+        grid = self.grid
+        indexes = {grid.index(*target) for target in targets if grid.in_bounds(*target)}
+        with self._lock:
+            self._targets |= indexes
+
+    def covers(self, target):
+        """Чи target — оголошена точка інтересу (відстань до неї береться з поля)"""
+        grid = self.grid
+        return grid.in_bounds(*target) and grid.index(*target) in self._targets
+
+    def field(self, target):
+        """Поле відстаней до клітинки target = (x, y)"""
+        grid = self.grid
+        goal_idx = grid.index(*target)
+        with self._lock:
+            if self._version != grid.version:
+                self._fields.clear()
+                self._version = grid.version
+            dist = self._fields.get(goal_idx)
+            if dist is not None:
+                self._fields.move_to_end(goal_idx)
+                return dist
+            keep = goal_idx in self._targets
+        dist = distance_field(grid, goal_idx)
+        if keep:
+            with self._lock:
+                if self._version == grid.version:
+                    dist = self._fields.setdefault(goal_idx, dist)
+                    self._fields.move_to_end(goal_idx)
+                    while len(self._fields) > self.max_size:
+                        self._fields.popitem(last=False)
+                        self.evictions += 1
+        return dist
+
+    def distance(self, start, target):
+        """Кількість кроків від start до target або None, якщо шляху немає"""
+        grid = self.grid
+        if not grid.in_bounds(*start) or not grid.in_bounds(*target):
+            return None
+        d = self.field(target)[grid.index(*start)]
+        return d if d >= 0 else None
+
+
+_caches = {}
+_caches_lock = Lock()
+
+
+def get_distance_fields(grid):
+    """Спільний для всіх роботів кеш полів відстаней для цієї карти"""
+    with _caches_lock:
+        cache = _caches.get(id(grid))
+        if cache is None or cache.grid is not grid:
+            cache = _caches[id(grid)] = DistanceFieldCache(grid)
+        return cache
@@ -0,0 +1,82 @@
+import threading
+from collections import OrderedDict
+
+# Типи подій: (тип, суб'єкт, дані)
+#   "robot_moved"   robot_id  position=(x, y)
+#   "robot_status"  robot_id  status=...
+#   "robot_battery" robot_id  battery=...
+#   "order"         order_id  status='pending' | 'processing' | 'done' | 'completed'
+#   "shelf"         shelf_id  status='busy' | 'free', code=..., order_id=...
+
+
+class Subscription:
+    """Черга подій одного споживача.
+
+    Події з тим самим (тип, суб'єкт), що ще не забрані, об'єднуються —
+    лишається остання (для стану робота чи полиці важливе лише актуальне
+    значення). Черга обмежена maxsize: якщо споживач не встигає, найстаріші
+    події відкидаються (dropped), а видавці ніколи не чекають на споживача.
+    """
+
+    def __init__(self, bus, types=None, maxsize=10000):
+        self.bus = bus
+        self.types = set(types) if types else None
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._pending = OrderedDict()  # (тип, суб'єкт): дані
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+
+    def _put(self, kind, subject, data):
+        key = (kind, subject)
+        with self._lock:
+            if key in self._pending:
+                self._pending.move_to_end(key)
+            elif len(self._pending) >= self.maxsize:
+                self._pending.popitem(last=False)
+                self.dropped += 1
+            self._pending[key] = data
+            self._ready.set()
+
+    def poll(self, timeout=0):
+        """Забрати всі накопичені події [(тип, суб'єкт, дані)]; timeout — скільки чекати, якщо їх немає"""
+        if timeout and not self._ready.wait(timeout):
+            return []
+        with self._lock:
+            pending, self._pending = self._pending, OrderedDict()
+            self._ready.clear()
+        return [(kind, subject, data) for (kind, subject), data in pending.items()]
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """Публікація подій у межах процесу: роботи й логіка замовлень повідомляють, споживачі (GUI) підписуються.
+
+    publish() лише розкладає подію по чергах підписників і нічого не пише
+    в БД; без підписників він майже нічого не коштує.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = ()
+
+    def subscribe(self, types=None, maxsize=10000):
+        """Нова підписка на події types (None — на всі)"""
+        subscription = Subscription(self, types, maxsize)
+        with self._lock:
+            self._subscriptions = self._subscriptions + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions = tuple(s for s in self._subscriptions if s is not subscription)
+
+    def publish(self, kind, subject, **data):
+        for subscription in self._subscriptions:
+            if subscription.types is None or kind in subscription.types:
+                subscription._put(kind, subject, data)
+
+
+events = EventBus()
@@ -0,0 +1,227 @@
+import time
+from heapq import heappush, heappop
+
+from logic.distance_fields import get_distance_fields
+from logic.grid import FREE
+from logic.navigator import GridPlanner
+from logic.reservations import ReservationTable, find_conflicts
+
+
+def _path_cost(path, goal_idx):
+    """Кількість тактів до останнього прибуття в ціль"""
+    cost = len(path) - 1
+    while cost > 0 and path[cost - 1] == goal_idx:
+        cost -= 1
+    return cost
+
+
+def _low_level(grid, start_idx, goal_idx, h_field, vertex_cons, edge_cons, max_t):
+    """A* у просторі-часі для одного агента з обмеженнями CBS.
+
+    vertex_cons — {(клітинка, такт)}, edge_cons — {(звідки, куди, такт)}.
+    Повертає список клітинок по тактах (з такту 0) або None.
+    """
+    width = grid.width
+    size = width * grid.height
+    cells = grid.cells
+    if h_field[start_idx] < 0:
+        return None
+    # Після останнього обмеження на ціль агент може стояти в ній назавжди
+    last_goal_con = max((t for cell, t in vertex_cons if cell == goal_idx), default=-1)
+
+    start = (start_idx, 0)
+    parents = {start: None}
+    frontier = [(h_field[start_idx], 0, start_idx)]  # (f, -такт, клітинка): при рівних f — глибші стани
+    found = None
+    while frontier:
+        _, neg_t, current = heappop(frontier)
+        t = -neg_t
+        if current == goal_idx and t > last_goal_con:
+            found = (current, t)
+            break
+        if t >= max_t:
+            continue
+        cx = current % width
+        for nxt, valid in (
+            (current, True),
+            (current - width, current >= width),
+            (current + 1, cx < width - 1),
+            (current + width, current + width < size),
+            (current - 1, cx > 0),
+        ):
+            if not valid or (nxt != current and cells[nxt] != FREE and nxt != goal_idx):
+                continue
+            state = (nxt, t + 1)
+            if state in parents or (nxt, t + 1) in vertex_cons or (current, nxt, t) in edge_cons:
+                continue
+            h = h_field[nxt]
+            if h < 0:
+                continue
+            parents[state] = (current, t)
+            heappush(frontier, (t + 1 + h, -(t + 1), nxt))
+
+    if found is None:
+        return None
+    path = []
+    state = found
+    while state is not None:
+        path.append(state[0])
+        state = parents[state]
+    path.reverse()
+    return path
+
+
+def _timed(path):
+    return [(cell, t) for t, cell in enumerate(path)]
+
+
+def _first_conflict(paths):
+    conflicts = find_conflicts({agent: _timed(path) for agent, path in paths.items()})
+    if not conflicts:
+        return None, 0
+    return min(conflicts, key=lambda conflict: conflict[4]), len(conflicts)
+
+
+def _result(grid, paths, method, goals, nodes):
+    coords = {
+        agent: [grid.coords(cell) for cell in path] if path is not None else None
+        for agent, path in paths.items()
+    }
+    found = [agent for agent, path in paths.items() if path is not None]
+    costs = {agent: _path_cost(paths[agent], goals[agent]) for agent in found}
+    return {
+        "paths": coords,  # robot_id: [(x, y) на такт 0, 1, ...] або None
+        "method": method,  # "cbs" або "prioritized"
+        "makespan": max(costs.values(), default=0),
+        "sum_of_costs": sum(costs.values()),
+        "failed": [agent for agent, path in paths.items() if path is None],
+        "high_level_nodes": nodes,
+    }
+
+
+def plan_prioritized(grid, agents, max_steps=None):
+    """Пріоритетне планування: агенти по черзі плануються навколо вже зарезервованих маршрутів"""
+    table = ReservationTable()
+    planner = GridPlanner(grid)
+    goals = {robot_id: grid.index(*goal) for robot_id, _, goal in agents}
+    # Стартові клітинки займаємо одразу, щоб ніхто не планував крізь робота, що ще стоїть
+    for robot_id, start, _ in agents:
+        table.park(robot_id, grid.index(*start), 0)
+
+    paths = {}
+    # Спочатку — найдовші маршрути: їм найважче поступатися
+    ordered = sorted(agents, key=lambda agent: -abs(agent[1][0] - agent[2][0]) - abs(agent[1][1] - agent[2][1]))
+    for robot_id, start, goal in ordered:
+        timed = planner.find_timed_path(start, goal, 0, table, robot_id, max_steps=max_steps)
+        if not timed or not table.reserve_path(robot_id, [(grid.index(*pos), t) for pos, t in timed]):
+            paths[robot_id] = None
+            continue
+        paths[robot_id] = [grid.index(*pos) for pos, _ in timed]
+    return _result(grid, paths, "prioritized", goals, 0)
+
+
+def plan_fleet(grid, agents, suboptimality=1.0, time_budget=1.0, max_steps=None):
+    """Безконфліктні маршрути для кількох роботів (Conflict-Based Search).
+
+    agents — список (robot_id, start, goal) з координатами (x, y).
+    suboptimality — w >= 1: з високорівневої черги береться вузол із найменшою
+    кількістю конфліктів серед тих, чия вартість не більша за w × мінімальну
+    (сума вартостей результату не перевищить w × оптимум).
+    Якщо за time_budget секунд розв'язок не знайдено — пріоритетне планування.
+    Повертає словник з маршрутами, makespan і sum_of_costs.
+    """
+    deadline = time.perf_counter() + time_budget
+    starts = {robot_id: grid.index(*start) for robot_id, start, _ in agents}
+    goals = {robot_id: grid.index(*goal) for robot_id, _, goal in agents}
+    distances = get_distance_fields(grid)
+    fields = {robot_id: distances.field(grid.coords(goal)) for robot_id, goal in goals.items()}
+    if max_steps is None:
+        longest = max((fields[r][starts[r]] for r in starts), default=0)
+        max_steps = 2 * longest + 2 * len(agents) + 20
+
+    root_paths = {}
+    for robot_id in starts:
+        path = _low_level(grid, starts[robot_id], goals[robot_id], fields[robot_id], set(), set(), max_steps)
+        if path is None:
+            # Ціль недосяжна навіть без інших роботів — CBS не допоможе
+            return plan_prioritized(grid, agents, max_steps)
+        root_paths[robot_id] = path
+
+    def cost_of(paths):
+        return sum(_path_cost(path, goals[agent]) for agent, path in paths.items())
+
+    counter = 0
+    conflict, count = _first_conflict(root_paths)
+    root = (cost_of(root_paths), count, counter, {r: (set(), set()) for r in starts}, root_paths, conflict)
+    open_list = [root]
+    nodes = 0
+
+    while open_list:
+        if time.perf_counter() > deadline:
+            return plan_prioritized(grid, agents, max_steps)
+
+        best_cost = open_list[0][0]
+        if suboptimality > 1.0:
+            # Фокальний список: серед достатньо дешевих — з найменшою кількістю конфліктів
+            bound = best_cost * suboptimality
+            pick = min(
+                (i for i, node in enumerate(open_list) if node[0] <= bound),
+                key=lambda i: (open_list[i][1], open_list[i][0], open_list[i][2]),
+            )
+            node = open_list[pick]
+            open_list[pick] = open_list[-1]
+            open_list.pop()
+            if pick < len(open_list):
+                open_list.sort()
+        else:
+            node = heappop(open_list)
+        cost, count, _, constraints, paths, conflict = node
+        nodes += 1
+
+        if conflict is None:
+            result = _result(grid, paths, "cbs", goals, nodes)
+            return result
+
+        kind, a, b, where, t = conflict
+        if kind == "vertex":
+            branches = ((a, ("v", (where, t))), (b, ("v", (where, t))))
+        else:
+            u, v = where  # b рухається u -> v, a — v -> u
+            branches = ((a, ("e", (v, u, t))), (b, ("e", (u, v, t))))
+
+        for agent, (con_kind, con) in branches:
+            vertex_cons, edge_cons = constraints[agent]
+            vertex_cons = set(vertex_cons)
+            edge_cons = set(edge_cons)
+            if con_kind == "v":
+                vertex_cons.add(con)
+            else:
+                edge_cons.add(con)
+            path = _low_level(grid, starts[agent], goals[agent], fields[agent], vertex_cons, edge_cons, max_steps)
+            if path is None:
+                continue
+            child_constraints = dict(constraints)
+            child_constraints[agent] = (vertex_cons, edge_cons)
+            child_paths = dict(paths)
+            child_paths[agent] = path
+            child_conflict, child_count = _first_conflict(child_paths)
+            counter += 1
+            heappush(open_list, (cost_of(child_paths), child_count, counter, child_constraints, child_paths, child_conflict))
+
+    return plan_prioritized(grid, agents, max_steps)
+
+
+def reserve_fleet_plan(table, grid, plan, start_tick):
+    """Записати маршрути плану в таблицю резервувань, починаючи з такту start_tick.
+
+    Повертає robot_id, чиї маршрути вдалося зарезервувати (решта спланує себе сама).
+    """
+    reserved = []
+    with table.lock:
+        for robot_id, path in plan["paths"].items():
+            if not path:
+                continue
+            timed = [(grid.index(x, y), start_tick + t) for t, (x, y) in enumerate(path)]
+            if table.reserve_path(robot_id, timed):
+                reserved.append(robot_id)
+    return reserved
@@ -0,0 +1,148 @@
+from collections import deque
+from threading import RLock
+
+# Типи клітинок статичної карти
+FREE = 0
+SHELF = 1
+PALLET = 2
+
+
+class StaticGrid:
+    """Статична карта складу: один байт на клітинку, індекс клітинки = y * width + x.
+
+    Полиці та палети позначаються один раз при побудові, тому перевірка
+    клітинки — це просто звернення до bytearray.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.cells = bytearray(width * height)
+        self.version = 0  # збільшується при кожній зміні планування складу
+        self._changes = deque(maxlen=4096)  # (версія, індекс клітинки) останніх змін
+
+    @classmethod
+    def from_layout(cls, width, height, shelf_coords, pallet_coords):
+        """Побудувати карту з координат полиць і палет (simulation/warehouse_map.py)"""
+        grid = cls(width, height)
+        for x, y in shelf_coords.values():
+            if grid.in_bounds(x, y):
+                grid.cells[y * width + x] = SHELF
+        for x, y in pallet_coords.values():
+            if grid.in_bounds(x, y):
+                grid.cells[y * width + x] = PALLET
+        return grid
+
+    def index(self, x, y):
+        return y * self.width + x
+
+    def coords(self, index):
+        return index % self.width, index // self.width
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def cell(self, x, y):
+        """Тип клітинки (FREE, SHELF або PALLET)"""
+        return self.cells[y * self.width + x]
+
+    def is_blocked(self, x, y):
+        """Клітинка поза сіткою або зайнята полицею/палетою"""
+        if x < 0 or x >= self.width or y < 0 or y >= self.height:
+            return True
+        return self.cells[y * self.width + x] != FREE
+
+    def set_cell(self, x, y, kind):
+        """Змінити тип клітинки (зміна планування складу)"""
+        index = y * self.width + x
+        if self.cells[index] != kind:
+            self.cells[index] = kind
+            self.version += 1
+            self._changes.append((self.version, index))
+
+    def changed_since(self, version):
+        """Індекси клітинок, змінених після version, або None, якщо журнал змін уже неповний"""
+        if version == self.version:
+            return []
+        if not self._changes or self._changes[0][0] > version + 1:
+            return None
+        return [index for changed, index in self._changes if changed > version]
+
+
+_grid_cache = {}
+
+
+def get_static_grid(width, height, shelf_coords, pallet_coords):
+    """Спільна для всіх роботів статична карта (будується один раз на планування)"""
+    key = (
+        width, height,
+        tuple(sorted(shelf_coords.values())),
+        tuple(sorted(pallet_coords.values())),
+    )
+    grid = _grid_cache.get(key)
+    if grid is None:
+        grid = _grid_cache.setdefault(key, StaticGrid.from_layout(width, height, shelf_coords, pallet_coords))
+    return grid
+
+
+class DynamicOccupancy:
+    """Клітинки, які зараз займають або куди прямують роботи"""
+
+    def __init__(self):
+        self.lock = RLock()
+        self.reserved = {}  # координати (x, y): robot_id
+        self.destinations = {}  # robot_id: (x, y)
+        self._destination_cells = {}  # (x, y): множина robot_id, що туди прямують
+
+    def is_blocked(self, cell, robot_id):
+        """Чи зайнята клітинка іншим роботом (або є ціллю іншого робота)"""
+        with self.lock:
+            owner = self.reserved.get(cell)
+            if owner is not None and owner != robot_id:
+                return True
+            heading = self._destination_cells.get(cell)
+            if heading and (len(heading) > 1 or robot_id not in heading):
+                return True
+        return False
+
+    def blocked_cells(self, robot_id):
+        """Знімок усіх клітинок, заблокованих для робота іншими роботами"""
+        with self.lock:
+            cells = {cell for cell, owner in self.reserved.items() if owner != robot_id}
+            for cell, heading in self._destination_cells.items():
+                if len(heading) > 1 or robot_id not in heading:
+                    cells.add(cell)
+        return cells
+
+    def reserve(self, cell, robot_id):
+        """Зарезервувати клітинку; False, якщо її вже тримає інший робот"""
+        with self.lock:
+            owner = self.reserved.get(cell)
+            if owner is not None and owner != robot_id:
+                return False
+            self.reserved[cell] = robot_id
+            self._set_destination(robot_id, cell)
+            return True
+
+    def clear(self):
+        """Зняти всі резервування й цілі (словники очищуються на місці — на них є посилання)"""
+        with self.lock:
+            self.reserved.clear()
+            self.destinations.clear()
+            self._destination_cells.clear()
+
+    def release(self, cell, robot_id):
+        with self.lock:
+            if self.reserved.get(cell) == robot_id:
+                del self.reserved[cell]
+
+    def _set_destination(self, robot_id, cell):
+        old = self.destinations.get(robot_id)
+        if old is not None:
+            heading = self._destination_cells.get(old)
+            if heading:
+                heading.discard(robot_id)
+                if not heading:
+                    del self._destination_cells[old]
+        self.destinations[robot_id] = cell
+        self._destination_cells.setdefault(cell, set()).add(robot_id)
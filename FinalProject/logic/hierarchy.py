@@ -0,0 +1,451 @@
+from collections import deque
+from heapq import heappush, heappop
+from threading import Lock, RLock
+
+from logic.grid import FREE
+
+# Ділянку спільної межі, довшу за це число клітинок, переходимо входами по краях і кожні ENTRANCE_STEP
+# клітинок між ними, коротшу — одним входом посередині
+ENTRANCE_SPLIT = 6
+ENTRANCE_STEP = 4
+# Маршрут з абстрактного графа вирівнюється A* у смузі такої ширини (в обидва боки) навколо нього
+SMOOTH_RADIUS = 2
+
+
+class HierarchicalPlanner:
+    """Ієрархічний пошук шляху (HPA*) для великих складів.
+
+    Карта ділиться на кластери cluster_size × cluster_size. На спільних межах
+    кластерів вибираються входи (пари сусідніх вільних клітинок), а всередині
+    кожного кластера один раз рахуються відстані між його входами. Запит —
+    це A* по цьому абстрактному графу входів, після чого покроково
+    розгортаються лише відрізки, що потрапили в маршрут (і кешуються).
+    Коли змінюється планування (StaticGrid.set_cell), перебудовуються лише
+    кластери зі зміненими клітинками та їхні межі.
+    Маршрут з абстрактного графа вирівнюється A* у вузькій смузі навколо нього
+    (SMOOTH_RADIUS), і все одно може бути довшим за найкоротший: на бенчмарку
+    (simulation/pathfinding_benchmark.py) з A* за довжиною збігається 99.5%
+    маршрутів на складі 5 × 2 блоки (найгірший — на 2 кроки довший) і 87% серед
+    роботів, що займають 15% проходів (найгірший — на 8 кроків довший).
+    """
+
+    def __init__(self, grid, cluster_size=10):
+        self.grid = grid
+        self.cluster_size = cluster_size
+        self.lock = RLock()
+        # Скільки вершин розкрив останній find_path (абстрактний граф і вирівнювання)
+        # разом із repair після нього
+        self.expansions = 0
+        self._build()
+
+    def _build(self):
+        """Побудувати абстрактний граф для всієї карти"""
+        grid = self.grid
+        size = self.cluster_size
+        self._width = grid.width
+        self._height = grid.height
+        self._columns = -(-grid.width // size)
+        self._rows = -(-grid.height // size)
+        self._version = grid.version
+        self._borders = {}  # (кластер, правий або нижній сусід, чи правий): [(клітинка, клітинка), ...]
+        self._inter = {}  # вхід: множина входів сусідніх кластерів (перехід за 1 крок)
+        self._intra = {}  # кластер: {вхід: {інший вхід: відстань усередині кластера}}
+        self._links = {}  # вхід: [(сусідній вхід, вартість), ...] — внутрішні й міжкластерні ребра разом
+        self._trees = {}  # кластер: {вхід: дерево BFS до нього} — для розгортання відрізків
+        for cluster in range(self._columns * self._rows):
+            cx, cy = cluster % self._columns, cluster // self._columns
+            if cx + 1 < self._columns:
+                self._build_border(cluster, cluster + 1, True)
+            if cy + 1 < self._rows:
+                self._build_border(cluster, cluster + self._columns, False)
+        for cluster in range(self._columns * self._rows):
+            self._build_cluster(cluster)
+
+    def cluster_of(self, index):
+        size = self.cluster_size
+        return (index // self._width) // size * self._columns + (index % self._width) // size
+
+    def _bounds(self, cluster):
+        """Межі кластера: x0, y0, x1, y1 (x1 і y1 — не включно)"""
+        size = self.cluster_size
+        x0 = cluster % self._columns * size
+        y0 = cluster // self._columns * size
+        return x0, y0, min(x0 + size, self._width), min(y0 + size, self._height)
+
+    def _border_cells(self, a, horizontal):
+        """Пари (клітинка в a, сусідня клітинка в правому або нижньому сусіді) уздовж спільної межі.
+
+        horizontal — сусід праворуч. З індексів кластерів цього не вивести:
+        якщо кластер у ряду один, нижній сусід теж має номер a + 1.
+        """
+        width = self._width
+        x0, y0, x1, y1 = self._bounds(a)
+        if horizontal:
+            return [(y * width + x1 - 1, y * width + x1) for y in range(y0, y1)]
+        return [((y1 - 1) * width + x, y1 * width + x) for x in range(x0, x1)]
+
+    def _build_border(self, a, b, horizontal):
+        cells = self.grid.cells
+        entrances = []
+        run = []
+        for inside, outside in self._border_cells(a, horizontal) + [(-1, -1)]:
+            if inside >= 0 and cells[inside] == FREE and cells[outside] == FREE:
+                run.append((inside, outside))
+                continue
+            if len(run) > ENTRANCE_SPLIT:
+                entrances.extend(run[:-1:ENTRANCE_STEP])
+                entrances.append(run[-1])
+            elif run:
+                entrances.append(run[len(run) // 2])
+            run = []
+
+        for inside, outside in self._borders.get((a, b, horizontal), ()):
+            self._unlink(inside, outside)
+            self._unlink(outside, inside)
+        self._borders[(a, b, horizontal)] = entrances
+        for inside, outside in entrances:
+            self._inter.setdefault(inside, set()).add(outside)
+            self._inter.setdefault(outside, set()).add(inside)
+
+    def _unlink(self, node, other):
+        links = self._inter.get(node)
+        if links is not None:
+            links.discard(other)
+            if not links:
+                del self._inter[node]
+
+    def _build_cluster(self, cluster):
+        """Входи кластера та відстані між ними"""
+        columns = self._columns
+        nodes = set()
+        for key, side in (
+            ((cluster - 1, cluster, True), 1),
+            ((cluster - columns, cluster, False), 1),
+            ((cluster, cluster + 1, True), 0),
+            ((cluster, cluster + columns, False), 0),
+        ):
+            # Межі існують лише між сусідами в ряду/стовпці, тож зайвих ключів тут немає
+            for pair in self._borders.get(key, ()):
+                nodes.add(pair[side])
+
+        for node in self._intra.get(cluster, ()):
+            self._links.pop(node, None)
+        edges = {}
+        for node in nodes:
+            tree = self._local_search(cluster, node)
+            edges[node] = {other: tree[other][0] for other in nodes if other != node and other in tree}
+            self._links[node] = list(edges[node].items()) + [(other, 1) for other in self._inter.get(node, ())]
+        self._intra[cluster] = edges
+        self._trees[cluster] = {}
+
+    def _local_search(self, cluster, origin, passable=-1):
+        """BFS у межах кластера від origin: {клітинка: (відстань, попередня клітинка)}.
+
+        passable — клітинка (ціль-полиця), в яку можна зайти, хоча вона не вільна.
+        """
+        x0, y0, x1, y1 = self._bounds(cluster)
+        width = self._width
+        cells = self.grid.cells
+        visited = {origin: (0, -1)}
+        queue = deque([origin])
+        while queue:
+            current = queue.popleft()
+            if current != origin and cells[current] != FREE:
+                continue  # у полицю-ціль можна зайти, але не проїхати крізь неї
+            d = visited[current][0] + 1
+            cx, cy = current % width, current // width
+            for nxt, valid in (
+                (current - width, cy > y0),
+                (current + 1, cx < x1 - 1),
+                (current + width, cy < y1 - 1),
+                (current - 1, cx > x0),
+            ):
+                if valid and nxt not in visited and (cells[nxt] == FREE or nxt == passable):
+                    visited[nxt] = (d, current)
+                    queue.append(nxt)
+        return visited
+
+    def sync(self):
+        """Підлаштувати граф під зміни планування після попереднього запиту"""
+        grid = self.grid
+        with self.lock:
+            if self._version == grid.version:
+                return
+            changed = grid.changed_since(self._version)
+            if changed is None or (grid.width, grid.height) != (self._width, self._height):
+                self._build()
+                return
+            dirty = {self.cluster_of(index) for index in changed}
+            borders = [key for key in self._borders if key[0] in dirty or key[1] in dirty]
+            for a, b, horizontal in borders:
+                self._build_border(a, b, horizontal)
+            # Входи сусідів на спільних межах теж могли змінитись
+            for cluster in dirty.union(*((a, b) for a, b, _ in borders)):
+                self._build_cluster(cluster)
+            self._version = grid.version
+
+    def find_path(self, start, goal):
+        """Шлях від start до goal (без start) по статичній карті; [] якщо шляху немає.
+
+        Ціль, як і в GridPlanner, завжди вважається прохідною.
+        """
+        self.expansions = 0
+        width = self.grid.width
+        height = self.grid.height
+        sx, sy = start
+        gx, gy = goal
+        if not (0 <= gx < width and 0 <= gy < height) or not (0 <= sx < width and 0 <= sy < height):
+            return []
+        s = sy * width + sx
+        g = gy * width + gx
+        if s == g:
+            return []
+
+        self.sync()
+        with self.lock:
+            start_cluster = self.cluster_of(s)
+            start_tree = self._local_search(start_cluster, s, passable=g)
+            start_links = [(node, start_tree[node][0]) for node in self._intra[start_cluster] if node in start_tree]
+            goal_links, goal_via = self._goal_links(s, g)
+            direct = start_tree[g][0] if g in start_tree else None
+            if s in goal_via and (direct is None or goal_links[s] < direct):
+                direct = goal_links[s]
+            else:
+                goal_via.pop(s, None)  # s -> g розгортається по start_tree
+            if direct is not None:
+                start_links.append((g, direct))
+
+            nodes = self._abstract_search(s, g, start_links, goal_links)
+            if nodes is None:
+                return []
+            path = self._refine(nodes, start_tree, goal_via)
+        return self._smooth(s, g, path)
+
+    def _smooth(self, s, g, path, blocked=()):
+        """A* від s до g лише по клітинках смуги SMOOTH_RADIUS навколо path, в обхід blocked (ціль прохідна).
+
+        Прибирає зайві повороти біля входів і петлі навколо роботів: результат не
+        довший за path, бо сам path лежить у смузі. Розкриті вершини додаються до
+        self.expansions.
+        """
+        if SMOOTH_RADIUS <= 0 or len(path) < 2:
+            return path
+        width = self._width
+        height = self._height
+        cells = self.grid.cells
+        r = SMOOTH_RADIUS
+        corridor = set()
+        for x, y in [(s % width, s // width)] + path:
+            for cy in range(max(0, y - r), min(height, y + r + 1)):
+                row = cy * width
+                for cx in range(max(0, x - r), min(width, x + r + 1)):
+                    corridor.add(row + cx)
+        gx, gy = g % width, g // width
+        g_score = {s: 0}
+        parent = {s: -1}
+        frontier = [(abs(s % width - gx) + abs(s // width - gy), 0, s)]
+        expansions = 0
+        while frontier:
+            _, cost, current = heappop(frontier)
+            if current == g:
+                break
+            if cost > g_score[current]:
+                continue
+            expansions += 1
+            cx = current % width
+            for nxt, valid in (
+                (current - width, current >= width),
+                (current + 1, cx < width - 1),
+                (current + width, current + width < width * height),
+                (current - 1, cx > 0),
+            ):
+                if not valid or nxt not in corridor or nxt != g and (cells[nxt] != FREE or nxt in blocked):
+                    continue
+                new_g = cost + 1
+                if new_g < g_score.get(nxt, new_g + 1):
+                    g_score[nxt] = new_g
+                    parent[nxt] = current
+                    heappush(frontier, (new_g + abs(nxt % width - gx) + abs(nxt // width - gy), new_g, nxt))
+        self.expansions += expansions
+        if g not in parent or g_score[g] >= len(path):
+            return path
+        smoothed = []
+        current = g
+        while current != s:
+            smoothed.append((current % width, current // width))
+            current = parent[current]
+        smoothed.reverse()
+        return smoothed
+
+    def _goal_links(self, s, g):
+        """Відстані до g від входів (і від s) та дерева BFS, по яких розгортається останній відрізок.
+
+        Повертає ({клітинка: відстань}, {клітинка: (дерево, корінь)}). У ціль-полицю
+        (не вільну клітинку) можна заїхати й із сусіднього кластера, тож дерева
+        будуються і від її вільних сусідів в інших кластерах: відстань через такого
+        сусіда — на крок більша.
+        """
+        width = self._width
+        cells = self.grid.cells
+        goal_cluster = self.cluster_of(g)
+        roots = [(goal_cluster, g)]
+        if cells[g] != FREE:
+            gx, gy = g % width, g // width
+            for nxt, valid in (
+                (g - width, gy > 0),
+                (g + 1, gx < width - 1),
+                (g + width, gy < self._height - 1),
+                (g - 1, gx > 0),
+            ):
+                if valid and cells[nxt] == FREE and self.cluster_of(nxt) != goal_cluster:
+                    roots.append((self.cluster_of(nxt), nxt))
+        links = {}
+        via = {}
+        for cluster, root in roots:
+            tree = self._local_search(cluster, root)
+            extra = 0 if root == g else 1
+            candidates = list(self._intra[cluster])
+            if self.cluster_of(s) == cluster:
+                candidates.append(s)
+            for node in candidates:
+                if node in tree and tree[node][0] + extra < links.get(node, float("inf")):
+                    links[node] = tree[node][0] + extra
+                    via[node] = (tree, root)
+        return links, via
+
+    def _abstract_search(self, s, g, start_links, goal_links):
+        """A* по графу входів; повертає послідовність вузлів від s до g або None"""
+        width = self._width
+        gx, gy = g % width, g // width
+        links = self._links
+        g_score = {s: 0}
+        parent = {s: -1}
+        closed = set()
+        frontier = [(0, 0, s)]
+        expansions = 0
+        while frontier:
+            _, _, current = heappop(frontier)
+            if current in closed:
+                continue
+            closed.add(current)
+            expansions += 1
+            if current == g:
+                break
+
+            neighbours = links.get(current, ())
+            if current == s or current in goal_links:
+                neighbours = list(neighbours)
+                if current == s:
+                    neighbours.extend(start_links)
+                if current in goal_links:
+                    neighbours.append((g, goal_links[current]))
+
+            for nxt, cost in neighbours:
+                if nxt in closed:
+                    continue
+                new_g = g_score[current] + cost
+                if new_g >= g_score.get(nxt, new_g + 1):
+                    continue
+                g_score[nxt] = new_g
+                parent[nxt] = current
+                h = abs(nxt % width - gx) + abs(nxt // width - gy)
+                heappush(frontier, (new_g + h, h, nxt))
+
+        self.expansions = expansions
+        if g not in closed:
+            return None
+        nodes = []
+        current = g
+        while current != -1:
+            nodes.append(current)
+            current = parent[current]
+        nodes.reverse()
+        return nodes
+
+    def _refine(self, nodes, start_tree, goal_via):
+        """Розгорнути послідовність входів у покроковий шлях"""
+        width = self._width
+        s, g = nodes[0], nodes[-1]
+        path = []
+        for u, v in zip(nodes, nodes[1:]):
+            cluster = self.cluster_of(u)
+            if v == g and u in goal_via:
+                tree, root = goal_via[u]
+                cells = self._chain(tree, u, root)[1:]
+                if root != g:
+                    cells.append(g)  # заїзд у ціль-полицю із сусіднього кластера
+            elif self.cluster_of(v) != cluster:
+                cells = [v]  # перехід через межу кластерів
+            elif u == s:
+                cells = self._chain(start_tree, v, s)
+                cells.reverse()
+                cells = cells[1:]
+            else:
+                tree = self._trees[cluster].get(v)
+                if tree is None:
+                    tree = self._trees[cluster][v] = self._local_search(cluster, v)
+                cells = self._chain(tree, u, v)[1:]
+            path.extend(cells)
+        return [(cell % width, cell // width) for cell in path]
+
+    @staticmethod
+    def _chain(tree, cell, origin):
+        """Клітинки від cell до кореня дерева origin (обидві включно)"""
+        chain = [cell]
+        while cell != origin:
+            cell = tree[cell][1]
+            chain.append(cell)
+        return chain
+
+    def repair(self, start, path, blocked, planner):
+        """Обійти клітинки blocked (інші роботи) на маршруті локальними вставками A* (planner — GridPlanner).
+
+        Вершини, розкриті вставками й вирівнюванням, додаються до self.expansions.
+        """
+        if not path or not blocked:
+            return path
+        width = self._width
+        if not any(y * width + x in blocked for x, y in path[:-1]):
+            return path  # маршрут вільний, а вирівняв його ще find_path
+        last = len(path) - 1
+        repaired = []
+        previous = start
+        i = 0
+        while i <= last:
+            x, y = path[i]
+            if i == last or y * width + x not in blocked:
+                repaired.append(path[i])
+                previous = path[i]
+                i += 1
+                continue
+            # Перша вільна клітинка маршруту після заблокованої ділянки (ціль вважається вільною)
+            j = i
+            while j < last and path[j][1] * width + path[j][0] in blocked:
+                j += 1
+            detour = planner.find_path(previous, path[j], blocked)
+            self.expansions += planner.expansions
+            if not detour:
+                # Точку за перешкодою теж оточили — решту маршруту шукаємо звичайним A*
+                rest = planner.find_path(previous, path[-1], blocked)
+                self.expansions += planner.expansions
+                return repaired + rest if rest else []
+            repaired.extend(detour)
+            previous = path[j]
+            i = j + 1
+        # Вставки шукались кожна окремо — вирівнюємо маршрут цілком
+        width = self._width
+        goal = path[-1]
+        return self._smooth(start[1] * width + start[0], goal[1] * width + goal[0], repaired, blocked)
+
+
+_hierarchies = {}
+_hierarchies_lock = Lock()
+
+
+def get_hierarchy(grid, cluster_size=10):
+    """Спільний для всіх роботів ієрархічний планувальник для цієї карти"""
+    with _hierarchies_lock:
+        planner = _hierarchies.get((id(grid), cluster_size))
+        if planner is None or planner.grid is not grid:
+            planner = _hierarchies[(id(grid), cluster_size)] = HierarchicalPlanner(grid, cluster_size)
+        return planner
@@ -0,0 +1,367 @@
+from heapq import heappush, heappop
+
+from logic.grid import FREE
+
+
+def manhattan(a, b):
+    """Манхеттенська відстань — точна нижня оцінка для руху в 4 напрямках (DIRECTIONS_4)"""
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+class GridPlanner:
+    """Пошук шляху по StaticGrid за плоским індексом клітинок (idx = y * width + x).
+
+    Масиви g-оцінок і батьків виділяються один раз і перевикористовуються між
+    викликами: значення в клітинці дійсне лише тоді, коли її мітка покоління
+    дорівнює поточному пошуку, тому очищати масиви перед пошуком не потрібно.
+    Один планувальник не можна використовувати з кількох потоків одночасно.
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+        self._size = 0
+        self._generation = 0
+        self.expansions = 0  # скільки вершин розкрив останній пошук
+        self._padded = None  # статична карта з рамкою для JPS
+        self._padded_key = None
+        self._allocate()
+
+    def _allocate(self):
+        size = self.grid.width * self.grid.height
+        self._g = [0] * size
+        self._parent = [-1] * size
+        self._seen = [0] * size  # покоління, в якому клітинку вперше досягли
+        self._closed = [0] * size  # покоління, в якому клітинку розкрили
+        self._size = size
+        self._generation = 0
+
+    def find_path(self, start, goal, blocked=None, algorithm="a_star"):
+        """Найкоротший шлях від start до goal (без start).
+
+        blocked — множина плоских індексів, зайнятих іншими роботами; ціль
+        ніколи не вважається зайнятою. algorithm: "a_star", "dijkstra" або
+        "jps" (Jump Point Search). Повертає [] якщо шляху немає або start == goal.
+        """
+        grid = self.grid
+        width = grid.width
+        height = grid.height
+        if width * height != self._size:
+            self._allocate()
+        self.expansions = 0
+
+        sx, sy = start
+        gx, gy = goal
+        if not (0 <= gx < width and 0 <= gy < height) or not (0 <= sx < width and 0 <= sy < height):
+            return []
+        start_idx = sy * width + sx
+        goal_idx = gy * width + gx
+        if start_idx == goal_idx:
+            return []
+        if algorithm == "jps":
+            return self._jump_point_search(start_idx, goal_idx, blocked or ())
+
+        self._generation += 1
+        generation = self._generation
+        cells = grid.cells
+        g_score = self._g
+        parent = self._parent
+        seen = self._seen
+        closed = self._closed
+        blocked = blocked or ()
+        use_heuristic = algorithm != "dijkstra"
+        last_row = (height - 1) * width
+
+        g_score[start_idx] = 0
+        parent[start_idx] = -1
+        seen[start_idx] = generation
+        h = (abs(sx - gx) + abs(sy - gy)) if use_heuristic else 0
+        frontier = [(h, h, start_idx)]
+        expansions = 0
+
+        while frontier:
+            _, _, current = heappop(frontier)
+            if closed[current] == generation:
+                continue  # застарілий запис у купі
+            closed[current] = generation
+            expansions += 1
+            if current == goal_idx:
+                break
+
+            cx = current % width
+            new_g = g_score[current] + 1
+            # вверх, вправо, вниз, влево — як DIRECTIONS_4
+            for nxt, valid in (
+                (current - width, current >= width),
+                (current + 1, cx < width - 1),
+                (current + width, current < last_row),
+                (current - 1, cx > 0),
+            ):
+                if not valid or closed[nxt] == generation:
+                    continue
+                if nxt != goal_idx and (cells[nxt] != FREE or nxt in blocked):
+                    continue
+                if seen[nxt] == generation and new_g >= g_score[nxt]:
+                    continue
+                seen[nxt] = generation
+                g_score[nxt] = new_g
+                parent[nxt] = current
+                if use_heuristic:
+                    h = abs(nxt % width - gx) + abs(nxt // width - gy)
+                else:
+                    h = 0
+                heappush(frontier, (new_g + h, h, nxt))
+
+        self.expansions = expansions
+        if closed[goal_idx] != generation:
+            return []  # шляху немає
+
+        path = []
+        current = goal_idx
+        while current != start_idx:
+            path.append((current % width, current // width))
+            current = parent[current]
+        path.reverse()
+        return path
+
+    def _padded_cells(self):
+        """Прохідність статичної карти з рамкою в одну клітинку (1 — вільно), кешується за версією"""
+        grid = self.grid
+        key = (grid.width, grid.height, grid.version)
+        if self._padded_key != key:
+            width = grid.width
+            padded_width = width + 2
+            free_table = bytes([1] + [0] * 255)  # FREE -> 1, усе інше -> 0
+            padded = bytearray(padded_width * (grid.height + 2))
+            for y in range(grid.height):
+                row = grid.cells[y * width:(y + 1) * width].translate(free_table)
+                start = (y + 1) * padded_width + 1
+                padded[start:start + width] = row
+            self._padded = padded
+            self._padded_key = key
+        return self._padded
+
+    def _jump_point_search(self, start_idx, goal_idx, blocked):
+        """Jump Point Search для 4-зв'язної сітки: A*, що розкриває лише точки стрибка.
+
+        Працює на копії карти з рамкою, тому сканування не перевіряє межі сітки.
+        """
+        width = self.grid.width
+        pw = width + 2  # ширина карти з рамкою
+
+        def pad(idx):
+            return (idx // width + 1) * pw + idx % width + 1
+
+        open_cells = bytearray(self._padded_cells())
+        for idx in blocked:
+            open_cells[pad(idx)] = 0
+        goal = pad(goal_idx)
+        start = pad(start_idx)
+        open_cells[goal] = 1
+        gx, gy = goal % pw, goal // pw
+
+        def jump_horizontal(p, d):
+            row_start = p - p % pw
+            goal_in_row = row_start <= goal < row_start + pw
+            while True:
+                if not open_cells[p]:
+                    return -1
+                if p == goal:
+                    return p
+                # Вимушений сусід: збоку відкрилась клітинка, закрита на попередньому кроці
+                if (open_cells[p - pw] and not open_cells[p - pw - d]) or \
+                        (open_cells[p + pw] and not open_cells[p + pw - d]):
+                    return p
+                # Перескакуємо (пошуком у bytearray) до наступної клітинки, де щось може змінитись:
+                # стіна в цьому ряду, кінець закритої ділянки в сусідньому ряду або ціль
+                if d == 1:
+                    wall = open_cells.find(0, p, row_start + pw)
+                    nxt = wall
+                    for side in (-pw, pw):
+                        closed_at = open_cells.find(0, p + side, wall + side)
+                        if closed_at >= 0:
+                            reopened = open_cells.find(1, closed_at, wall + side)
+                            if reopened >= 0 and reopened - side < nxt:
+                                nxt = reopened - side
+                    if goal_in_row and p < goal < nxt:
+                        nxt = goal
+                else:
+                    wall = open_cells.rfind(0, row_start, p)
+                    nxt = wall
+                    for side in (-pw, pw):
+                        closed_at = open_cells.rfind(0, wall + side + 1, p + side + 1)
+                        if closed_at >= 0:
+                            reopened = open_cells.rfind(1, wall + side + 1, closed_at)
+                            if reopened >= 0 and reopened - side > nxt:
+                                nxt = reopened - side
+                    if goal_in_row and nxt < goal < p:
+                        nxt = goal
+                p = nxt
+
+        def jump_vertical(p, d):
+            while True:
+                if not open_cells[p]:
+                    return -1
+                if p == goal:
+                    return p
+                if (open_cells[p - 1] and not open_cells[p - 1 - d]) or \
+                        (open_cells[p + 1] and not open_cells[p + 1 - d]):
+                    return p
+                # Під час вертикального руху точкою стрибка є й клітинка, звідки видно горизонтальну
+                if (open_cells[p + 1] and jump_horizontal(p + 1, 1) >= 0) or \
+                        (open_cells[p - 1] and jump_horizontal(p - 1, -1) >= 0):
+                    return p
+                p += d
+
+        g_score = {start: 0}
+        parent = {start: -1}
+        closed = set()
+        h = abs(start % pw - gx) + abs(start // pw - gy)
+        frontier = [(h, h, start)]
+        expansions = 0
+
+        while frontier:
+            _, _, current = heappop(frontier)
+            if current in closed:
+                continue
+            closed.add(current)
+            expansions += 1
+            if current == goal:
+                break
+
+            came_from = parent[current]
+            if came_from < 0:
+                steps = (-pw, 1, pw, -1)
+            else:
+                delta = current - came_from
+                if -pw < delta < pw:
+                    d = 1 if delta > 0 else -1
+                    steps = (d, -pw, pw)
+                else:
+                    d = pw if delta > 0 else -pw
+                    steps = (d, -1, 1)
+
+            for d in steps:
+                if not open_cells[current + d]:
+                    continue
+                if d == 1 or d == -1:
+                    jump = jump_horizontal(current + d, d)
+                else:
+                    jump = jump_vertical(current + d, d)
+                if jump < 0 or jump in closed:
+                    continue
+                jx, jy = jump % pw, jump // pw
+                new_g = g_score[current] + abs(jx - current % pw) + abs(jy - current // pw)
+                if new_g >= g_score.get(jump, new_g + 1):
+                    continue
+                g_score[jump] = new_g
+                parent[jump] = current
+                h = abs(jx - gx) + abs(jy - gy)
+                heappush(frontier, (new_g + h, h, jump))
+
+        self.expansions = expansions
+        if goal not in closed:
+            return []
+
+        # Розгортаємо відрізки між точками стрибка в покроковий шлях (без рамки)
+        path = []
+        current = goal
+        while current != start:
+            previous = parent[current]
+            x, y = current % pw, current // pw
+            px, py = previous % pw, previous // pw
+            dx = (px > x) - (px < x)
+            dy = (py > y) - (py < y)
+            while (x, y) != (px, py):
+                path.append((x - 1, y - 1))
+                x += dx
+                y += dy
+            current = previous
+        path.reverse()
+        return path
+
+    def find_timed_path(self, start, goal, start_time, table, robot_id, max_steps=None):
+        """Cooperative A*: шлях у просторі-часі навколо резервувань інших роботів.
+
+        table — ReservationTable; крім руху в 4 напрямках робот може чекати на місці.
+        Повертає [((x, y), такт), ...] починаючи зі start у такт start_time,
+        або [] якщо за max_steps тактів дістатися цілі не вдалося.
+        """
+        grid = self.grid
+        width = grid.width
+        height = grid.height
+        sx, sy = start
+        gx, gy = goal
+        if not (0 <= gx < width and 0 <= gy < height) or not (0 <= sx < width and 0 <= sy < height):
+            return []
+        start_idx = sy * width + sx
+        goal_idx = gy * width + gx
+        cells = grid.cells
+        last_row = (height - 1) * width
+        # Поки в цілі стоїть інший робот, зупинитись там не вийде за жодного розкладу
+        owner = table.parked_by(goal_idx)
+        if owner is not None and owner != robot_id:
+            self.expansions = 0
+            return []
+
+        if max_steps is None:
+            # Без статичного шляху немає сенсу перебирати очікування
+            static_path = self.find_path(start, goal)
+            if not static_path and start_idx != goal_idx:
+                return []
+            max_steps = 2 * len(static_path) + 20
+
+        start_state = (start_idx, start_time)
+        parents = {start_state: None}
+        h = abs(sx - gx) + abs(sy - gy)
+        frontier = [(h, h, start_idx, start_time)]
+        closed = set()
+        expansions = 0
+        found = None
+
+        while frontier:
+            _, _, current, t = heappop(frontier)
+            state = (current, t)
+            if state in closed:
+                continue
+            closed.add(state)
+            expansions += 1
+            if current == goal_idx and table.can_park(current, t, robot_id):
+                found = state
+                break
+            if t - start_time >= max_steps:
+                continue
+
+            cx = current % width
+            for nxt, valid in (
+                (current, True),  # чекати на місці
+                (current - width, current >= width),
+                (current + 1, cx < width - 1),
+                (current + width, current < last_row),
+                (current - 1, cx > 0),
+            ):
+                if not valid:
+                    continue
+                if nxt != current and nxt != goal_idx and cells[nxt] != FREE:
+                    continue
+                next_state = (nxt, t + 1)
+                # g однозначно визначається тактом, тож перший запис — найкращий
+                if next_state in parents:
+                    continue
+                if not table.can_move(current, nxt, t, robot_id):
+                    continue
+                parents[next_state] = state
+                h = abs(nxt % width - gx) + abs(nxt // width - gy)
+                heappush(frontier, (t + 1 - start_time + h, h, nxt, t + 1))
+
+        self.expansions = expansions
+        if found is None:
+            return []
+
+        path = []
+        state = found
+        while state is not None:
+            idx, t = state
+            path.append(((idx % width, idx // width), t))
+            state = parents[state]
+        path.reverse()
+        return path
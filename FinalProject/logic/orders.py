@@ -1,20 +1,22 @@
 import random
 from datetime import datetime
 
-import random
+from db.connection import get_backend
+from db.inventory import inventory
+from db.shelves import shelf_allocator
+from logic.events import events
+
+# Скільки id підставляти в один IN (SQL Server приймає до 2100 параметрів)
+CLEAR_CHUNK = 1000
 
 def generate_random_order(conn):
     cursor = conn.cursor()
 
     #Створюємо нове замовлення та одразу отримуємо його ID
     status = 'pending'
-    cursor.execute("""
-        INSERT INTO orders (created_at, status)
-        OUTPUT INSERTED.id
-        VALUES (GETDATE(), ?)
-    """, (status,))
-    result = cursor.fetchone()
-    order_id = int(result[0]) if result else None
+    created_at = datetime.now().replace(microsecond=0)
+    result = get_backend().insert_returning_ids(cursor, "orders", ("created_at", "status"), [(created_at, status)])
+    order_id = result[0] if result else None
 
     if not order_id:
         print("Помилка: не вдалося отримати ID створеного замовлення.")
@@ -24,7 +26,7 @@ def generate_random_order(conn):
 
     #Отримуємо всі доступні товари
     cursor.execute("SELECT id FROM items")
-    items = [row.id for row in cursor.fetchall()]
+    items = [row[0] for row in cursor.fetchall()]
 
     if not items:
         print("У таблиці товарів (items) немає записів.")
@@ -42,87 +44,100 @@ def generate_random_order(conn):
         """, (order_id, item_id, quantity))
 
     conn.commit()
+    events.publish("order", order_id, status="pending")
     print(f"До замовлення №{order_id} додано {num_items} позицій.")
 
 
-def process_order(conn, order_id):
-    cursor = conn.cursor()
+def process_orders(conn, order_ids):
+    """Виконати одразу кілька замовлень кількома пакетними запитами.
 
-    #Отримати всі товари з замовлення
-    cursor.execute("""
-        SELECT item_id, quantity FROM order_items
-        WHERE order_id = ?
-    """, (order_id,))
-    items = cursor.fetchall()
-
-    for item in items:
-        item_id = item[0]
-        qty_needed = item[1]
+    Товар і полиці резервуються в пам'яті (індекс залишків і розподільник
+    полиць) для всіх замовлень, і лише потім пишуться в БД через executemany
+    однією короткою транзакцією. Як і раніше, кожна взята з палети частина
+    кладеться на окрему вільну полицю. Повертає підсумок: скільки замовлень,
+    позицій, одиниць і полиць, а також недостачу товару по замовленнях.
+    """
+    order_ids = list(order_ids)
+    summary = {"orders": 0, "lines": 0, "units": 0, "shelves": 0, "short": {}}
+    if not order_ids:
+        return summary
+    cursor = conn.cursor()
 
-        #Знайти потрібний товар на палетах
-        cursor.execute("""
-            SELECT id, location_id, quantity FROM inventory
-            WHERE item_id = ? AND location_type = 'pallet'
-            ORDER BY quantity DESC
-        """, (item_id,))
-        sources = cursor.fetchall()
-
-        for source in sources:
-            if qty_needed <= 0:
-                break
-
-            source_id = source[0]
-            location_id = source[1]
-            available = source[2]
-            take = min(available, qty_needed)
-
-            #Зменшити кількість на палеті
-            new_qty = available - take
-            if new_qty > 0:
-                cursor.execute("UPDATE inventory SET quantity = ? WHERE id = ?", (new_qty, source_id))
-            else:
-                cursor.execute("DELETE FROM inventory WHERE id = ?", (source_id,))
-
-            qty_needed -= take
-
-            #Знайти вільну полицю
-            cursor.execute("""
-                SELECT id FROM shelves
-                WHERE status = 'free'
-                ORDER BY id
-            """)
-            shelf = cursor.fetchone()
+    #Отримати всі товари з усіх замовлень одним запитом
+    cursor.execute(f"""
+        SELECT order_id, item_id, quantity FROM order_items
+        WHERE order_id IN ({", ".join("?" * len(order_ids))})
+        ORDER BY order_id, id
+    """, order_ids)
+    lines = cursor.fetchall()
+    summary["lines"] = len(lines)
+
+    #Зарезервувати товар на палетах (з індексу залишків, від найбільшого)
+    owner = ("orders", tuple(order_ids))  # під цим власником резервуються товар і полиці
+    plan = inventory.reserve_many(owner, [(item_id, quantity) for _, item_id, quantity in lines])
+
+    #Кожній взятій частині — своя вільна полиця (з найменшим id, без запиту до БД)
+    taken = []  # (рядок inventory, кількість)
+    placed = []  # (item_id, shelf_id, кількість, x, y, order_id)
+    codes = {}  # shelf_id: shelf_code
+    for (order_id, item_id, _), (parts, missing) in zip(lines, plan):
+        if missing:
+            summary["short"][order_id] = summary["short"].get(order_id, 0) + missing
+        for row_id, take in parts:
+            shelf = shelf_allocator.allocate(owner)
             if not shelf:
                 print("Немає вільних полиць!")
-                conn.rollback()
-                return
-
-            shelf_id = shelf[0]
-
-            #Покласти товар на полицю
-            cursor.execute("""
-                INSERT INTO inventory (item_id, location_type, location_id, quantity)
-                VALUES (?, 'shelf', ?, ?)
-            """, (item_id, shelf_id, take))
+                inventory.release(owner)
+                shelf_allocator.release_owner(owner)
+                return summary
+            shelf_id, codes[shelf_id], x, y = shelf
+            taken.append((row_id, take))
+            placed.append((item_id, shelf_id, take, x, y, order_id))
+
+    #Записати все пакетами: списання з палет, товар на полицях, полиці, замовлення
+    try:
+        inventory.write_taken_many(cursor, taken)
+        cursor.executemany("""
+            INSERT INTO inventory (item_id, location_type, location_id, quantity, x, y)
+            VALUES (?, 'shelf', ?, ?, ?, ?)
+        """, [(item_id, shelf_id, take, x, y) for item_id, shelf_id, take, x, y, _ in placed])
+        cursor.executemany("""
+            UPDATE shelves
+            SET status = 'busy', current_order_id = ?
+            WHERE id = ?
+        """, [(order_id, shelf_id) for _, shelf_id, _, _, _, order_id in placed])
+        cursor.executemany("UPDATE orders SET status = 'done' WHERE id = ?", [(order_id,) for order_id in order_ids])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        inventory.release(owner)
+        shelf_allocator.release_owner(owner)
+        raise
+    inventory.apply_taken(taken, owner)
+    shelf_allocator.commit_owner(owner)
+    for _, shelf_id, _, _, _, order_id in placed:
+        events.publish("shelf", shelf_id, status="busy", code=codes[shelf_id], order_id=order_id)
+    for order_id in order_ids:
+        events.publish("order", order_id, status="done")
+
+    summary["orders"] = len(order_ids)
+    summary["units"] = sum(take for _, take in taken)
+    summary["shelves"] = len(placed)
+    return summary
 
-            #Оновити полицю
-            cursor.execute("""
-                UPDATE shelves
-                SET status = 'busy', current_order_id = ?
-                WHERE id = ?
-            """, (order_id, shelf_id))
 
-    #Завершити замовлення
-    cursor.execute("UPDATE orders SET status = 'done' WHERE id = ?", (order_id,))
-    conn.commit()
-    print(f"Замовлення #{order_id} виконано")
+def process_order(conn, order_id):
+    summary = process_orders(conn, [order_id])
+    if summary["orders"]:
+        print(f"Замовлення #{order_id} виконано")
+    return summary
 
 def clear_shelf(conn, shelf_id):
     cursor = conn.cursor()
 
     # Отримуємо замовлення, яке прив'язане до полиці
     cursor.execute("""
-        SELECT current_order_id FROM shelves WHERE id = ?
+        SELECT current_order_id, shelf_code FROM shelves WHERE id = ?
     """, (shelf_id,))
     result = cursor.fetchone()
 
@@ -130,7 +145,7 @@ def clear_shelf(conn, shelf_id):
         print(f"Полиця #{shelf_id} не пов'язана з жодним замовленням.")
         return
 
-    order_id = result[0]
+    order_id, shelf_code = result
 
     # Видаляємо товари з inventory, які на цій полиці
     cursor.execute("""
@@ -162,28 +177,76 @@ def clear_shelf(conn, shelf_id):
         print(f"Замовлення #{order_id} повністю вивантажено.")
 
     conn.commit()
+    shelf_allocator.free(shelf_id)
+    events.publish("shelf", shelf_id, status="free", code=shelf_code, order_id=None)
+    if remaining == 0:
+        events.publish("order", order_id, status="completed")
     print(f"Полиця #{shelf_id} очищена.")
 
 
-def clear_all_shelves_for_order(conn, order_id):
+def clear_orders(conn, order_ids):
+    """Видати кур'єру кілька замовлень одразу: звільнити всі їхні полиці однією транзакцією.
+
+    Товар з полиць видаляється, полиці стають вільними, а замовлення, що
+    займали полиці, — 'completed'. Запити множинні (IN по частинах
+    CLEAR_CHUNK id), а не по одній полиці. Звільнені полиці повертаються
+    в shelf_allocator. Повертає список їхніх id.
+    """
+    order_ids = list(order_ids)
     cursor = conn.cursor()
 
-    #Знайти всі полиці, прив'язані до цього замовлення
-    cursor.execute("""
-        SELECT id FROM shelves
-        WHERE current_order_id = ?
-    """, (order_id,))
-    shelf_ids = [row[0] for row in cursor.fetchall()]
+    #Знайти всі полиці цих замовлень
+    shelves = []
+    for chunk in _chunks(order_ids):
+        cursor.execute(f"""
+            SELECT id, current_order_id, shelf_code FROM shelves
+            WHERE current_order_id IN ({", ".join("?" * len(chunk))})
+        """, chunk)
+        shelves.extend(cursor.fetchall())
+    if not shelves:
+        return []
+    shelf_ids = sorted(shelf_id for shelf_id, _, _ in shelves)
+    cleared = sorted({order_id for _, order_id, _ in shelves})
+
+    try:
+        for chunk in _chunks(shelf_ids):
+            marks = ", ".join("?" * len(chunk))
+            cursor.execute(f"""
+                DELETE FROM inventory
+                WHERE location_type = 'shelf' AND location_id IN ({marks})
+            """, chunk)
+            cursor.execute(f"""
+                UPDATE shelves
+                SET status = 'free', current_order_id = NULL
+                WHERE id IN ({marks})
+            """, chunk)
+        for chunk in _chunks(cleared):
+            cursor.execute(f"UPDATE orders SET status = 'completed' WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    shelf_allocator.free_many(shelf_ids)
+    for shelf_id, _, shelf_code in sorted(shelves):
+        events.publish("shelf", shelf_id, status="free", code=shelf_code, order_id=None)
+    for order_id in cleared:
+        events.publish("order", order_id, status="completed")
+    return shelf_ids
+
+
+def _chunks(ids):
+    for start in range(0, len(ids), CLEAR_CHUNK):
+        yield ids[start:start + CLEAR_CHUNK]
+
+
+def clear_all_shelves_for_order(conn, order_id):
+    shelf_ids = clear_orders(conn, [order_id])
 
     if not shelf_ids:
         print(f"Немає полиць для замовлення #{order_id}.")
         return
 
-    print(f"Очищення {len(shelf_ids)} полиць для замовлення #{order_id}:")
-
-    for shelf_id in shelf_ids:
-        clear_shelf(conn, shelf_id) 
-
+    print(f"Очищено {len(shelf_ids)} полиць для замовлення #{order_id}.")
     print(f"Замовлення #{order_id} повністю видане.")
 
 
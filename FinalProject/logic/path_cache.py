@@ -0,0 +1,93 @@
+from collections import OrderedDict
+from threading import Lock
+
+import config
+
+
+class PathCache:
+    """LRU-кеш маршрутів за ключем (старт, ціль, версія планування складу).
+
+    Кеш належить одній карті (get_path_cache): версії різних StaticGrid
+    починаються з 0, тож спільний кеш видав би маршрут чужого планування.
+    Статичні перешкоди враховані версією карти; динамічні (інші роботи)
+    перевіряються при кожному зверненні — якщо кешований маршрут зараз
+    перекритий, це промах, але сам запис залишається в кеші.
+    """
+
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self._paths = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.blocked = 0  # промахи через те, що кешований маршрут перекрито
+        self.evictions = 0
+
+    def get(self, start, goal, version, is_blocked=None):
+        """Кешований маршрут (копія) або None.
+
+        is_blocked(cell) — перевірка динамічної зайнятості; ціль не перевіряється.
+        """
+        key = (start, goal, version)
+        with self._lock:
+            path = self._paths.get(key)
+            if path is None:
+                self.misses += 1
+                return None
+            self._paths.move_to_end(key)
+        if is_blocked is not None:
+            for cell in path[:-1]:
+                if is_blocked(cell):
+                    with self._lock:
+                        self.misses += 1
+                        self.blocked += 1
+                    return None
+        with self._lock:
+            self.hits += 1
+        return list(path)
+
+    def put(self, start, goal, version, path):
+        key = (start, goal, version)
+        with self._lock:
+            self._paths[key] = tuple(path)
+            self._paths.move_to_end(key)
+            while len(self._paths) > self.max_size:
+                self._paths.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._paths.clear()
+
+    def stats(self):
+        """Лічильники для підбору розміру кешу"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._paths),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "blocked": self.blocked,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_caches = {}  # id(grid): (grid, кеш)
+_caches_lock = Lock()
+
+
+def get_path_cache(grid):
+    """Спільний для всіх роботів кеш маршрутів для цієї карти"""
+    with _caches_lock:
+        entry = _caches.get(id(grid))
+        if entry is None or entry[0] is not grid:
+            entry = _caches[id(grid)] = (grid, PathCache(config.PATH_CACHE_SIZE))
+        return entry[1]
+
+
+def clear_path_caches():
+    """Забути кеші маршрутів усіх карт (наступний get_path_cache створить новий)"""
+    with _caches_lock:
+        _caches.clear()
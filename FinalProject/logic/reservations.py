@@ -0,0 +1,185 @@
+from threading import RLock
+
+
+class ReservationTable:
+    """Таблиця резервувань простір × час для спільного планування роботів.
+
+    Клітинки задаються плоским індексом (y * width + x), час — номером такту.
+    Маршрут робота займає (клітинка, такт) на кожному кроці, перехід між
+    клітинками займає ребро (звідки, куди, такт), а кінцева клітинка
+    залишається за роботом («стоянка») до наступного маршруту.
+    Планування разом із reserve_path варто робити під self.lock, щоб
+    маршрут не застарів між пошуком і резервуванням.
+    """
+
+    def __init__(self):
+        self.lock = RLock()
+        self._cells = {}  # (клітинка, такт): robot_id
+        self._edges = {}  # (звідки, куди, такт): robot_id — рух у проміжку [такт, такт + 1]
+        self._parked = {}  # клітинка: (robot_id, з якого такту)
+        self._last_visit = {}  # клітинка: {robot_id: останній такт, коли робот там буде}
+        self._paths = {}  # robot_id: список (клітинка, такт) його маршруту
+
+    def is_free(self, cell, t, robot_id):
+        """Чи вільна клітинка в такт t для цього робота"""
+        owner = self._cells.get((cell, t))
+        if owner is not None and owner != robot_id:
+            return False
+        parked = self._parked.get(cell)
+        if parked is not None and parked[0] != robot_id and parked[1] <= t:
+            return False
+        return True
+
+    def can_move(self, from_cell, to_cell, t, robot_id):
+        """Чи можна перейти з from_cell у to_cell між тактами t і t + 1 (без зустрічного обміну)"""
+        if not self.is_free(to_cell, t + 1, robot_id):
+            return False
+        if from_cell != to_cell:
+            owner = self._edges.get((to_cell, from_cell, t))
+            if owner is not None and owner != robot_id:
+                return False
+        return True
+
+    def can_park(self, cell, t, robot_id):
+        """Чи може робот залишитись у клітинці з такту t назавжди"""
+        parked = self._parked.get(cell)
+        if parked is not None and parked[0] != robot_id:
+            return False
+        visits = self._last_visit.get(cell)
+        if visits:
+            for owner, last in visits.items():
+                if owner != robot_id and last >= t:
+                    return False
+        return True
+
+    def parked_by(self, cell):
+        """Який робот стоїть у клітинці без обмеження в часі (або None)"""
+        parked = self._parked.get(cell)
+        return parked[0] if parked is not None else None
+
+    def reserve_path(self, robot_id, timed_path):
+        """Атомарно зарезервувати маршрут [(клітинка, такт), ...] з такту старту.
+
+        Старі резервування робота знімаються. Повертає False (нічого не змінюючи),
+        якщо маршрут конфліктує з уже зарезервованими — тоді його треба спланувати заново.
+        """
+        with self.lock:
+            for (cell, t), (next_cell, next_t) in zip(timed_path, timed_path[1:]):
+                if next_t != t + 1 or not self.can_move(cell, next_cell, t, robot_id):
+                    return False
+            last_cell, last_t = timed_path[-1]
+            if not self.can_park(last_cell, last_t, robot_id):
+                return False
+
+            self.release(robot_id)
+            for cell, t in timed_path:
+                self._cells[(cell, t)] = robot_id
+                self._last_visit.setdefault(cell, {})[robot_id] = t
+            for (cell, t), (next_cell, _) in zip(timed_path, timed_path[1:]):
+                if cell != next_cell:
+                    self._edges[(cell, next_cell, t)] = robot_id
+            self._parked[last_cell] = (robot_id, last_t)
+            self._paths[robot_id] = list(timed_path)
+            return True
+
+    def park(self, robot_id, cell, t):
+        """Зафіксувати, що робот стоїть у клітинці з такту t (наприклад, при старті)"""
+        return self.reserve_path(robot_id, [(cell, t)])
+
+    def release(self, robot_id):
+        """Зняти всі резервування робота"""
+        with self.lock:
+            for cell, t in self._paths.pop(robot_id, ()):
+                if self._cells.get((cell, t)) == robot_id:
+                    del self._cells[(cell, t)]
+                visits = self._last_visit.get(cell)
+                if visits and visits.pop(robot_id, None) is not None and not visits:
+                    del self._last_visit[cell]
+                parked = self._parked.get(cell)
+                if parked is not None and parked[0] == robot_id:
+                    del self._parked[cell]
+            stale = [edge for edge, owner in self._edges.items() if owner == robot_id]
+            for edge in stale:
+                del self._edges[edge]
+
+    def clear(self):
+        """Зняти резервування всіх роботів"""
+        with self.lock:
+            self._cells.clear()
+            self._edges.clear()
+            self._parked.clear()
+            self._last_visit.clear()
+            self._paths.clear()
+
+    def path_of(self, robot_id):
+        """Зарезервований маршрут робота [(клітинка, такт), ...]"""
+        with self.lock:
+            return list(self._paths.get(robot_id, ()))
+
+    def prune(self, before_t):
+        """Забути резервування тактів, що вже минули (стоянки залишаються)"""
+        with self.lock:
+            for key in [key for key in self._cells if key[1] < before_t]:
+                del self._cells[key]
+            for key in [key for key in self._edges if key[2] < before_t]:
+                del self._edges[key]
+            for robot_id, path in self._paths.items():
+                kept = [step for step in path if step[1] >= before_t] or path[-1:]
+                kept_cells = {cell for cell, _ in kept}
+                # release() прибирає відвідини лише за маршрутом — пройдені клітинки забуваємо тут
+                for cell, _ in path[:len(path) - len(kept)]:
+                    visits = self._last_visit.get(cell)
+                    if cell not in kept_cells and visits and visits.pop(robot_id, None) is not None and not visits:
+                        del self._last_visit[cell]
+                self._paths[robot_id] = kept
+
+
+def find_conflicts(paths):
+    """Знайти конфлікти між маршрутами {agent: [(клітинка, такт), ...]}.
+
+    Повертає список кортежів:
+      ("vertex", a, b, клітинка, такт) — два агенти в одній клітинці в один такт;
+      ("edge", a, b, (u, v), такт) — агенти міняються місцями між тактами t і t + 1.
+    Після останнього кроку агент вважається таким, що стоїть у своїй цілі.
+    """
+    conflicts = []
+    agents = list(paths)
+    if not agents:
+        return conflicts
+    horizon = max(path[-1][1] for path in paths.values() if path)
+    starts = {agent: path[0][1] for agent, path in paths.items() if path}
+
+    def position(agent, t):
+        path = paths[agent]
+        offset = t - starts[agent]
+        if offset < 0:
+            return path[0][0]
+        if offset >= len(path):
+            return path[-1][0]
+        return path[offset][0]
+
+    t0 = min(starts.values())
+    for t in range(t0, horizon + 1):
+        occupied = {}
+        for agent in agents:
+            if not paths[agent]:
+                continue
+            cell = position(agent, t)
+            other = occupied.get(cell)
+            if other is not None:
+                conflicts.append(("vertex", other, agent, cell, t))
+            else:
+                occupied[cell] = agent
+        if t == horizon:
+            break
+        moves = {}
+        for agent in agents:
+            if not paths[agent]:
+                continue
+            u, v = position(agent, t), position(agent, t + 1)
+            if u != v:
+                other = moves.get((v, u))
+                if other is not None:
+                    conflicts.append(("edge", other, agent, (u, v), t))
+                moves[(u, v)] = agent
+    return conflicts
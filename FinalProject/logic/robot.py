@@ -1,11 +1,22 @@
 import time
 import math
-import heapq
 import random
 from collections import deque
 from threading import Thread, Lock
 
-from db.connection import get_connection
+import config
+from db.connection import db_connection, get_backend
+from db.inventory import inventory
+from db.shelves import shelf_allocator
+from db.telemetry import telemetry
+from logic.events import events
+from logic.grid import FREE, PALLET, SHELF, DynamicOccupancy, get_static_grid
+from logic.distance_fields import get_distance_fields
+from logic.path_cache import clear_path_caches, get_path_cache
+from logic.hierarchy import get_hierarchy
+from logic.navigator import GridPlanner
+from logic.reservations import ReservationTable
+from logic.waves import plan_trips
 
 # Пути для обхода (8 направлений)
 DIRECTIONS = [
@@ -27,20 +38,47 @@ DIRECTIONS_4 = [
     (-1, 0),  # влево
 ]
 
+# Результат кроків руху: маршрут застарів, move_to_steps має спланувати його заново
+REPLAN = "replan"
+
+# Спільна для всіх роботів динамічна зайнятість клітинок
+occupancy = DynamicOccupancy()
 # Глобальная блокировка для избежания конфликтов при резервировании клеток
-grid_lock = Lock()
-reserved_cells = {}  # координаты (x, y): robot_id
+grid_lock = occupancy.lock
+reserved_cells = occupancy.reserved  # координаты (x, y): robot_id
 # Новое: глобальный словарь для отслеживания целей роботов
-robot_destinations = {}  # robot_id: (x, y)
+robot_destinations = occupancy.destinations  # robot_id: (x, y)
+# Спільна таблиця резервувань простір × час (запланованих маршрутів усіх роботів)
+reservations = ReservationTable()
+
+
+def reset_fleet_state():
+    """Забути зайнятість, резервування й кеші маршрутів попереднього запуску"""
+    occupancy.clear()
+    reservations.clear()
+    clear_path_caches()
+
 
 class RobotNavigator:
-    def __init__(self, robot_id, grid_width, grid_height, shelf_coords, pallet_coords, charging_station):
+    def __init__(self, robot_id, grid_width, grid_height, shelf_coords, pallet_coords, charging_station,
+                 delivery_zone=None):
         self.robot_id = robot_id
         self.grid_width = grid_width
         self.grid_height = grid_height
         self.shelf_coords = shelf_coords
         self.pallet_coords = pallet_coords
         self.charging_station = charging_station
+        self.delivery_zone = delivery_zone
+        # Полиці та палети, позначені один раз у bytearray
+        self.static_grid = get_static_grid(grid_width, grid_height, shelf_coords, pallet_coords)
+        self.planner = GridPlanner(self.static_grid)  # буфери пошуку шляху цього робота
+        # Спільний для карти кеш маршрутів: роботи постійно повторюють ті самі поїздки
+        self.path_cache = get_path_cache(self.static_grid)
+        # Ієрархічний планувальник (HPA*) будується лише для великих складів, при першому запиті
+        self.hierarchy = None
+        # Справжні відстані проїзду до палет, зарядки та зони видачі (поля рахуються при першому зверненні)
+        self.distance_fields = get_distance_fields(self.static_grid)
+        self.distance_fields.declare(self.points_of_interest())
         self.path = []
         self.current_task = None
         self.destination = None
@@ -54,60 +92,65 @@ class RobotNavigator:
         self.planned_path_lock = Lock()  # блокіровка для оновлення запланованого путі
         self.planned_path = []  # запланований путь для у інших роботів
         self.pathfinding_algorithm = "a_star"  # По умолчанию A*
-        # Доступные опции: "a_star", "dijkstra", "auto"
+        # Доступные опции: "a_star", "dijkstra", "jps", "hpa", "auto"
+        # ("auto" — HPA* на складах від config.HPA_MIN_CELLS клітинок, інакше A*)
+        # Планувати маршрут у просторі-часі з урахуванням маршрутів інших роботів
+        self.cooperative_planning = True
+        self.step_time = 0.7  # тривалість одного кроку (такту), с
+        self.plan_retries = 10  # скільки тактів чекати на маршрут, перш ніж їхати без розкладу
+        # Годинник і очікування: у симуляції (simulation/engine.py) час віртуальний
+        self.clock = time.monotonic
+        self.poll_interval = 1  # як часто вільний робот перевіряє нові замовлення, с
+        self.home_position = (18, 2 + (robot_id - 76))  # куди повертатись, коли замовлень немає
+        self.dispatcher = None  # OrderDispatcher (logic/dispatcher.py); None — робот сам шукає замовлення в БД
+        self.trips = 0  # скільки рейсів палети -> полиці зроблено
+        self.park_here()
         
         # Дополнительные настройки
+        # Статистика пошуку шляху (без звернень до кешу): total_time — с, expansions — розкриті вершини
         self.algorithm_stats = {
-            "a_star": {"calls": 0, "total_time": 0, "avg_path_length": 0},
-            "dijkstra": {"calls": 0, "total_time": 0, "avg_path_length": 0}
+            algorithm: {"calls": 0, "total_time": 0, "avg_path_length": 0, "expansions": 0}
+            for algorithm in ("a_star", "dijkstra", "jps", "hpa")
         }
         
     def get_current_position(self):
-        """Получить текущие координаты робота из БД"""
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT x, y FROM robots WHERE id = ?", (self.robot_id,))
-        position = cursor.fetchone()
-        conn.close()
+        """Получить текущие координаты робота (из буфера телеметрии или из БД)"""
+        position = telemetry.latest(self.robot_id, "position")
+        if position is not None:
+            return position
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT x, y FROM robots WHERE id = ?", (self.robot_id,))
+            position = cursor.fetchone()
         return (position[0], position[1]) if position else (0, 0)
     
     def get_battery_level(self):
         """Получить текущий уровень заряда батареи"""
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT battery FROM robots WHERE id = ?", (self.robot_id,))
-        battery = cursor.fetchone()
-        conn.close()
+        battery = telemetry.latest(self.robot_id, "battery")
+        if battery is not None:
+            return battery
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT battery FROM robots WHERE id = ?", (self.robot_id,))
+            battery = cursor.fetchone()
         return battery[0] if battery else 100
     
     def update_position(self, x, y):
-        """Обновить позицию робота в БД"""
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("UPDATE robots SET x = ?, y = ?, updated_at = GETDATE() WHERE id = ?", 
-                       (x, y, self.robot_id))
-        conn.commit()
-        conn.close()
+        """Обновить позицию робота (в БД запишется пакетом через telemetry)"""
+        telemetry.record(self.robot_id, position=(x, y))
+        events.publish("robot_moved", self.robot_id, position=(x, y))
         self.current_position = (x, y)
     
     def update_status(self, status):
-        """Обновить статус робота в БД"""
+        """Обновить статус робота (в БД запишется пакетом через telemetry)"""
         with self.status_lock:
-            conn = get_connection()
-            cursor = conn.cursor()
-            cursor.execute("UPDATE robots SET status = ?, updated_at = GETDATE() WHERE id = ?", 
-                          (status, self.robot_id))
-            conn.commit()
-            conn.close()
+            telemetry.record(self.robot_id, status=status)
+        events.publish("robot_status", self.robot_id, status=status)
     
     def update_battery(self, level):
-        """Обновить уровень заряда батареи"""
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("UPDATE robots SET battery = ?, updated_at = GETDATE() WHERE id = ?", 
-                      (level, self.robot_id))
-        conn.commit()
-        conn.close()
+        """Обновить уровень заряда батареи (в БД запишется пакетом через telemetry)"""
+        telemetry.record(self.robot_id, battery=level)
+        events.publish("robot_battery", self.robot_id, battery=level)
         self.battery_level = level
     
     def decrease_battery(self, amount=0.2):
@@ -124,10 +167,9 @@ class RobotNavigator:
     
     def is_cell_pallet(self, x, y):
         """Проверить, является ли клетка паллетой"""
-        for pallet_id, coords in self.pallet_coords.items():
-            if coords == (x, y):
-                return True
-        return False
+        if not self.static_grid.in_bounds(x, y):
+            return False
+        return self.static_grid.cell(x, y) == PALLET
     
     def is_cell_occupied(self, x, y):
         """Перевірити, чи зайнята клітинка"""
@@ -135,49 +177,59 @@ class RobotNavigator:
         if x < 0 or x >= self.grid_width or y < 0 or y >= self.grid_height:
             return True
 
-        # Перевірка на зайнятість іншими роботами
-        with grid_lock:
-            if (x, y) in reserved_cells and reserved_cells[(x, y)] != self.robot_id:
-                return True
-                
-            # Нове: перевіряємо, чи не планує інший робот пройти через цю клітинку
-            for robot_id, dest in robot_destinations.items():
-                if robot_id != self.robot_id and dest == (x, y):
-                    return True
-
+        kind = self.static_grid.cells[y * self.static_grid.width + x]
         # Перевірка на палети — НОВЕ: завжди вважаємо, що палети зайняті
-        if self.is_cell_pallet(x, y):
+        if kind == PALLET:
             return True
 
         # Якщо це координати полиці і це не наша ціль — вважається зайнятою
-        for shelf_code, coords in self.shelf_coords.items():
-            if coords == (x, y):
-                if self.destination != (x, y):
-                    return True
+        if kind == SHELF and self.destination != (x, y):
+            return True
 
-        return False
+        # Перевірка на зайнятість іншими роботами (або їхніми цілями)
+        return occupancy.is_blocked((x, y), self.robot_id)
     
     def reserve_cell(self, x, y):
-        """Резервировать клетку для робота"""
-        with grid_lock:
-            if (x, y) not in reserved_cells or reserved_cells[(x, y)] == self.robot_id:
-                reserved_cells[(x, y)] = self.robot_id
-                # Обновляем целевую клетку
-                robot_destinations[self.robot_id] = (x, y)
-                return True
-            return False
+        """Резервировать клетку для робота (и обновить целевую клетку)"""
+        return occupancy.reserve((x, y), self.robot_id)
     
     def release_cell(self, x, y):
         """Освободить клетку"""
-        with grid_lock:
-            if (x, y) in reserved_cells and reserved_cells[(x, y)] == self.robot_id:
-                del reserved_cells[(x, y)]
+        occupancy.release((x, y), self.robot_id)
     
     def heuristic(self, a, b):
         """Евристична функція відстані для A*"""
         # Евклідова відстань
         return math.sqrt((b[0] - a[0]) ** 2 + (b[1] - a[1]) ** 2)
     
+    def points_of_interest(self):
+        """Клітинки, до яких роботи їздять постійно (підходи до полиць — ні, див. find_free_shelf)"""
+        points = list(self.pallet_coords.values())
+        # Вільні клітинки біля палет: з них робот бере товар (find_approach_position_for_pallet)
+        grid = self.static_grid
+        for x, y in self.pallet_coords.values():
+            for dx, dy in DIRECTIONS_4:
+                if grid.in_bounds(x + dx, y + dy) and grid.cell(x + dx, y + dy) == FREE:
+                    points.append((x + dx, y + dy))
+        points.append(self.charging_station)
+        if self.delivery_zone:
+            points.append(self.delivery_zone)
+        return points
+
+    def travel_distance(self, start, target):
+        """Довжина найкоротшого проїзду по статичній карті (з кешу полів відстаней).
+
+        Для цілей, що не є точками інтересу, поле не рахується — повертається
+        манхеттенська відстань (нижня межа довжини проїзду).
+        """
+        if not self.distance_fields.covers(target):
+            return abs(target[0] - start[0]) + abs(target[1] - start[1])
+        distance = self.distance_fields.distance(start, target)
+        if distance is None:
+            # Недосяжні цілі — в кінець черги, але порядок між ними зберігаємо
+            return self.grid_width * self.grid_height + self.heuristic(start, target)
+        return distance
+
     def get_neighbors(self, position, goal=None):
         """Отримати сусідні клітинки для A*. Якщо goal передана — вона не вважається зайнятою."""
         x, y = position
@@ -194,41 +246,18 @@ class RobotNavigator:
         return neighbors
 
     
+    def dynamic_blocked(self):
+        """Плоскі індекси клітинок, які зараз заблоковані іншими роботами"""
+        grid = self.static_grid
+        return {
+            y * grid.width + x
+            for x, y in occupancy.blocked_cells(self.robot_id)
+            if grid.in_bounds(x, y)
+        }
+
     def a_star_search(self, start, goal):
         """Реалізація алгоритму A* без перевірки зайнятості цілі"""
-        frontier = []
-        frontier.append((0, start))
-
-        came_from = {start: None}
-        cost_so_far = {start: 0}
-
-        while frontier:
-            frontier.sort()  # по пріоритету
-            current_cost, current = frontier.pop(0)
-
-            if current == goal:
-                break
-
-            neighbors = self.get_neighbors(current, goal)
-
-            for next_pos in neighbors:
-                new_cost = cost_so_far[current] + 1
-                if next_pos not in cost_so_far or new_cost < cost_so_far[next_pos]:
-                    cost_so_far[next_pos] = new_cost
-                    priority = new_cost + self.heuristic(next_pos, goal)
-                    frontier.append((priority, next_pos))
-                    came_from[next_pos] = current
-
-        # Відновлення шляху
-        path = []
-        current = goal
-        while current != start:
-            path.append(current)
-            if current not in came_from:
-                return []  # шляху немає
-            current = came_from[current]
-        path.reverse()
-        return path
+        return self.planner.find_path(start, goal, self.dynamic_blocked(), algorithm="a_star")
 
     def dijkstra_search(self, start, goal):
         """
@@ -241,67 +270,88 @@ class RobotNavigator:
         Returns:
             list: Список координат пути от start до goal (без start)
         """
-        # Инициализация структур данных
-        distances = {start: 0}  # Расстояния от начальной точки
-        came_from = {start: None}  # Для восстановления пути
-        visited = set()  # Посещенные узлы
-        
-        # Приоритетная очередь: (расстояние, позиция)
-        priority_queue = [(0, start)]
-        
-        while priority_queue:
-            current_distance, current_position = heapq.heappop(priority_queue)
-            
-            # Если уже посетили эту позицию, пропускаем
-            if current_position in visited:
-                continue
-                
-            # Отмечаем как посещенную
-            visited.add(current_position)
-            
-            # Если достигли цели, прекращаем поиск
-            if current_position == goal:
-                break
-            
-            # Проверяем всех соседей
-            neighbors = self.get_neighbors(current_position, goal)
-            
-            for neighbor in neighbors:
-                if neighbor in visited:
-                    continue
-                    
-                # Вычисляем новое расстояние до соседа
-                # В данном случае все переходы имеют вес 1
-                new_distance = current_distance + 1
-                
-                # Если нашли более короткий путь или впервые посещаем этого соседа
-                if neighbor not in distances or new_distance < distances[neighbor]:
-                    distances[neighbor] = new_distance
-                    came_from[neighbor] = current_position
-                    heapq.heappush(priority_queue, (new_distance, neighbor))
-        
-        # Восстановление пути
-        if goal not in came_from:
-            return []  # Путь не найден
-        
-        path = []
-        current = goal
-        
-        while current != start:
-            path.append(current)
-            current = came_from[current]
-            if current is None:  # Защита от бесконечного цикла
-                return []
-    
-        path.reverse()
-        return path
+        return self.planner.find_path(start, goal, self.dynamic_blocked(), algorithm="dijkstra")
     
     def find_path(self, start, goal):
-        """Выбирает и выполняет нужный алгоритм"""
-        if self.pathfinding_algorithm == "dijkstra":
-            return self.dijkstra_search(start, goal)
-        else:  # По умолчанию A*
-            return self.a_star_search(start, goal)
+        """Выбирает и выполняет нужный алгоритм (см. logic/navigator.py), сначала смотрит в кеш"""
+        grid = self.static_grid
+        blocked = self.dynamic_blocked()
+        version = grid.version
+        path = self.path_cache.get(start, goal, version, lambda cell: grid.index(*cell) in blocked)
+        if path is not None:
+            return path
+
+        algorithm = self.pathfinding_algorithm
+        if algorithm == "auto":
+            algorithm = "hpa" if grid.width * grid.height >= config.HPA_MIN_CELLS else "a_star"
+        if algorithm == "hpa":
+            if self.hierarchy is None:
+                self.hierarchy = get_hierarchy(grid, config.HPA_CLUSTER_SIZE)
+            # Інших роботів об'їжджаємо локальними вставками в статичний маршрут. Маршрути HPA*
+            # не кешуємо: вони можуть бути довшими за найкоротші, а кеш спільний для всіх алгоритмів
+            started = time.perf_counter()
+            path = self.hierarchy.find_path(start, goal)
+            path = self.hierarchy.repair(start, path, blocked, self.planner)
+            self.record_search("hpa", time.perf_counter() - started, path, self.hierarchy.expansions)
+            return path
+
+        if algorithm not in ("dijkstra", "jps"):
+            algorithm = "a_star"
+        started = time.perf_counter()
+        path = self.planner.find_path(start, goal, blocked, algorithm=algorithm)
+        self.record_search(algorithm, time.perf_counter() - started, path, self.planner.expansions)
+        # Кешуємо лише маршрути, найкоротші і без інших роботів, — обхід пробки не кешуємо.
+        # Найкоротший напевно, якщо інших роботів на карті не було або довжина дорівнює
+        # манхеттенській відстані; поле відстаней дивимось лише для точок інтересу
+        if path and (not blocked or len(path) == abs(goal[0] - start[0]) + abs(goal[1] - start[1])
+                     or self.distance_fields.covers(goal)
+                     and len(path) == self.distance_fields.distance(start, goal)):
+            self.path_cache.put(start, goal, version, path)
+        return path
+
+    def record_search(self, algorithm, elapsed, path, expansions):
+        """Додати пошук шляху до algorithm_stats"""
+        stats = self.algorithm_stats[algorithm]
+        stats["calls"] += 1
+        stats["total_time"] += elapsed
+        stats["avg_path_length"] += (len(path) - stats["avg_path_length"]) / stats["calls"]
+        stats["expansions"] += expansions
+
+    def compare_pathfinding_algorithms(self, start, goal):
+        """
+        Сравнение алгоритмов поиска пути на текущей карте (с учетом других роботов)
+
+        Args:
+            start (tuple): Начальная позиция
+            goal (tuple): Целевая позиция
+
+        Returns:
+            dict: Для каждого алгоритма путь, длина, время (с), раскрытые вершины; плюс анализ.
+            Полный бенчмарк с наборами сценариев — simulation/pathfinding_benchmark.py
+        """
+        blocked = self.dynamic_blocked()
+        results = {}
+        for algorithm in ("a_star", "dijkstra", "jps"):
+            started = time.perf_counter_ns()
+            path = self.planner.find_path(start, goal, blocked, algorithm=algorithm)
+            elapsed = (time.perf_counter_ns() - started) / 1e9
+            results[algorithm] = {
+                'path': path,
+                'length': len(path),
+                'time': elapsed,
+                'expansions': self.planner.expansions,
+                'found': len(path) > 0
+            }
+
+        found = [algorithm for algorithm in results if results[algorithm]['found']]
+        results['analysis'] = {
+            'fastest_algorithm': min(results, key=lambda x: results[x]['time']),
+            'shortest_path': min(found, key=lambda x: results[x]['length']) if found else None,
+            'fewest_expansions': min(results, key=lambda x: results[x]['expansions']),
+            # Довжини мають збігатися: усі три алгоритми шукають найкоротший шлях
+            'same_length': len({results[algorithm]['length'] for algorithm in found}) <= 1
+        }
+        return results
 
     def find_closest_accessible_cell(self, target):
         """Знайти найближчу доступну клітинку поруч із ціллю"""
@@ -313,7 +363,7 @@ class RobotNavigator:
         for dx, dy in DIRECTIONS_4:
             nx, ny = x + dx, y + dy
             if not self.is_cell_occupied(nx, ny):
-                dist = self.heuristic(self.current_position, (nx, ny))
+                dist = self.travel_distance(self.current_position, (nx, ny))
                 if dist < min_distance:
                     min_distance = dist
                     best_cell = (nx, ny)
@@ -334,19 +384,137 @@ class RobotNavigator:
                     return False
             return True
     
+    def perform(self, steps):
+        """Виконати кроки поведінки в реальному часі: кожне yield — скільки секунд чекати"""
+        try:
+            while True:
+                time.sleep(next(steps))
+        except StopIteration as finished:
+            return finished.value
+
+    def current_tick(self):
+        """Номер поточного такту спільного розкладу руху"""
+        return int(self.clock() / self.step_time)
+
+    def park_here(self):
+        """Зайняти поточну клітинку в таблиці резервувань, поки робот стоїть"""
+        x, y = self.current_position
+        if self.static_grid.in_bounds(x, y):
+            reservations.park(self.robot_id, self.static_grid.index(x, y), self.current_tick())
+            occupancy.reserve((x, y), self.robot_id)
+
+    def plan_with_reservations(self, destination):
+        """Спланувати та зарезервувати маршрут навколо маршрутів інших роботів"""
+        grid = self.static_grid
+        with reservations.lock:
+            start_tick = self.current_tick() + 1
+            timed_path = self.planner.find_timed_path(
+                self.current_position, destination, start_tick, reservations, self.robot_id
+            )
+            if not timed_path:
+                return []
+            cells = [(grid.index(x, y), t) for (x, y), t in timed_path]
+            if not reservations.reserve_path(self.robot_id, cells):
+                return []
+        return timed_path
+
+    def move_with_reservations(self, destination):
+        """Рух за розкладом у реальному часі (див. move_with_reservations_steps)"""
+        result = self.perform(self.move_with_reservations_steps(destination))
+        return self.move_to(destination) if result is REPLAN else result
+
+    def move_with_reservations_steps(self, destination):
+        """Рух за розкладом із таблиці резервувань. None — якщо такий маршрут не знайдено, REPLAN — якщо застарів"""
+        timed_path = self.plan_with_reservations(destination)
+        # Ціль може тримати робот, який ось-ось поїде, — кілька тактів пробуємо ще раз
+        retries = self.plan_retries
+        while not timed_path and retries > 0:
+            yield self.step_time
+            retries -= 1
+            timed_path = self.plan_with_reservations(destination)
+        if not timed_path:
+            return None
+
+        self.update_planned_path(timed_path)
+        self.path = [pos for pos, _ in timed_path[1:]]
+        self.update_status("moving")
+
+        for next_pos, tick in timed_path[1:]:
+            # Проверка критического уровня заряда
+            if self.battery_level <= self.battery_threshold and destination != self.charging_station:
+                print(f"Робот #{self.robot_id}: Низький заряд батареї! Направляюсь на зарядку.")
+                yield from self.go_to_charging_steps()
+                return False
+
+            # Чекаємо свого такту; якщо сильно відстали — розклад уже неактуальний
+            delay = tick * self.step_time - self.clock()
+            if delay > 0:
+                yield delay
+            elif self.current_tick() > tick + 1:
+                print(f"Робот #{self.robot_id}: Відстав від розкладу, перераховую маршрут.")
+                return REPLAN
+
+            if next_pos == self.current_position:
+                continue  # запланована пауза — інший робот проїжджає
+
+            # Робот, що рухається без розкладу, міг зайняти клітинку — даємо пів такту
+            waited = 0
+            while self.is_cell_occupied(*next_pos) and waited < self.step_time / 2:
+                yield 0.05
+                waited += 0.05
+            x, y = next_pos
+            if self.is_cell_occupied(x, y) or not self.reserve_cell(x, y):
+                print(f"Робот #{self.robot_id}: Клітинка {next_pos} зайнята поза розкладом. Перераховую маршрут.")
+                return (yield from self.move_reactively_steps(destination))
+
+            previous = self.current_position
+            self.update_position(x, y)
+            self.release_cell(previous[0], previous[1])
+            self.decrease_battery()
+
+        self.update_status("idle")
+        return True
+
     def move_to(self, destination):
         """Переместить робота к указанной позиции"""
+        return self.perform(self.move_to_steps(destination))
+
+    def move_to_steps(self, destination):
+        """Кроки переміщення робота до destination (True — доїхав)"""
+        while True:
+            self.current_position = self.get_current_position()
+            self.destination = destination
+
+            #якщо ми вже в точці
+            if self.current_position == destination:
+                return True
+
+            result = None
+            if self.cooperative_planning:
+                result = yield from self.move_with_reservations_steps(destination)
+            if result is None:
+                result = yield from self.move_reactively_steps(destination)
+            # Перепланування — новий прохід циклу, а не рекурсія: робот може чекати годинами
+            if result is not REPLAN:
+                return result
+
+    def move_reactively(self, destination):
+        """Рух без розкладу в реальному часі (див. move_reactively_steps)"""
+        result = self.perform(self.move_reactively_steps(destination))
+        return self.move_to(destination) if result is REPLAN else result
+
+    def move_reactively_steps(self, destination):
+        """Рух без розкладу: чекаємо, поки клітинка звільниться, або перераховуємо шлях"""
         self.current_position = self.get_current_position()
         self.destination = destination
-        
-        #якщо ми вже в точці
-        if self.current_position == destination:
-            return True
+        # Поки їдемо без розкладу, займаємо в таблиці лише клітинку, де стоїмо
+        reservations.release(self.robot_id)
         
         #пошук шляху
         path = self.find_path(self.current_position, destination)
         if not path:
             print(f"Робот #{self.robot_id}: Не вдалось зайти шлях до {destination}")
+            self.park_here()
             return False
         
         # Обновляем запланированный путь
@@ -359,19 +527,19 @@ class RobotNavigator:
             # Проверка критического уровня заряда
             if self.battery_level <= self.battery_threshold and destination != self.charging_station:
                 print(f"Робот #{self.robot_id}: Низький заряд батареї! Направляюсь на зарядку.")
-                self.go_to_charging_station()
+                yield from self.go_to_charging_steps()
                 return False
             
             # Перепроверяем, что путь все еще свободен (динамическая проверка)
             retry_attempts = 10
             while self.is_cell_occupied(*next_pos) and retry_attempts > 0:
                 print(f"Робот #{self.robot_id}: Клітинка {next_pos} тимчасово зайнята. Очікую...")
-                time.sleep(0.5)
+                yield 0.5
                 retry_attempts -= 1
 
             if self.is_cell_occupied(*next_pos):
                 print(f"Робот #{self.robot_id}: Клітинка {next_pos} не звільнилась. Перераховую маршрут.")
-                return self.move_to(destination)
+                return REPLAN
 
             
             x, y = next_pos
@@ -379,41 +547,64 @@ class RobotNavigator:
             if not self.reserve_cell(x, y):
                 # Если клетка занята, пересчитываем путь
                 print(f"Робот #{self.robot_id}: Не можу зарезервувати клітинку {next_pos}, перераховую путь.")
-                time.sleep(0.2)
-                return self.move_to(destination)
+                yield 0.2
+                return REPLAN
             
             # Обновляем позицию робота
+            previous = self.current_position
             self.update_position(x, y)
             # Освобождаем предыдущую клетку
-            self.release_cell(self.current_position[0], self.current_position[1])
+            self.release_cell(previous[0], previous[1])
             
             # Уменьшаем заряд при движении
             self.decrease_battery()
             
             # Задержка для анимации движения
-            time.sleep(0.7)
+            yield self.step_time
         
+        self.park_here()
         self.update_status("idle")
         return True
     
     def go_to_charging_station(self):
-        """Отправить робота на зарядную станцию"""
+        """Отправить робота на зарядную станцию (повертається після повної зарядки)"""
+        return self.perform(self.go_to_charging_steps())
+
+    def charging_station_taken(self):
+        """Чи стоїть на зарядці (або вже має туди розклад) інший робот"""
+        if occupancy.is_blocked(self.charging_station, self.robot_id):
+            return True
+        x, y = self.charging_station
+        owner = reservations.parked_by(self.static_grid.index(x, y))
+        return owner is not None and owner != self.robot_id
+
+    def go_to_charging_steps(self):
+        """Доїхати до зарядної станції і зарядитись"""
         self.update_status("going_to_charge")
-        result = self.move_to(self.charging_station)
+        if self.dispatcher is not None:
+            self.dispatcher.withdraw(self.robot_id)
+        # Чекаємо черги там, де стоїмо: роботи, що скупчились навколо станції,
+        # не випустили б з неї зарядженого робота
+        while self.current_position != self.charging_station and self.charging_station_taken():
+            yield self.poll_interval
+        result = yield from self.move_to_steps(self.charging_station)
         if result:
             self.is_charging = True
             self.update_status("charging")
-            # Запускаем процесс зарядки в отдельном потоке
-            charging_thread = Thread(target=self.charging_process)
-            charging_thread.daemon = True
-            charging_thread.start()
+            yield from self.charging_steps()
+            # Звільняємо станцію для наступного в черзі
+            yield from self.move_to_steps(self.home_position)
         return result
     
     def charging_process(self):
         """Процесс зарядки батареи"""
+        return self.perform(self.charging_steps())
+
+    def charging_steps(self):
+        """Зарядка йде поступово, поки батарея не заповниться"""
         while self.is_charging and self.battery_level < 100:
             self.charge_battery()
-            time.sleep(2)  # Зарядка идет постепенно
+            yield 2
             
             # Если батарея зарядилась полностью
             if self.battery_level >= 100:
@@ -422,18 +613,8 @@ class RobotNavigator:
                 print(f"Робот #{self.robot_id}: Батарея полностью заряжена.")
     
     def find_nearest_pallet_with_item(self, item_id, quantity_needed):
-        """Найти ближайшую паллету с нужным товаром"""
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT i.location_id, i.quantity, p.x, p.y 
-            FROM inventory i
-            JOIN pallets p ON i.location_id = p.id
-            WHERE i.item_id = ? AND i.location_type = 'pallet' AND i.quantity >= ?
-            ORDER BY i.quantity DESC
-        """, (item_id, quantity_needed))
-        pallets = cursor.fetchall()
-        conn.close()
+        """Найти ближайшую паллету с нужным товаром (из индекса остатков, без чужих резервов)"""
+        pallets = inventory.pallets(item_id, quantity_needed, owner=self.robot_id)
         
         if not pallets:
             return None
@@ -443,51 +624,46 @@ class RobotNavigator:
         nearest_pallet = None
         for pallet in pallets:
             pallet_location = (pallet[2], pallet[3])
-            distance = self.heuristic(self.current_position, pallet_location)
+            distance = self.travel_distance(self.current_position, pallet_location)
             if distance < min_distance:
                 min_distance = distance
                 nearest_pallet = pallet
         
         return nearest_pallet
     
-    def find_free_shelf(self):
-        """Найти ближайшую свободную полку"""
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT id, shelf_code, x, y 
-            FROM shelves
-            WHERE status = 'free'
-            ORDER BY id
-        """)
-        shelves = cursor.fetchall()
-        conn.close()
-        
-        if not shelves:
-            return None
-        
-        # Находим ближайшую полку
-        min_distance = float('inf')
-        nearest_shelf = None
-        for shelf in shelves:
-            shelf_location = (shelf[2], shelf[3])
-            distance = self.heuristic(self.current_position, shelf_location)
-            if distance < min_distance:
-                min_distance = distance
-                nearest_shelf = shelf
-        
-        return nearest_shelf
+    def find_free_shelf(self, exclude=()):
+        """Занять ближайшую свободную полку (кроме полок из exclude); прежняя невыложенная — освобождается"""
+        shelf_allocator.release_owner(self.robot_id)
+        # До полиці під'їжджаємо з проходу праворуч від стелажа (див. get_approach_position).
+        # Відстані до всіх проходів — з одного поля від робота (проїзд симетричний). Поле
+        # живе в LRU-кеші полів: купа алокатора тримає лише функцію ключа, а не саме поле
+        grid = self.static_grid
+        distances = self.distance_fields
+        distances.declare([self.current_position])
+
+        def distance(start, shelf):
+            aisle = self.shelf_aisle(shelf)
+            d = distances.distance(aisle, start)
+            return d if d is not None else grid.width * grid.height + self.heuristic(start, aisle)
+
+        return shelf_allocator.allocate(self.robot_id, near=self.current_position, exclude=exclude,
+                                        distance=distance)
     
     def find_approach_position_for_pallet(self, pallet_pos):
-        """Найти позицию подхода к паллете"""
+        """Найти позицию подхода к паллете (ближайшую по пути)"""
         x, y = pallet_pos
+        best_cell = None
+        min_distance = float('inf')
         # Проверяем все соседние клетки
         for dx, dy in DIRECTIONS_4:
             nx, ny = x + dx, y + dy
             # Если клетка доступна и не занята
             if not self.is_cell_occupied(nx, ny):
-                return (nx, ny)
-        return None
+                distance = self.travel_distance(self.current_position, (nx, ny))
+                if distance < min_distance:
+                    min_distance = distance
+                    best_cell = (nx, ny)
+        return best_cell
     
     def pick_item_from_pallet(self, pallet_id, item_id, quantity):
         """Взять товар с паллеты"""
@@ -496,32 +672,8 @@ class RobotNavigator:
             if quantity <= 0:
                 return 0
         
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT quantity FROM inventory
-            WHERE location_type = 'pallet' AND location_id = ? AND item_id = ?
-        """, (pallet_id, item_id))
-        available = cursor.fetchone()[0]
-        
-        take = min(available, quantity)
-        
-        # Уменьшаем количество на паллете
-        new_qty = available - take
-        if new_qty > 0:
-            cursor.execute("""
-                UPDATE inventory 
-                SET quantity = ? 
-                WHERE location_type = 'pallet' AND location_id = ? AND item_id = ?
-            """, (new_qty, pallet_id, item_id))
-        else:
-            cursor.execute("""
-                DELETE FROM inventory
-                WHERE location_type = 'pallet' AND location_id = ? AND item_id = ?
-            """, (pallet_id, item_id))
-        
-        conn.commit()
-        conn.close()
+        # Уменьшаем количество на паллете (в БД и в индексе остатков; наш резерв снимается)
+        take = inventory.take(pallet_id, item_id, quantity, owner=self.robot_id)
         
         # Добавляем товары к переносимым
         self.carrying_items.extend([item_id] * take)
@@ -538,97 +690,174 @@ class RobotNavigator:
             if item_id in self.carrying_items:
                 self.carrying_items.remove(item_id)
         
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        # Находим координаты полки
-        cursor.execute("SELECT x, y FROM shelves WHERE id = ?", (shelf_id,))
-        shelf_coords = cursor.fetchone()
-        shelf_x, shelf_y = shelf_coords
-        
-        # Кладем товар на полку
-        cursor.execute("""
-            INSERT INTO inventory (item_id, location_type, location_id, quantity, x, y)
-            VALUES (?, 'shelf', ?, ?, ?, ?)
-        """, (item_id, shelf_id, quantity, shelf_x, shelf_y))
-        
-        # Обновляем статус полки
-        cursor.execute("""
-            UPDATE shelves
-            SET status = 'busy', current_order_id = ?
-            WHERE id = ?
-        """, (order_id, shelf_id))
-        
-        conn.commit()
-        conn.close()
+        # Координаты полки — из распределителя полок, без запроса к БД
+        _, shelf_code, shelf_x, shelf_y = shelf_allocator.shelf(shelf_id)
+
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            # Кладем товар на полку
+            cursor.execute("""
+                INSERT INTO inventory (item_id, location_type, location_id, quantity, x, y)
+                VALUES (?, 'shelf', ?, ?, ?, ?)
+            """, (item_id, shelf_id, quantity, shelf_x, shelf_y))
+            
+            # Обновляем статус полки
+            cursor.execute("""
+                UPDATE shelves
+                SET status = 'busy', current_order_id = ?
+                WHERE id = ?
+            """, (order_id, shelf_id))
+            
+            conn.commit()
+        shelf_allocator.commit(shelf_id)
+        events.publish("shelf", shelf_id, status="busy", code=shelf_code, order_id=order_id)
         
         return quantity
     
-    def process_order_item(self, order_id, item_id, quantity_needed):
-        """Обрабатываем одну позицию товара"""
-        self.update_status(f"processing_order_{order_id}")
-        remaining = quantity_needed
-
-        while remaining > 0 and len(self.carrying_items) < self.max_capacity:
-            # Находим ближайшую паллету с нужным товаром
-            pallet = self.find_nearest_pallet_with_item(item_id, remaining)
-            if not pallet:
-                print(f"Робот #{self.robot_id}: Немає доступних паллетів з товаром {item_id}. Пропускаю позицію.")
-                return True
+    def item_location(self, item_id):
+        """Клітинка найближчої палети з товаром (для групування рейсів) або None"""
+        pallet = self.find_nearest_pallet_with_item(item_id, 1)
+        return (pallet[2], pallet[3]) if pallet else None
+
+    def process_orders(self, lines):
+        """Виконати рядки кількох замовлень спільними рейсами"""
+        return self.perform(self.process_orders_steps(lines))
 
-            pallet_id, available_qty, pallet_x, pallet_y = pallet
-            pallet_pos = (pallet_x, pallet_y)
+    def process_orders_steps(self, lines):
+        """Рядки [(order_id, item_id, quantity)] розкладаються на рейси по max_capacity одиниць.
 
-            # НОВОЕ: Находим позицию для подхода к паллете
-            approach_pos = self.find_approach_position_for_pallet(pallet_pos)
-            if not approach_pos:
-                print(f"Робот #{self.robot_id}: Не можу підійти до паллети {pallet_id}. Всі клітинки зайнятті")
-                time.sleep(1)
+        Повертає множину замовлень, у яких якийсь рейс не вдався.
+        """
+        failed = set()
+        for trip in plan_trips(lines, self.max_capacity, self.item_location):
+            trip_orders = {order_id for order_id, _, _ in trip}
+            if trip_orders & failed:
+                failed |= trip_orders
                 continue
-            
-            # Двигаемся к позиции перед паллетой
-            print(f"Робот #{self.robot_id}: Направляюсь к позиции перед паллетой {pallet_id} ({approach_pos})")
-            move_result = self.move_to(approach_pos)
-            if not move_result:
-                return False
+            if not (yield from self.run_trip_steps(trip)):
+                failed |= trip_orders
+        return failed
+
+    def run_trip_steps(self, trip):
+        """Один рейс: зібрати всі частини з палет, потім розкласти по полицях — кожне замовлення на свою.
+
+        Невдалий під'їзд (зайнятий підхід, немає шляху, заїзд на зарядку)
+        повторюється, поки не вичерпано plan_retries спроб на рейс.
+        """
+        self.trips += 1
+        self.update_status(f"processing_order_{trip[0][0]}")
+        retries = self.plan_retries
+        loaded = {}  # order_id: {item_id: кількість} — ще не викладене на полиці
+        sources = {}  # item_id: [(pallet_id, x, y, кількість)] — звідки взято
+        where = {item_id: self.item_location(item_id) for _, item_id, _ in trip}
+        pending = list(trip)
+        while pending:
+            # Наступною — частина з найближчою до робота палетою
+            order_id, item_id, remaining = min(pending, key=lambda part: self.travel_distance(
+                self.current_position, where[part[1]] or self.current_position))
+            pending.remove((order_id, item_id, remaining))
+            while remaining > 0:
+                pallet = self.find_nearest_pallet_with_item(item_id, remaining) \
+                    or self.find_nearest_pallet_with_item(item_id, 1)
+                if not pallet:
+                    print(f"Робот #{self.robot_id}: Немає доступних паллетів з товаром {item_id}. Пропускаю позицію.")
+                    break
 
-            # Забираем товар (находясь возле паллеты)
-            take = self.pick_item_from_pallet(pallet_id, item_id, remaining)
-            print(f"Робот #{self.robot_id}: Взяв {take} одиниць товару {item_id}")
-            remaining -= take
+                pallet_id, available_qty, pallet_x, pallet_y = pallet
+                approach_pos = self.find_approach_position_for_pallet((pallet_x, pallet_y))
+                if not approach_pos:
+                    print(f"Робот #{self.robot_id}: Не можу підійти до паллети {pallet_id}. Всі клітинки зайнятті")
+                    yield 1
+                    continue
+
+                # Поки їдемо, інші роботи цей товар на палеті не бачать
+                inventory.release(self.robot_id)
+                inventory.reserve(self.robot_id, pallet_id, item_id, remaining)
+                print(f"Робот #{self.robot_id}: Направляюсь к позиции перед паллетой {pallet_id} ({approach_pos})")
+                if not (yield from self.move_to_steps(approach_pos)):
+                    inventory.release(self.robot_id)
+                    if retries <= 0:
+                        return self.abort_trip(loaded, sources)
+                    retries -= 1
+                    yield self.step_time
+                    continue
 
-            # Если все собрано или достигнута ёмкость
-            if len(self.carrying_items) >= self.max_capacity or remaining <= 0:
-                shelf = self.find_free_shelf()
+                take = self.pick_item_from_pallet(pallet_id, item_id, remaining)
+                print(f"Робот #{self.robot_id}: Взяв {take} одиниць товару {item_id}")
+                if not take:
+                    break
+                remaining -= take
+                items = loaded.setdefault(order_id, {})
+                items[item_id] = items.get(item_id, 0) + take
+                sources.setdefault(item_id, []).append((pallet_id, pallet_x, pallet_y, take))
+
+        for order_id, items in list(loaded.items()):
+            blocked = set()  # полиці, до яких зараз не під'їхати
+            while True:
+                shelf = self.find_free_shelf(exclude=blocked)
                 if not shelf:
                     print(f"Робот #{self.robot_id}: Немає вільних полиць")
-                    break
+                    return self.abort_trip(loaded, sources)
 
                 shelf_id, shelf_code, shelf_x, shelf_y = shelf
-                shelf_pos = (shelf_x, shelf_y)
-
-                # Получаем подход к полке
-                approach_pos = self.get_approach_position(shelf_pos)
+                approach_pos = self.get_approach_position((shelf_x, shelf_y))
                 if approach_pos:
                     print(f"Робот #{self.robot_id}: Подходжу до полиці {shelf_code} через {approach_pos}")
-                    move_result = self.move_to(approach_pos)
-                    if not move_result:
-                        return False
+                    if (yield from self.move_to_steps(approach_pos)):
+                        break
                 else:
                     print(f"Робот #{self.robot_id}: Не зміг підійти до полиці {shelf_code}")
-                    return False
+                # Пробуємо наступну найближчу вільну полицю
+                if retries <= 0:
+                    return self.abort_trip(loaded, sources)
+                retries -= 1
+                blocked.add(shelf_id)
+                yield self.step_time
+
+            for item_id, quantity in items.items():
+                self.place_item_to_shelf(shelf_id, item_id, quantity, order_id)
+                print(f"Робот #{self.robot_id}: Поклав {quantity} одиниць товару {item_id} на полку {shelf_code} "
+                      f"(замовлення #{order_id})")
+            del loaded[order_id]
+        return True
 
-                # Кладем товар
-                place_qty = min(quantity_needed - remaining, len(self.carrying_items))
-                self.place_item_to_shelf(shelf_id, item_id, place_qty, order_id)
-                print(f"Робот #{self.robot_id}: Поклав {place_qty} одиниць товару {item_id} на полку {shelf_code}")
+    def abort_trip(self, loaded, sources):
+        """Рейс не вдався: невикладений товар повертається на палети, з яких його взяли.
+
+        loaded — {order_id: {item_id: кількість}}, ще не викладене на полиці;
+        sources — {item_id: [(pallet_id, x, y, кількість)]}. Замовлення рейсу
+        повертає в pending find_and_process_new_order_steps.
+        """
+        unplaced = {}
+        for items in loaded.values():
+            for item_id, quantity in items.items():
+                unplaced[item_id] = unplaced.get(item_id, 0) + quantity
+        for item_id, quantity in unplaced.items():
+            # Спершу — на палети, з яких брали останніми
+            for pallet_id, x, y, taken in reversed(sources.get(item_id, ())):
+                if quantity <= 0:
+                    break
+                amount = min(quantity, taken)
+                inventory.put_back(pallet_id, item_id, amount, x, y)
+                quantity -= amount
+        self.carrying_items.clear()
+        inventory.release(self.robot_id)
+        shelf_allocator.release_owner(self.robot_id)
+        return False
 
-        return remaining <= 0
+    def shelf_aisle(self, shelf_coords):
+        """Клітинка проходу праворуч від стелажа в ряду полиці (у базовому плануванні — ряд 4)"""
+        x, y = shelf_coords
+        grid = self.static_grid
+        while grid.in_bounds(x, y) and grid.cell(x, y) == SHELF:
+            x += 1
+        return x, y
 
     def get_approach_position(self, shelf_coords):
-        """Возвращает сервисную клетку перед полкой — всегда ряд 4"""
-        _, y = shelf_coords  # y – координата столбца полки
-        target = (4, y)      # подходим всегда из ряда 4
+        """Возвращает сервисную клетку перед полкой — в проходе справа от стеллажа"""
+        aisle_x, y = self.shelf_aisle(shelf_coords)  # y – координата столбца полки
+        target = (aisle_x, y)      # подходим всегда из прохода (ряд 4)
 
         if not self.is_cell_occupied(*target):
             return target
@@ -636,13 +865,17 @@ class RobotNavigator:
             print(f"Клітинка підходу {target} занята")
             # Пробуем найти соседнюю свободную клетку
             for dx in [-1, 1]:
-                new_target = (4, y + dx)
+                new_target = (aisle_x, y + dx)
                 if not self.is_cell_occupied(*new_target):
                     return new_target
             return None
     
     def run(self):
         """Основной цикл работы робота"""
+        return self.perform(self.run_steps())
+
+    def run_steps(self):
+        """Основний цикл роботи робота як послідовність кроків (для потоку або симуляції)"""
         print(f"Робот #{self.robot_id}: Починаю роботу")
         self.update_status("idle")
         
@@ -650,89 +883,120 @@ class RobotNavigator:
             # Проверка уровня батареи
             if self.battery_level <= self.battery_threshold and not self.is_charging:
                 print(f"Робот #{self.robot_id}: Низький заряд батареї. Їду на зарядку.")
-                self.go_to_charging_station()
+                yield from self.go_to_charging_steps()
                 continue
             
             # Если робот не занят заказом, ищем новые задания
             if self.current_task is None and self.battery_level > self.battery_threshold:
-                self.find_and_process_new_order()
+                yield from self.find_and_process_new_order_steps()
             
-            time.sleep(1)
+            yield self.poll_interval
     
     def find_and_process_new_order(self):
         """Найти и обработать новый заказ"""
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        # Ищем 1 pending-заказ
-        cursor.execute("""
-            SELECT TOP 1 id FROM orders
-            WHERE status = 'pending'
-            ORDER BY id
-        """)
-        order = cursor.fetchone()
-        if not order:
-            conn.close()
-            return False
+        return self.perform(self.find_and_process_new_order_steps())
+
+    def claim_next_order(self):
+        """Забронювати перше pending-замовлення в БД (id або None, якщо його взяв інший робот)"""
+        with db_connection() as conn:
+            cursor = conn.cursor()
+
+            # Ищем 1 pending-заказ
+            cursor.execute(get_backend().select_first("id", """
+                FROM orders
+                WHERE status = 'pending'
+                ORDER BY id
+            """))
+            order = cursor.fetchone()
+            if not order:
+                return None
+
+            order_id = order[0]
 
-        order_id = order[0]
+            # Пробуем забронировать это замовлення (и обновляем статус)
+            cursor.execute("""
+                UPDATE orders
+                SET status = 'processing'
+                WHERE id = ? AND status = 'pending'
+            """, (order_id,))
+            claimed = cursor.rowcount
+            conn.commit()
 
-        # Пробуем забронировать это замовлення (и обновляем статус)
-        cursor.execute("""
-            UPDATE orders
-            SET status = 'processing'
-            WHERE id = ? AND status = 'pending'
-        """, (order_id,))
-        conn.commit()
+            # Если замовлення уже взял другой робот — выходим
+            if claimed == 0:
+                return None
+        events.publish("order", order_id, status="processing")
+        return order_id
 
-        # Если замовлення уже взял другой робот — выходим
-        if cursor.rowcount == 0:
-            conn.close()
+    def find_and_process_new_order_steps(self):
+        """Отримати замовлення (хвилю від диспетчера або одне з БД) і виконати всі їхні позиції"""
+        if self.dispatcher is not None:
+            order_ids = self.dispatcher.request_orders(self)
+        else:
+            order_id = self.claim_next_order()
+            order_ids = [order_id] if order_id is not None else []
+        if not order_ids:
             return False
 
-        print(f"Робот #{self.robot_id}: Взяв замовлення #{order_id}")
-
-        # Получаем все товары из замовлення
-        cursor.execute("""
-            SELECT item_id, quantity FROM order_items
-            WHERE order_id = ?
-        """, (order_id,))
-        order_items = cursor.fetchall()
-        conn.close()
-
-        # Обрабатываем каждый товар
-        for item in order_items:
-            item_id, quantity = item
-            success = self.process_order_item(order_id, item_id, quantity)
-            if not success:
-                print(f"Робот #{self.robot_id}: Не вдалося завершити замовлення #{order_id}")
-                return False
+        print(f"Робот #{self.robot_id}: Взяв замовлення {', '.join(f'#{order_id}' for order_id in order_ids)}")
+
+        with db_connection() as conn:
+            cursor = conn.cursor()
+
+            # Получаем все товары из замовлень — без того, що вже лежить на їхніх полицях
+            # (замовлення, рейс якого не вдався, повертається в pending і доробляється)
+            cursor.execute(f"""
+                SELECT oi.order_id, oi.item_id, oi.quantity - COALESCE((
+                    SELECT SUM(i.quantity) FROM shelves s
+                    JOIN inventory i ON i.location_type = 'shelf' AND i.location_id = s.id
+                    WHERE s.current_order_id = oi.order_id AND i.item_id = oi.item_id
+                ), 0)
+                FROM order_items oi
+                WHERE oi.order_id IN ({", ".join("?" * len(order_ids))})
+                ORDER BY oi.order_id, oi.id
+            """, order_ids)
+            lines = [tuple(row) for row in cursor.fetchall() if row[2] > 0]
+
+        # Позиції всіх замовлень їдуть спільними рейсами
+        failed = yield from self.process_orders_steps(lines)
+        if failed:
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.executemany("UPDATE orders SET status = 'pending' WHERE id = ? AND status = 'processing'",
+                                   [(order_id,) for order_id in failed])
+                conn.commit()
+            for order_id in failed:
+                events.publish("order", order_id, status="pending")
+                print(f"Робот #{self.robot_id}: Не вдалося завершити замовлення #{order_id}, повертаю в чергу")
+        done = [order_id for order_id in order_ids if order_id not in failed]
+        if not done:
+            return False
 
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("UPDATE orders SET status = 'done' WHERE id = ?", (order_id,))
-        conn.commit()
-        # Перевіряємо — чи залишились ще pending замовлення
-        cursor.execute("SELECT COUNT(*) FROM orders WHERE status = 'pending'")
-        pending_count = cursor.fetchone()[0]
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany("UPDATE orders SET status = 'done' WHERE id = ?", [(order_id,) for order_id in done])
+            conn.commit()
+            # Перевіряємо — чи залишились ще pending замовлення
+            cursor.execute("SELECT COUNT(*) FROM orders WHERE status = 'pending'")
+            pending_count = cursor.fetchone()[0]
 
-        conn.close()
-        print(f"Робот #{self.robot_id}: Замовлення #{order_id} виконано")
+        for order_id in done:
+            events.publish("order", order_id, status="done")
+            print(f"Робот #{self.robot_id}: Замовлення #{order_id} виконано")
         self.update_status("idle")
         self.current_task = None
 
         if pending_count == 0:
             # Якщо немає замовлень — повертаємось на базу
-            standard_return_x = 18
-            standard_return_y = 2 + (self.robot_id - 76)
+            standard_return_x, standard_return_y = self.home_position
             print(f"Робот #{self.robot_id}: Повертаюсь на стандартну позицію ({standard_return_x}, {standard_return_y})")
-            self.move_to((standard_return_x, standard_return_y))
+            yield from self.move_to_steps((standard_return_x, standard_return_y))
 
-        return True
+        return not failed
 
 
 # Функция для запуска робота в отдельном потоке
-def run_robot(robot_id, grid_width, grid_height, shelf_coords, pallet_coords, charging_station):
+def run_robot(robot_id, grid_width, grid_height, shelf_coords, pallet_coords, charging_station, delivery_zone=None):
     """Запустить робота в отдельном потоке"""
     robot = RobotNavigator(
         robot_id=robot_id,
@@ -740,7 +1004,8 @@ def run_robot(robot_id, grid_width, grid_height, shelf_coords, pallet_coords, ch
         grid_height=grid_height,
         shelf_coords=shelf_coords,
         pallet_coords=pallet_coords,
-        charging_station=charging_station
+        charging_station=charging_station,
+        delivery_zone=delivery_zone
     )
     
     # Запускаем основной цикл робота
@@ -749,62 +1014,3 @@ def run_robot(robot_id, grid_width, grid_height, shelf_coords, pallet_coords, ch
     robot_thread.start()
     
     return robot
-
-def compare_pathfinding_algorithms(self, start, goal):
-    """
-    Сравнение производительности и результатов алгоритмов A* и Дейкстры
-    
-    Args:
-        start (tuple): Начальная позиция
-        goal (tuple): Целевая позиция
-    
-    Returns:
-        dict: Результаты сравнения алгоритмов
-    """
-    results = {}
-    
-    # Тестируем A*
-    start_time = time.time()
-    a_star_path = self.a_star_search(start, goal)
-    a_star_time = time.time() - start_time
-    
-    results['a_star'] = {
-        'path': a_star_path,
-        'length': len(a_star_path),
-        'time': a_star_time,
-        'found': len(a_star_path) > 0
-    }
-    
-    # Тестируем Дейкстру
-    start_time = time.time()
-    dijkstra_path = self.dijkstra_search(start, goal)
-    dijkstra_time = time.time() - start_time
-    
-    results['dijkstra'] = {
-        'path': dijkstra_path,
-        'length': len(dijkstra_path),
-        'time': dijkstra_time,
-        'found': len(dijkstra_path) > 0
-    }
-    
-    # Тестируем Дейкстру с весами
-    start_time = time.time()
-    dijkstra_weighted_path = self.dijkstra_search_with_weights(start, goal)
-    dijkstra_weighted_time = time.time() - start_time
-    
-    results['dijkstra_weighted'] = {
-        'path': dijkstra_weighted_path,
-        'length': len(dijkstra_weighted_path),
-        'time': dijkstra_weighted_time,
-        'found': len(dijkstra_weighted_path) > 0
-    }
-    
-    # Анализ результатов
-    results['analysis'] = {
-        'fastest_algorithm': min(results.keys(), key=lambda x: results[x]['time'] if x != 'analysis' else float('inf')),
-        'shortest_path': min([alg for alg in results.keys() if alg != 'analysis'], 
-                           key=lambda x: results[x]['length'] if results[x]['found'] else float('inf')),
-        'all_found_same_path': len(set(str(results[alg]['path']) for alg in results.keys() if alg != 'analysis' and results[alg]['found'])) <= 1
-    }
-    
-    return results
\ No newline at end of file
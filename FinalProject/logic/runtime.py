@@ -0,0 +1,101 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from db.telemetry import telemetry
+
+_FINISHED = object()  # next() повернув це — генератор кроків робота завершився
+
+
+class FleetRuntime:
+    """Парк роботів в одному потоці asyncio замість окремого потоку на робота.
+
+    Кожен робот — корутина, яка по черзі виконує кроки RobotNavigator.run_steps().
+    Крок (запити до БД, пошук шляху) блокує, тому виконується в обмеженому
+    пулі з max_workers потоків; очікування між кроками — asyncio.sleep, воно
+    потоків не займає. Тож тисяча роботів ділить кілька потоків, а не тримає
+    тисячу власних.
+
+    run() працює до stop(), до закінчення duration або до скасування задачі.
+    При зупинці всі корутини скасовуються, кожна дочікується свого поточного
+    кроку і закриває генератор; потім пул зупиняється і телеметрія записується в БД.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or config.FLEET_EXECUTOR_WORKERS
+        self.robots = []
+        self._executor = None
+        self._tasks = set()
+        self._loop = None
+        self._stop = None
+
+    def add_robot(self, robot):
+        """Додати робота до парку (до або під час run())"""
+        self.robots.append(robot)
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._spawn, robot)
+
+    def stop(self):
+        """Попросити парк зупинитись (можна викликати з будь-якого потоку)"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+
+    async def run(self, duration=None):
+        """Керувати роботами до stop() або duration секунд, потім акуратно зупинитись"""
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="fleet")
+        try:
+            for robot in self.robots:
+                self._spawn(robot)
+            try:
+                await asyncio.wait_for(self._stop.wait(), duration)
+            except asyncio.TimeoutError:
+                pass
+        finally:
+            for task in self._tasks:
+                task.cancel()
+            # Дочекатись завершення поточних кроків, навіть якщо саму run() скасували
+            await asyncio.shield(asyncio.gather(*self._tasks, return_exceptions=True))
+            self._executor.shutdown(wait=True)
+            self._loop = None
+            telemetry.flush()
+
+    def _spawn(self, robot):
+        task = asyncio.create_task(self._drive(robot), name=f"robot-{robot.robot_id}")
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _drive(self, robot):
+        """Корутина робота: крок у пулі потоків, очікування — в циклі подій"""
+        steps = robot.run_steps()
+        step = None
+        try:
+            while True:
+                step = self._executor.submit(next, steps, _FINISHED)
+                wait = await asyncio.wrap_future(step)
+                if wait is _FINISHED:
+                    return
+                await asyncio.sleep(wait or 0)
+        except asyncio.CancelledError:
+            # Генератор, що ще виконується в потоці, закрити не можна — чекаємо кінця кроку
+            if step is not None and not step.cancelled() and not step.done():
+                await asyncio.wait([asyncio.wrap_future(step)])
+            raise
+        except Exception as e:
+            print(f"Робот #{robot.robot_id}: Аварійна зупинка", e)
+        finally:
+            if step is None or step.done() or step.cancelled():
+                steps.close()
+
+
+def run_fleet(robots, duration=None, max_workers=None):
+    """Запустити парк роботів у новому циклі asyncio (блокує до зупинки; Ctrl+C — зупинка)"""
+    runtime = FleetRuntime(max_workers)
+    for robot in robots:
+        runtime.add_robot(robot)
+    try:
+        asyncio.run(runtime.run(duration))
+    except KeyboardInterrupt:
+        pass
+    return runtime
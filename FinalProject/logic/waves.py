@@ -0,0 +1,53 @@
+def _gap(a, b):
+    """Манхеттенська відстань між клітинками (None — місце невідоме)"""
+    if a is None or b is None:
+        return 0
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+def plan_trips(lines, capacity, locate):
+    """Згрупувати рядки замовлень у рейси робота палети -> полиці.
+
+    lines — [(order_id, item_id, quantity)] з одного або кількох замовлень,
+    capacity — скільки одиниць робот везе за раз, locate(item_id) — клітинка
+    палети з товаром (або None). Рядки, більші за capacity, діляться на частини.
+    Рейс починається з найбільшої частини, що лишилась, і доповнюється тими,
+    що влазять, — спершу рядками тих самих замовлень (їм не потрібна ще одна
+    полиця), потім найближчими палетами. Повертає список рейсів
+    [[(order_id, item_id, quantity), ...], ...].
+    """
+    chunks = []
+    for order_id, item_id, quantity in lines:
+        while quantity > 0:
+            part = min(quantity, capacity)
+            chunks.append((order_id, item_id, part))
+            quantity -= part
+    # Найбільші частини першими — так рейси заповнюються щільніше (first fit decreasing)
+    chunks.sort(key=lambda chunk: -chunk[2])
+    where = {item_id: locate(item_id) for item_id in {chunk[1] for chunk in chunks}}
+
+    trips = []
+    while chunks:
+        first = chunks.pop(0)
+        trip = [first]
+        load = first[2]
+        orders = {first[0]}
+        cells = [where[first[1]]]
+        while load < capacity:
+            best = None
+            best_key = None
+            for i, (order_id, item_id, quantity) in enumerate(chunks):
+                if load + quantity > capacity:
+                    continue
+                key = (order_id not in orders, min(_gap(cell, where[item_id]) for cell in cells), -quantity)
+                if best_key is None or key < best_key:
+                    best, best_key = i, key
+            if best is None:
+                break
+            chunk = chunks.pop(best)
+            trip.append(chunk)
+            load += chunk[2]
+            orders.add(chunk[0])
+            cells.append(where[chunk[1]])
+        trips.append(trip)
+    return trips
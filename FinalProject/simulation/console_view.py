@@ -0,0 +1,234 @@
+import argparse
+import shutil
+import sys
+import threading
+import time
+
+from db.inventory import inventory
+from db.shelves import shelf_allocator
+from db.telemetry import telemetry
+from logic.events import events
+
+RESET = "\x1b[0m"
+EMPTY = "\x1b[90m·" + RESET
+GLYPHS = {
+    "free": "\x1b[34m▒" + RESET,  # вільна полиця
+    "busy": "\x1b[31m█" + RESET,  # полиця з товаром замовлення
+    "stock": "\x1b[32mP" + RESET,  # палета з товаром
+    "empty": "\x1b[90mp" + RESET,  # порожня палета
+    "charging": "\x1b[35mC" + RESET,
+}
+ROBOT = "\x1b[1;33m@" + RESET
+ROBOT_LOW = "\x1b[1;31m@" + RESET  # заряд нижче 20%
+ROBOT_CROWD = "\x1b[1;33m%d" + RESET  # кілька роботів в одній клітинці
+PANEL_WIDTH = 34  # ширина колонки в таблиці роботів
+
+
+class ConsoleView:
+    """Перегляд складу в терміналі — для серверів без графіки (наприклад, через SSH).
+
+    Стан береться лише з пам'яті процесу: події роботів і полиць — з шини
+    events, палети — з індексу залишків (раз на секунду), початковий стан
+    полиць — з shelf_allocator, позиція нового робота — з буфера телеметрії.
+    Кожен кадр перемальовує тільки клітинки, що змінились (адресація курсора
+    ANSI), і рядки таблиці роботів (заряд і завдання), що змінились; увесь
+    кадр виводиться одним write. Сітка обрізається за розміром терміналу.
+    """
+
+    def __init__(self, layout, robots=(), out=None):
+        self.layout = layout
+        self.out = out or sys.stdout  # запам'ятовуємо зараз: симуляція може перенаправити sys.stdout
+        self._events = events.subscribe(("robot_moved", "robot_status", "robot_battery", "shelf"))
+        # robot_id: [(x, y), заряд, статус]
+        self._robots = {robot.robot_id: [robot.get_current_position(), robot.battery_level, ""] for robot in robots}
+        self._cells = {}  # (x, y): стан клітинки ("free", "busy", "stock", "empty", "charging")
+        self._shelf_cells = dict(layout["shelf_coords"])
+        for station in layout["charging_stations"]:
+            self._cells[station] = "charging"
+        for code, status in shelf_allocator.statuses().items():
+            if code in self._shelf_cells:
+                self._cells[self._shelf_cells[code]] = status
+        self._dirty = set(self._cells)
+        self._drawn = {}  # (x, y): що зараз намальовано в клітинці
+        self._robot_cells = set()
+        self._panel = []  # рядки таблиці роботів, що зараз на екрані
+        self._size = None
+        self._pallets_at = float("-inf")
+        self.frames = 0
+        self.bytes_written = 0
+
+    def close(self):
+        self._events.close()
+        self._write("\x1b[?25h" + RESET + "\n")
+
+    def _refresh_pallets(self):
+        totals = inventory.pallet_totals()
+        for pallet_id, cell in self.layout["pallet_coords"].items():
+            state = "stock" if totals.get(pallet_id) else "empty"
+            if self._cells.get(cell) != state:
+                self._cells[cell] = state
+                self._dirty.add(cell)
+
+    def _apply_events(self):
+        for kind, subject, data in self._events.poll():
+            if kind == "shelf":
+                cell = self._shelf_cells.get(data["code"])
+                if cell is not None and self._cells.get(cell) != data["status"]:
+                    self._cells[cell] = data["status"]
+                    self._dirty.add(cell)
+                continue
+            robot = self._robots.get(subject)
+            if robot is None:
+                robot = self._robots[subject] = [telemetry.latest(subject, "position"),
+                                                 telemetry.latest(subject, "battery", 100),
+                                                 telemetry.latest(subject, "status", "")]
+            if kind == "robot_moved":
+                robot[0] = data["position"]
+            elif kind == "robot_battery":
+                robot[1] = data["battery"]
+            else:
+                robot[2] = data["status"]
+
+    def _glyph(self, cell, crowd):
+        count = crowd.get(cell)
+        if count:
+            if count > 1:
+                return ROBOT_CROWD % min(count, 9)
+            return ROBOT_LOW if crowd.get(("low", cell)) else ROBOT
+        state = self._cells.get(cell)
+        return GLYPHS[state] if state else EMPTY
+
+    def _panel_lines(self, columns, rows, fps):
+        header = (f"роботів: {len(self._robots)}  кадр: {self.frames}  {fps:5.1f} FPS  "
+                  f"пропущено подій: {self._events.dropped}")
+        lines = [header[:columns]]
+        per_line = max(1, columns // PANEL_WIDTH)
+        entries = []
+        for robot_id in sorted(self._robots):
+            _, battery, status = self._robots[robot_id]
+            bar = "█" * round(battery / 20) + "·" * (5 - round(battery / 20))
+            entries.append(f"#{robot_id:<4} {bar} {battery:5.1f}% {status}"[:PANEL_WIDTH - 1].ljust(PANEL_WIDTH))
+        for start in range(0, len(entries), per_line):
+            if len(lines) >= rows:
+                break
+            lines.append("".join(entries[start:start + per_line]).rstrip())
+        return lines
+
+    def frame(self, fps=0.0):
+        """Намалювати один кадр (лише зміни від попереднього); повертає кількість байтів"""
+        now = time.monotonic()
+        if now - self._pallets_at >= 1.0:
+            self._pallets_at = now
+            self._refresh_pallets()
+        self._apply_events()
+
+        size = shutil.get_terminal_size((120, 40))
+        width = min(self.layout["grid_width"], size.columns)
+        height = min(self.layout["grid_height"], max(1, size.lines - 4))
+        parts = []
+        if size != self._size:
+            # Перший кадр або змінився розмір терміналу — малюємо все заново
+            self._size = size
+            self._drawn = {}
+            self._panel = []
+            self._dirty = {(x, y) for x in range(width) for y in range(height)}
+            parts.append("\x1b[?25l\x1b[2J")
+
+        crowd = {}
+        for position, battery, _ in self._robots.values():
+            if position is not None:
+                cell = tuple(position)
+                crowd[cell] = crowd.get(cell, 0) + 1
+                if battery < 20:
+                    crowd[("low", cell)] = True
+        robot_cells = {cell for cell in crowd if cell[0] != "low"}
+        dirty = self._dirty | self._robot_cells | robot_cells
+        self._robot_cells = robot_cells
+        self._dirty = set()
+
+        for cell in sorted(dirty, key=lambda cell: (cell[1], cell[0])):
+            x, y = cell
+            if x >= width or y >= height:
+                continue
+            glyph = self._glyph(cell, crowd)
+            if self._drawn.get(cell) != glyph:
+                self._drawn[cell] = glyph
+                parts.append(f"\x1b[{y + 1};{x + 1}H{glyph}")
+
+        lines = self._panel_lines(size.columns, max(1, size.lines - height - 1), fps)
+        for number in range(max(len(lines), len(self._panel))):
+            line = lines[number] if number < len(lines) else ""
+            if number >= len(self._panel) or self._panel[number] != line:
+                parts.append(f"\x1b[{height + 2 + number};1H{line}\x1b[K")
+        self._panel = lines
+
+        self.frames += 1
+        return self._write("".join(parts))
+
+    def _write(self, text):
+        if text:
+            self.out.write(text)
+            self.out.flush()
+            self.bytes_written += len(text)
+        return len(text)
+
+    def run(self, fps=30, duration=None, stop=None):
+        """Малювати кадри з частотою fps до duration секунд або до stop.set()"""
+        interval = 1 / fps
+        started = time.monotonic()
+        next_frame = started
+        last = started
+        measured = 0.0
+        try:
+            while not (stop is not None and stop.is_set()):
+                now = time.monotonic()
+                if duration is not None and now - started >= duration:
+                    break
+                if now > last:
+                    measured = 0.9 * measured + 0.1 / (now - last) if measured else 1 / (now - last)
+                last = now
+                self.frame(measured)
+                next_frame += interval
+                time.sleep(max(0.0, next_frame - time.monotonic()))
+        finally:
+            self.close()
+
+
+if __name__ == "__main__":
+    from simulation.engine import simulate_shift
+
+    parser = argparse.ArgumentParser(description="Симуляція зміни складу з переглядом у терміналі")
+    parser.add_argument("--robots", type=int, default=100)
+    parser.add_argument("--hours", type=float, default=1.0)
+    parser.add_argument("--orders-per-hour", type=float, default=600)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--realtime", type=float, default=30.0, help="масштаб реального часу (1.0 — як у житті)")
+    parser.add_argument("--fps", type=float, default=30)
+    args = parser.parse_args()
+
+    out = sys.stdout  # симуляція перенаправляє sys.stdout, щоб приглушити повідомлення роботів
+    views = []
+    started = threading.Event()
+    finished = threading.Event()
+    result = {}
+
+    def on_start(layout, robots):
+        views.append(ConsoleView(layout, robots, out))
+        started.set()
+
+    def simulate():
+        try:
+            result.update(simulate_shift(args.robots, args.hours, args.orders_per_hour, args.seed, args.realtime,
+                                         on_start=on_start))
+        finally:
+            started.set()
+            finished.set()
+
+    threading.Thread(target=simulate, name="simulation", daemon=True).start()
+    started.wait()
+    try:
+        if views:
+            views[0].run(args.fps, stop=finished)
+    except KeyboardInterrupt:
+        pass
+    print(result)
@@ -0,0 +1,213 @@
+import argparse
+import contextlib
+import itertools
+import math
+import os
+import random
+import time
+from heapq import heappush, heappop
+
+from db.backends import SqliteBackend, seed_demo_data
+from db.connection import db_connection, use_backend
+from db.telemetry import telemetry
+from logic.dispatcher import OrderDispatcher
+from logic.orders import clear_orders
+from logic.robot import RobotNavigator, reservations, reset_fleet_state
+from simulation.load_generator import OrderStream, insert_orders
+from simulation.warehouse_map import scaled_layout
+
+
+class SimulationEngine:
+    """Дискретно-подійна симуляція складу з віртуальним годинником.
+
+    Процес — генератор кроків (як RobotNavigator.run_steps()): кожне yield
+    повертає, скільки секунд віртуального часу процес чекає. Пробудження
+    процесів лежать у купі за (час, порядковий номер), тож за однакового seed
+    порядок подій завжди той самий. Процеси виконуються по черзі в потоці,
+    що викликав run(), а очікування не займає реального часу — симуляція йде
+    так швидко, як дозволяє процесор. realtime_factor сповільнює її до
+    масштабу реального часу: 1.0 — як у житті, 60.0 — хвилина за секунду.
+    """
+
+    def __init__(self, seed=None, realtime_factor=None):
+        self.now = 0.0
+        self.seed = seed
+        self.random = random.Random(seed)
+        if seed is not None:
+            random.seed(seed)  # частина логіки (наприклад, generate_random_order) користується модулем random
+        self.realtime_factor = realtime_factor
+        self.events = 0  # скільки подій оброблено
+        self._queue = []  # (час, порядковий номер, процес)
+        self._order = itertools.count()
+
+    def clock(self):
+        """Поточний віртуальний час, с (підставляється роботам замість time.monotonic)"""
+        return self.now
+
+    def process(self, steps, delay=0.0):
+        """Запустити процес-генератор через delay секунд віртуального часу"""
+        heappush(self._queue, (self.now + delay, next(self._order), steps))
+
+    def add_robot(self, robot, delay=0.0):
+        """Перевести робота на віртуальний годинник і запустити його основний цикл"""
+        robot.clock = self.clock
+        robot.park_here()  # стоянку в таблиці резервувань — заново, у віртуальних тактах
+        self.process(robot.run_steps(), delay)
+
+    def run(self, until=None):
+        """Обробляти події до моменту until (с віртуального часу) або поки вони не скінчаться"""
+        queue = self._queue
+        wall_start = time.perf_counter()
+        sim_start = self.now
+        while queue and (until is None or queue[0][0] <= until):
+            at, _, steps = heappop(queue)
+            if self.realtime_factor:
+                lag = (at - sim_start) / self.realtime_factor - (time.perf_counter() - wall_start)
+                if lag > 0:
+                    time.sleep(lag)
+            self.now = at
+            self.events += 1
+            try:
+                wait = next(steps)
+            except StopIteration:
+                continue
+            heappush(queue, (at + max(wait or 0, 0), next(self._order), steps))
+        if until is not None and self.now < until:
+            self.now = until
+        return self.events
+
+
+def order_arrivals(engine, orders_per_hour, **options):
+    """Замовлення надходять пуассонівським потоком з інтенсивністю orders_per_hour.
+
+    Розподіли позицій і популярності товарів — як в OrderStream (options
+    передаються йому); випадковість — з engine.random, тож потік відтворюваний.
+    """
+    stream = OrderStream.from_db(orders_per_hour=orders_per_hour, rng=engine.random, **options)
+    while True:
+        yield stream.next_gap()
+        with db_connection() as conn:
+            insert_orders(conn, [stream.next_order()])
+
+
+def courier(interval):
+    """Кур'єр кожні interval секунд забирає виконані замовлення з полиць"""
+    while True:
+        yield interval
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT DISTINCT s.current_order_id
+                FROM shelves s
+                JOIN orders o ON o.id = s.current_order_id
+                WHERE o.status = 'done'
+                ORDER BY s.current_order_id
+            """)
+            clear_orders(conn, [order_id for (order_id,) in cursor.fetchall()])
+
+
+def prune_reservations(engine, step_time, interval=60):
+    """Раз на interval секунд забувати резервування тактів, що вже минули"""
+    while True:
+        yield interval
+        # Робот, що відстав від розкладу більш ніж на такт, однаково перераховує маршрут
+        reservations.prune(int(engine.now / step_time) - 2)
+
+
+def home_positions(layout, robot_count):
+    """Стартові клітинки роботів: колонка 18 кожного блоку (рядки 2..39)"""
+    columns = layout["grid_width"] // 20
+    blocks = columns * (layout["grid_height"] // 41)
+    positions = []
+    for y in range(2, 40):
+        for block in range(blocks):
+            positions.append((block % columns * 20 + 18, block // columns * 41 + y))
+    return positions[:robot_count]
+
+
+def shift_layout(robot_count):
+    """Планування складу, в колонках 18 якого вистачить місця robot_count роботам"""
+    blocks = math.ceil(robot_count / 38)
+    return scaled_layout(columns=min(blocks, 5), rows=math.ceil(blocks / 5))
+
+
+def simulate_shift(robot_count=100, hours=24.0, orders_per_hour=600, seed=1, realtime_factor=None,
+                   courier_interval=300, poll_interval=5, dispatch=True, quiet=True, on_start=None):
+    """Прогнати зміну складу у вбудованій БД і повернути підсумок.
+
+    Склад масштабується scaled_layout так, щоб у колонках 18 блоків вистачило
+    місця всім роботам; кожен робот заряджається на станції свого блоку.
+    dispatch=False — роботи самі опитують БД замість OrderDispatcher.
+    on_start(layout, robots) викликається, коли БД і роботи готові, перед запуском.
+    """
+    layout = shift_layout(robot_count)
+    robot_ids = list(range(1, robot_count + 1))
+    homes = home_positions(layout, robot_count)
+    # Стан попередньої зміни (позиції, резервування, маршрути) не має впливати на нову
+    telemetry.reset()
+    reset_fleet_state()
+    use_backend(SqliteBackend(":memory:", seed=lambda conn: seed_demo_data(
+        conn, layout["shelf_coords"], layout["pallet_coords"], robot_ids,
+        pallet_stock=100000, robot_positions=homes,
+    )))
+
+    engine = SimulationEngine(seed=seed, realtime_factor=realtime_factor)
+    dispatcher = OrderDispatcher(batch_interval=poll_interval, clock=engine.clock) if dispatch else None
+    output = open(os.devnull, "w") if quiet else None
+    with contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext():
+        columns = layout["grid_width"] // 20
+        robots = []
+        for robot_id, home in zip(robot_ids, homes):
+            robot = RobotNavigator(
+                robot_id, layout["grid_width"], layout["grid_height"], layout["shelf_coords"],
+                layout["pallet_coords"], layout["charging_station"], layout["delivery_zone"],
+            )
+            robot.home_position = home
+            robot.charging_station = layout["charging_stations"][home[1] // 41 * columns + home[0] // 20]
+            robot.poll_interval = poll_interval
+            robot.dispatcher = dispatcher
+            robots.append(robot)
+            # Роботи прокидаються в різні моменти першої секунди, а не всі одночасно
+            engine.add_robot(robot, delay=engine.random.random())
+        engine.process(order_arrivals(engine, orders_per_hour))
+        engine.process(courier(courier_interval))
+        if robots:
+            engine.process(prune_reservations(engine, robots[0].step_time))
+        if on_start is not None:
+            on_start(layout, robots)
+
+        wall_start = time.perf_counter()
+        engine.run(until=hours * 3600)
+        wall_time = time.perf_counter() - wall_start
+    if output is not None:
+        output.close()
+    if dispatcher is not None:
+        dispatcher.close()
+    telemetry.flush()
+
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT status, COUNT(*) FROM orders GROUP BY status ORDER BY status")
+        orders = dict(cursor.fetchall())
+    return {
+        "robots": robot_count,
+        "simulated_hours": hours,
+        "wall_seconds": round(wall_time, 2),
+        "events": engine.events,
+        "orders": orders,
+        "trips": sum(robot.trips for robot in robots),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Дискретно-подійна симуляція зміни складу")
+    parser.add_argument("--robots", type=int, default=100)
+    parser.add_argument("--hours", type=float, default=24.0)
+    parser.add_argument("--orders-per-hour", type=float, default=600)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--realtime", type=float, default=None, help="масштаб реального часу (1.0 — як у житті)")
+    parser.add_argument("--polling", action="store_true", help="роботи самі опитують БД, без диспетчера")
+    parser.add_argument("--verbose", action="store_true", help="показувати повідомлення роботів")
+    args = parser.parse_args()
+    print(simulate_shift(args.robots, args.hours, args.orders_per_hour, args.seed, args.realtime,
+                         dispatch=not args.polling, quiet=not args.verbose))
@@ -0,0 +1,77 @@
+import queue
+import threading
+
+import config
+
+
+class BackgroundWorker:
+    """Запити до БД і виклики логіки для GUI — у фонових потоках, а не в головному циклі Tk.
+
+    submit(fn, on_done, key) виконує fn() в одному з workers потоків, а
+    on_done(результат) викликається вже в потоці Tk: результати складаються в
+    чергу, яку головний цикл забирає через after() раз на poll_ms мілісекунд.
+
+    Запити з однаковим key (наприклад, "orders" — оновити список замовлень)
+    об'єднуються: якщо такий запит ще чекає в черзі, він просто замінюється
+    новим, а результат запиту, після якого вже надійшов новіший, відкидається
+    як застарілий. Дії без key (обробити замовлення тощо) виконуються всі.
+    """
+
+    def __init__(self, root, workers=None, poll_ms=30):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._tasks = queue.Queue()
+        self._results = queue.Queue()
+        self._lock = threading.Lock()
+        self._queued = {}  # key: задача, що ще не почалась
+        self._generation = {}  # key: номер останнього запиту
+        for number in range(workers or config.GUI_WORKERS):
+            threading.Thread(target=self._run, name=f"gui-worker-{number}", daemon=True).start()
+        root.after(poll_ms, self._poll)
+
+    def submit(self, fn, on_done=None, key=None, on_error=None):
+        """Виконати fn() у фоні; on_done(результат) / on_error(помилка) — у потоці Tk"""
+        with self._lock:
+            if key is None:
+                task = [fn, on_done, on_error, None, None]
+            else:
+                generation = self._generation.get(key, 0) + 1
+                self._generation[key] = generation
+                task = self._queued.get(key)
+                if task is not None:
+                    # Попередній такий самий запит ще не почався — замінюємо його
+                    task[:] = [fn, on_done, on_error, key, generation]
+                    return
+                task = [fn, on_done, on_error, key, generation]
+                self._queued[key] = task
+        self._tasks.put(task)
+
+    def _run(self):
+        while True:
+            task = self._tasks.get()
+            with self._lock:
+                fn, on_done, on_error, key, generation = task
+                if key is not None and self._queued.get(key) is task:
+                    del self._queued[key]
+            try:
+                self._results.put((on_done, on_error, key, generation, fn(), None))
+            except Exception as e:
+                self._results.put((on_done, on_error, key, generation, None, e))
+
+    def _poll(self):
+        # Наступне опитування плануємо одразу: помилка в on_done не зупинить цикл
+        self.root.after(self.poll_ms, self._poll)
+        while True:
+            try:
+                on_done, on_error, key, generation, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if key is not None and generation != self._generation.get(key):
+                continue  # після цього запиту вже надійшов новіший
+            if error is not None:
+                if on_error is not None:
+                    on_error(error)
+                else:
+                    print("Помилка фонового запиту", error)
+            elif on_done is not None:
+                on_done(result)
@@ -0,0 +1,166 @@
+import argparse
+import bisect
+import itertools
+import math
+import random
+import time
+from datetime import datetime
+
+from db.connection import db_connection, get_backend
+from logic.events import events
+
+# Скільки замовлень вставляти одним INSERT (SQL Server приймає до 2100 параметрів)
+INSERT_CHUNK = 500
+
+
+class OrderStream:
+    """Синтетичний потік замовлень із заданими розподілами.
+
+    Інтервали між замовленнями — експоненційні (пуассонівський потік з
+    інтенсивністю orders_per_hour), кількість позицій — 1 + Пуассон із
+    середнім mean_lines - 1 (не більше max_lines), кількість кожного товару —
+    1 + Пуассон із середнім mean_quantity - 1 (не більше max_quantity).
+    Популярність товарів — закон Ципфа з показником zipf_s: товар з рангом r
+    (за порядком id) вибирається з вагою 1 / r^zipf_s; zipf_s = 0 — рівномірно.
+    За однакового seed (або rng) потік завжди той самий.
+    """
+
+    def __init__(self, item_ids, orders_per_hour=600, mean_lines=1.5, max_lines=5, mean_quantity=2.5,
+                 max_quantity=6, zipf_s=1.0, seed=None, rng=None):
+        if not item_ids:
+            raise ValueError("Немає товарів для замовлень")
+        self.item_ids = sorted(item_ids)
+        self.orders_per_hour = orders_per_hour
+        self.mean_lines = mean_lines
+        self.max_lines = min(max_lines, len(self.item_ids))
+        self.mean_quantity = mean_quantity
+        self.max_quantity = max_quantity
+        self.random = rng or random.Random(seed)
+        weights = [1 / rank ** zipf_s for rank in range(1, len(self.item_ids) + 1)]
+        self._cumulative = list(itertools.accumulate(weights))
+
+    @classmethod
+    def from_db(cls, **options):
+        """Потік по товарах із таблиці items (читається один раз)"""
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id FROM items")
+            item_ids = [row[0] for row in cursor.fetchall()]
+        return cls(item_ids, **options)
+
+    def _poisson(self, mean):
+        """Пуассонівська величина (метод Кнута — середні тут невеликі)"""
+        if mean <= 0:
+            return 0
+        limit = math.exp(-mean)
+        k = 0
+        p = self.random.random()
+        while p > limit:
+            k += 1
+            p *= self.random.random()
+        return k
+
+    def next_gap(self):
+        """Секунди до наступного замовлення"""
+        return self.random.expovariate(self.orders_per_hour / 3600)
+
+    def next_order(self):
+        """Позиції наступного замовлення: [(item_id, кількість)], товари не повторюються"""
+        count = min(1 + self._poisson(self.mean_lines - 1), self.max_lines)
+        total = self._cumulative[-1]
+        chosen = []
+        while len(chosen) < count:
+            item_id = self.item_ids[bisect.bisect(self._cumulative, self.random.random() * total)]
+            if item_id not in chosen:
+                chosen.append(item_id)
+        return [(item_id, min(1 + self._poisson(self.mean_quantity - 1), self.max_quantity)) for item_id in chosen]
+
+    def arrivals(self, start=0.0):
+        """Нескінченний розклад: (момент надходження, позиції замовлення)"""
+        at = start
+        while True:
+            at += self.next_gap()
+            yield at, self.next_order()
+
+
+def insert_orders(conn, orders, created_at=None):
+    """Вставити замовлення пакетами: INSERT ... по INSERT_CHUNK рядків і executemany для позицій.
+
+    orders — [[(item_id, кількість), ...], ...]. Повертає id нових замовлень.
+    """
+    if not orders:
+        return []
+    cursor = conn.cursor()
+    created_at = created_at or datetime.now().replace(microsecond=0)
+    order_ids = []
+    for start in range(0, len(orders), INSERT_CHUNK):
+        chunk = orders[start:start + INSERT_CHUNK]
+        order_ids.extend(get_backend().insert_returning_ids(
+            cursor, "orders", ("created_at", "status"), [(created_at, 'pending')] * len(chunk)
+        ))
+    cursor.executemany(
+        "INSERT INTO order_items (order_id, item_id, quantity) VALUES (?, ?, ?)",
+        [(order_id, item_id, quantity) for order_id, lines in zip(order_ids, orders) for item_id, quantity in lines]
+    )
+    conn.commit()
+    for order_id in order_ids:
+        events.publish("order", order_id, status="pending")
+    return order_ids
+
+
+def run_open_loop(stream, duration, tick=0.1, quiet=False):
+    """Відкрита петля: замовлення вставляються за розкладом потоку, незалежно від того, чи встигає парк.
+
+    Раз на tick секунд усі замовлення, чий момент настав, вставляються одним
+    пакетом. Повертає підсумок: скільки замовлень і позицій, фактична
+    інтенсивність і найбільше запізнення вставки від розкладу.
+    """
+    arrivals = stream.arrivals()
+    upcoming = next(arrivals)
+    started = time.perf_counter()
+    orders = lines = 0
+    max_lag = 0.0
+    while True:
+        now = time.perf_counter() - started
+        if now >= duration:
+            break
+        due = []
+        while upcoming[0] <= now:
+            due.append(upcoming)
+            upcoming = next(arrivals)
+        if due:
+            with db_connection() as conn:
+                insert_orders(conn, [order for _, order in due])
+            max_lag = max(max_lag, time.perf_counter() - started - due[0][0])
+            orders += len(due)
+            lines += sum(len(order) for _, order in due)
+            if not quiet:
+                print(f"{now:8.1f} с: +{len(due)} замовлень (усього {orders})")
+        time.sleep(max(0.0, min(tick, upcoming[0] - now, duration - now)))
+    elapsed = time.perf_counter() - started
+    return {
+        "orders": orders,
+        "lines": lines,
+        "seconds": round(elapsed, 2),
+        "orders_per_hour": round(orders / elapsed * 3600) if elapsed else 0,
+        "max_lag_seconds": round(max_lag, 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Генератор потоку замовлень (відкрита петля)")
+    parser.add_argument("--orders-per-hour", type=float, default=3600)
+    parser.add_argument("--duration", type=float, default=60, help="тривалість, с реального часу")
+    parser.add_argument("--mean-lines", type=float, default=1.5)
+    parser.add_argument("--max-lines", type=int, default=5)
+    parser.add_argument("--mean-quantity", type=float, default=2.5)
+    parser.add_argument("--max-quantity", type=int, default=6)
+    parser.add_argument("--zipf", type=float, default=1.0, help="показник Ципфа для популярності товарів")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+    stream = OrderStream.from_db(
+        orders_per_hour=args.orders_per_hour, mean_lines=args.mean_lines, max_lines=args.max_lines,
+        mean_quantity=args.mean_quantity, max_quantity=args.max_quantity, zipf_s=args.zipf, seed=args.seed,
+    )
+    print(run_open_loop(stream, args.duration, quiet=args.quiet))
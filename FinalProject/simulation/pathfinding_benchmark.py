@@ -0,0 +1,227 @@
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+
+import config
+from logic.grid import FREE, StaticGrid
+from logic.hierarchy import HierarchicalPlanner
+from logic.navigator import GridPlanner
+from simulation.warehouse_map import scaled_layout
+
+PLANNERS = ("a_star", "dijkstra", "jps", "hpa")
+
+
+def _grid(columns=1, rows=1):
+    layout = scaled_layout(columns, rows)
+    return StaticGrid.from_layout(layout["grid_width"], layout["grid_height"], layout["shelf_coords"],
+                                  layout["pallet_coords"])
+
+
+def _free_cells(grid):
+    return [grid.coords(index) for index, kind in enumerate(grid.cells) if kind == FREE]
+
+
+def _random_pairs(rng, cells, count):
+    pairs = []
+    while len(pairs) < count:
+        start, goal = rng.sample(cells, 2)
+        pairs.append((start, goal))
+    return pairs
+
+
+def build_scenarios(seed=1, queries=200):
+    """Фіксовані набори запитів: [(назва, карта, [(start, goal)], зайняті роботами індекси)].
+
+    random — випадкові пари на базовому складі; cross — найдальші поїздки
+    через увесь склад (кути й протилежні краї); congested — випадкові пари,
+    коли 15% вільних клітинок зайняті роботами; scaled — випадкові пари на
+    складі 5 × 2 блоки. За однакового seed набори завжди ті самі.
+    """
+    rng = random.Random(seed)
+    base = _grid()
+    cells = _free_cells(base)
+    scenarios = [("random", base, _random_pairs(rng, cells, queries), set())]
+
+    # Найдальші поїздки: клітинки з найменшою сумою координат — з найбільшою, і навскіс
+    by_sum = sorted(cells, key=lambda cell: (cell[0] + cell[1], cell))
+    by_diff = sorted(cells, key=lambda cell: (cell[0] - cell[1], cell))
+    corners = max(1, queries // 8)
+    cross = []
+    for ordered in (by_sum, by_diff):
+        for near, far in zip(ordered[:corners], reversed(ordered[-corners:])):
+            cross.append((near, far))
+            cross.append((far, near))
+    scenarios.append(("cross", base, cross, set()))
+
+    congested = _random_pairs(rng, cells, queries)
+    endpoints = {cell for pair in congested for cell in pair}
+    robots = rng.sample([cell for cell in cells if cell not in endpoints], len(cells) * 15 // 100)
+    scenarios.append(("congested", base, congested, {base.index(x, y) for x, y in robots}))
+
+    scaled = _grid(5, 2)
+    scenarios.append(("scaled", scaled, _random_pairs(rng, _free_cells(scaled), queries), set()))
+    return scenarios
+
+
+def _percentile(values, p):
+    """Перцентиль за рангом (nearest rank) з відсортованого списку"""
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def _valid(grid, start, goal, path, blocked):
+    """Шлях іде сусідніми клітинками, не через полиці, палети й роботів (ціль — можна)"""
+    previous = start
+    for x, y in path:
+        if abs(x - previous[0]) + abs(y - previous[1]) != 1:
+            return False
+        if (x, y) != goal and (grid.is_blocked(x, y) or grid.index(x, y) in blocked):
+            return False
+        previous = (x, y)
+    return not path or previous == goal
+
+
+def run_planner(name, grid, pairs, blocked, repeat=3, warmup=20):
+    """Прогнати запити одним планувальником: затримки (нс), розкриті вершини і довжини шляхів"""
+    planner = GridPlanner(grid)
+    build_ns = 0
+    if name == "hpa":
+        started = time.perf_counter_ns()
+        hierarchy = HierarchicalPlanner(grid, config.HPA_CLUSTER_SIZE)
+        build_ns = time.perf_counter_ns() - started
+
+        def search(start, goal):
+            # Як у RobotNavigator.find_path: статичний маршрут, потім об'їзд роботів
+            path = hierarchy.find_path(start, goal)
+            if blocked:
+                path = hierarchy.repair(start, path, blocked, planner)
+            return path, hierarchy.expansions
+    else:
+        def search(start, goal):
+            path = planner.find_path(start, goal, blocked, algorithm=name)
+            return path, planner.expansions
+
+    for start, goal in pairs[:warmup]:
+        search(start, goal)
+
+    latencies = []
+    expansions = []
+    paths = []
+    for start, goal in pairs:
+        for _ in range(repeat):
+            started = time.perf_counter_ns()
+            path, expanded = search(start, goal)
+            latencies.append(time.perf_counter_ns() - started)
+        expansions.append(expanded)
+        paths.append(path)
+    return {"latencies": latencies, "expansions": expansions, "paths": paths, "build_ns": build_ns}
+
+
+def run_benchmark(seed=1, queries=200, repeat=3, warmup=20, planners=PLANNERS, scenarios=None):
+    """Прогнати всі сценарії всіма планувальниками; повертає звіт, придатний для json.dump.
+
+    Довжини шляхів порівнюються з Дейкстрою (точний найкоротший шлях):
+    parity — частка розв'язних запитів з такою самою довжиною, max_excess — на скільки
+    кроків найгірший шлях довший, invalid — шляхи, що йдуть крізь перешкоди.
+    """
+    results = []
+    for scenario, grid, pairs, blocked in scenarios or build_scenarios(seed, queries):
+        reference = run_planner("dijkstra", grid, pairs, blocked, repeat=1, warmup=0)["paths"]
+        solvable = sum(1 for best in reference if best) or 1
+        for name in planners:
+            run = run_planner(name, grid, pairs, blocked, repeat, warmup)
+            latencies = sorted(run["latencies"])
+            expansions = sorted(run["expansions"])
+            excess = []
+            not_found = invalid = 0
+            for (start, goal), path, best in zip(pairs, run["paths"], reference):
+                if not path:
+                    not_found += bool(best)
+                    continue
+                if not _valid(grid, start, goal, path, blocked):
+                    invalid += 1
+                excess.append(len(path) - len(best) if best else 0)
+            results.append({
+                "scenario": scenario,
+                "planner": name,
+                "grid": f"{grid.width}x{grid.height}",
+                "queries": len(pairs),
+                "samples": len(latencies),
+                "p50_us": round(_percentile(latencies, 50) / 1000, 1),
+                "p95_us": round(_percentile(latencies, 95) / 1000, 1),
+                "p99_us": round(_percentile(latencies, 99) / 1000, 1),
+                "mean_us": round(sum(latencies) / len(latencies) / 1000, 1),
+                "expansions_mean": round(sum(expansions) / len(expansions), 1),
+                "expansions_p95": _percentile(expansions, 95),
+                "parity": round(sum(1 for value in excess if value == 0) / solvable, 4),
+                "max_excess": max(excess, default=0),
+                "not_found": not_found,
+                "invalid": invalid,
+                "build_ms": round(run["build_ns"] / 1e6, 1),
+            })
+    return {
+        "meta": {
+            "seed": seed,
+            "queries": queries,
+            "repeat": repeat,
+            "warmup": warmup,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+
+
+def compare(report, baseline, tolerance=0.25):
+    """Регресії відносно базового звіту: список рядків-описів (порожній — усе гаразд).
+
+    p95 затримки може зрости не більше ніж на tolerance (частка), розкриті
+    вершини й довжини шляхів детерміновані — для них допуску немає.
+    """
+    previous = {(row["scenario"], row["planner"]): row for row in baseline["results"]}
+    problems = []
+    for row in report["results"]:
+        old = previous.get((row["scenario"], row["planner"]))
+        if old is None:
+            continue
+        label = f"{row['scenario']}/{row['planner']}"
+        for metric, factor in (("p95_us", 1 + tolerance), ("expansions_mean", 1.0)):
+            if old[metric] and row[metric] > old[metric] * factor:
+                problems.append(f"{label}: {metric} {old[metric]} -> {row[metric]}")
+        if row["parity"] < old["parity"] or row["max_excess"] > old["max_excess"]:
+            problems.append(f"{label}: довжини шляхів гірші (parity {old['parity']} -> {row['parity']}, "
+                            f"max_excess {old['max_excess']} -> {row['max_excess']})")
+        if row["invalid"] or row["not_found"] > old["not_found"]:
+            problems.append(f"{label}: invalid {row['invalid']}, not_found {old['not_found']} -> {row['not_found']}")
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк алгоритмів пошуку шляху")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--queries", type=int, default=200, help="запитів у сценарії")
+    parser.add_argument("--repeat", type=int, default=3, help="скільки разів вимірювати кожен запит")
+    parser.add_argument("--warmup", type=int, default=20, help="запитів на прогрів перед вимірюванням")
+    parser.add_argument("--planners", default=",".join(PLANNERS))
+    parser.add_argument("--output", help="записати звіт у JSON-файл")
+    parser.add_argument("--baseline", help="JSON-звіт попереднього прогону: знайдені регресії — код виходу 1")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="допустиме зростання p95 затримки (частка)")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.seed, args.queries, args.repeat, args.warmup, args.planners.split(","))
+    for row in report["results"]:
+        print(f"{row['scenario']:<10} {row['planner']:<8} p50 {row['p50_us']:>9} мкс  p95 {row['p95_us']:>9} мкс  "
+              f"p99 {row['p99_us']:>9} мкс  розкрито {row['expansions_mean']:>8}  "
+              f"parity {row['parity']:.3f}  +{row['max_excess']}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            problems = compare(report, json.load(f), args.tolerance)
+        for problem in problems:
+            print("Регресія:", problem)
+        sys.exit(1 if problems else 0)
@@ -0,0 +1,167 @@
+import time
+
+SHELF_COLORS = {"busy": "#ff9999", "free": "#add8e6"}
+PALLET_FULL = "#90ee90"
+PALLET_EMPTY = "#d3d3d3"
+
+
+class WarehouseCanvas:
+    """Карта складу на tk.Canvas, що малюється один раз і далі лише оновлюється.
+
+    Сітка, підписи координат і зарядні станції — статичний шар (тег "static"),
+    полиці й палети (теги "shelf", "pallet") створюються один раз; set_shelves()
+    і set_pallets() перефарбовують лише клітинки, стан яких змінився. Роботи
+    (тег "robot") не перестворюються: move_robot() / set_robots() переносять
+    наявні фігури через canvas.coords, плавно за animation_ms мілісекунд,
+    кадр — раз на frame_ms.
+
+    layout — словник як у scaled_layout(): shelf_coords, pallet_coords,
+    charging_stations, grid_width, grid_height.
+    """
+
+    def __init__(self, canvas, layout, cell_size=65, robot_radius=10, animation_ms=400, frame_ms=33):
+        self.canvas = canvas
+        self.layout = layout
+        self.cell_size = cell_size
+        self.robot_radius = robot_radius
+        self.animation_ms = animation_ms
+        self.frame_ms = frame_ms
+        self._shelves = {}  # shelf_code: [rectangle, статус]
+        self._pallets = {}  # pallet_id: [rectangle, підпис, текст, (підпис, назва товару, кількість)]
+        self._robots = {}  # robot_id: [oval, текст, звідки (px, py), куди (px, py), початок руху]
+        self._moving = set()
+        self._animating = False
+        self._draw_static()
+
+    def _cell(self, x, y):
+        size = self.cell_size
+        return x * size, y * size, (x + 1) * size, (y + 1) * size
+
+    def _draw_static(self):
+        canvas = self.canvas
+        size = self.cell_size
+        width, height = self.layout["grid_width"], self.layout["grid_height"]
+
+        # === Сітка: лінії замість прямокутника на кожну клітинку ===
+        for x in range(width + 1):
+            canvas.create_line(x * size, 0, x * size, height * size, fill="#cccccc", tags="static")
+        for y in range(height + 1):
+            canvas.create_line(0, y * size, width * size, y * size, fill="#cccccc", tags="static")
+        for x in range(width):
+            for y in range(height):
+                canvas.create_text(x * size + 5, y * size + 5, text=f"({x},{y})", anchor="nw",
+                                   font=("Arial", 5), fill="#999999", tags="static")
+
+        # === Полиці ===
+        for code, (x, y) in self.layout["shelf_coords"].items():
+            x1, y1, x2, y2 = self._cell(x, y)
+            rect = canvas.create_rectangle(x1, y1, x2, y2, fill=SHELF_COLORS["free"], outline="black", tags="shelf")
+            canvas.create_text((x1 + x2) / 2, (y1 + y2) / 2, text=code, font=("Arial", 6), width=size - 10,
+                               tags="shelf")
+            self._shelves[code] = [rect, "free"]
+
+        # === Палети ===
+        for pallet_id, (x, y) in self.layout["pallet_coords"].items():
+            x1, y1, x2, y2 = self._cell(x, y)
+            rect = canvas.create_rectangle(x1, y1, x2, y2, fill=PALLET_EMPTY, outline="black", tags="pallet")
+            label = canvas.create_text((x1 + x2) / 2, y1 + 12, text=f"P{pallet_id}", font=("Arial", 7, "bold"),
+                                       width=size - 10, tags="pallet")
+            text = canvas.create_text((x1 + x2) / 2, (y1 + y2) / 2 + 10, text="порожньо", font=("Arial", 7),
+                                      width=size - 10, tags="pallet")
+            self._pallets[pallet_id] = [rect, label, text, (None, None, None)]
+
+        # === Зарядні станції ===
+        for x, y in self.layout["charging_stations"]:
+            x1, y1, x2, y2 = self._cell(x, y)
+            canvas.create_oval(x1, y1, x2, y2, fill="#ffb6c1", outline="black", tags="static")
+            canvas.create_text((x1 + x2) / 2, (y1 + y2) / 2, text="Зарядка", font=("Arial", 8), width=size - 10,
+                               tags="static")
+
+        canvas.configure(scrollregion=(0, 0, width * size, height * size))
+
+    def set_shelves(self, statuses):
+        """Статуси полиць {shelf_code: статус}; перефарбовуються лише змінені"""
+        for code, status in statuses.items():
+            shelf = self._shelves.get(code)
+            if shelf is None or shelf[1] == status:
+                continue
+            shelf[1] = status
+            self.canvas.itemconfigure(shelf[0], fill=SHELF_COLORS.get(status, SHELF_COLORS["free"]))
+
+    def set_pallets(self, contents):
+        """Вміст палет {pallet_id: (підпис, назва товару, кількість)}; оновлюються лише змінені"""
+        for pallet_id, (label, item_name, quantity) in contents.items():
+            pallet = self._pallets.get(pallet_id)
+            if pallet is None:
+                continue
+            if pallet[3] == (label, item_name, quantity):
+                continue
+            pallet[3] = (label, item_name, quantity)
+            full = bool(item_name and quantity)
+            self.canvas.itemconfigure(pallet[0], fill=PALLET_FULL if full else PALLET_EMPTY)
+            self.canvas.itemconfigure(pallet[1], text=label or f"P{pallet_id}")
+            self.canvas.itemconfigure(pallet[2], text=f"{item_name}\n{quantity}" if full else "порожньо")
+
+    def _center(self, x, y):
+        return x * self.cell_size + self.cell_size // 2, y * self.cell_size + self.cell_size // 2
+
+    def _place(self, robot, px, py):
+        r = self.robot_radius
+        self.canvas.coords(robot[0], px - r, py - r, px + r, py + r)
+        self.canvas.coords(robot[1], px, py - r - 10)
+
+    def _position(self, robot, now):
+        """Де фігура робота зараз (з урахуванням анімації)"""
+        (fx, fy), (tx, ty), started = robot[2], robot[3], robot[4]
+        t = (now - started) * 1000 / self.animation_ms if self.animation_ms else 1.0
+        if t >= 1.0:
+            return tx, ty
+        return fx + (tx - fx) * t, fy + (ty - fy) * t
+
+    def move_robot(self, robot_id, name, x, y):
+        """Перемістити робота в клітинку (x, y); новий робот з'являється одразу на місці"""
+        target = self._center(x, y)
+        robot = self._robots.get(robot_id)
+        if robot is None:
+            r = self.robot_radius
+            px, py = target
+            oval = self.canvas.create_oval(px - r, py - r, px + r, py + r, fill="orange", tags="robot")
+            text = self.canvas.create_text(px, py - r - 10, text=name, font=("Arial", 10), tags="robot")
+            self._robots[robot_id] = [oval, text, target, target, 0.0]
+            return
+        if robot[3] == target:
+            return
+        now = time.monotonic()
+        robot[2] = self._position(robot, now)
+        robot[3] = target
+        robot[4] = now
+        self._moving.add(robot_id)
+        if not self._animating:
+            self._animating = True
+            self.canvas.after(self.frame_ms, self._animate)
+
+    def set_robots(self, robots):
+        """Повний список роботів [(id, name, x, y)]: переміщує наявних, додає нових, прибирає зниклих"""
+        seen = set()
+        for robot_id, name, x, y in robots:
+            seen.add(robot_id)
+            self.move_robot(robot_id, name, x, y)
+        for robot_id in [robot_id for robot_id in self._robots if robot_id not in seen]:
+            oval, text = self._robots.pop(robot_id)[:2]
+            self.canvas.delete(oval)
+            self.canvas.delete(text)
+            self._moving.discard(robot_id)
+        self.canvas.tag_raise("robot")
+
+    def _animate(self):
+        now = time.monotonic()
+        for robot_id in list(self._moving):
+            robot = self._robots[robot_id]
+            px, py = self._position(robot, now)
+            self._place(robot, px, py)
+            if (px, py) == robot[3]:
+                self._moving.discard(robot_id)
+        if self._moving:
+            self.canvas.after(self.frame_ms, self._animate)
+        else:
+            self._animating = False
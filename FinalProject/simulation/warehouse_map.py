@@ -28,3 +28,36 @@ delivery_zone = (0, 1)
 #Загальна сітка (можна використовувати для малювання)
 grid_width = 20
 grid_height = 41
+
+
+def scaled_layout(columns=1, rows=1):
+    """Більший склад: базове планування, повторене columns × rows разів.
+
+    Полиці нумеруються далі по блоках ("41-1" — перший ряд другого блоку),
+    палети — так само. Зарядна станція і зона видачі лишаються в першому блоці,
+    а charging_stations містить зарядку кожного блоку.
+    Повертає словник з тими ж іменами, що й змінні цього модуля.
+    """
+    shelf_rows = len(shelf_coords) // 3
+    shelves = {}
+    pallets = {}
+    stations = []
+    for block_y in range(rows):
+        for block_x in range(columns):
+            block = block_y * columns + block_x
+            dx, dy = block_x * grid_width, block_y * grid_height
+            for code, (x, y) in shelf_coords.items():
+                row, level = code.split("-")
+                shelves[f"{block * shelf_rows + int(row)}-{level}"] = (x + dx, y + dy)
+            for number, (x, y) in pallet_coords.items():
+                pallets[block * len(pallet_coords) + number] = (x + dx, y + dy)
+            stations.append((charging_station[0] + dx, charging_station[1] + dy))
+    return {
+        "shelf_coords": shelves,
+        "pallet_coords": pallets,
+        "charging_station": charging_station,
+        "charging_stations": stations,
+        "delivery_zone": delivery_zone,
+        "grid_width": grid_width * columns,
+        "grid_height": grid_height * rows,
+    }
@@ -1,26 +1,28 @@
-import time
-from db.connection import get_connection
+from logic.dispatcher import OrderDispatcher
 from logic.robot import RobotNavigator
-from simulation.warehouse_map import shelf_coords, pallet_coords, charging_station, grid_width, grid_height
-from threading import Thread
+from logic.runtime import run_fleet
+from simulation.warehouse_map import shelf_coords, pallet_coords, charging_station, delivery_zone, grid_width, grid_height
 
 
 
-def start_robot(robot_id):
+dispatcher = OrderDispatcher()
+
+
+def create_robot(robot_id):
     robot = RobotNavigator(
         robot_id=robot_id,
         grid_width=grid_width,
         grid_height=grid_height,
         shelf_coords=shelf_coords,
         pallet_coords=pallet_coords,
-        charging_station=charging_station
+        charging_station=charging_station,
+        delivery_zone=delivery_zone
     )
-    thread = Thread(target=robot.run)
-    thread.daemon = True
-    thread.start()
-
+    robot.dispatcher = dispatcher  # замовлення роздає центральний диспетчер
+    return robot
 
-for r_id in [76, 77, 78, 79, 80, 81, 82, 83, 84, 85]:
-    start_robot(r_id)
 
-input("Натисніть Enter, для завершення тесту...")
\ No newline at end of file
+# Усі роботи — корутини одного циклу asyncio (див. logic/runtime.py)
+robots = [create_robot(r_id) for r_id in [76, 77, 78, 79, 80, 81, 82, 83, 84, 85]]
+print("Натисніть Ctrl+C, для завершення тесту...")
+run_fleet(robots)
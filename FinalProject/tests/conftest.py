@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Модулі проєкту імпортуються як у main.py: from logic..., from db...
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
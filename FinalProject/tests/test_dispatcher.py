@@ -0,0 +1,119 @@
+import itertools
+import random
+
+from db.backends import SqliteBackend, seed_demo_data
+from db.connection import db_connection, use_backend
+from logic.dispatcher import OrderDispatcher, hungarian
+from simulation.load_generator import insert_orders
+
+
+def best_total(costs):
+    """Мінімальна сума призначення перебором (рядків не більше, ніж стовпців)"""
+    n, m = len(costs), len(costs[0])
+    return min(sum(costs[row][col] for row, col in enumerate(cols)) for cols in itertools.permutations(range(m), n))
+
+
+def test_hungarian_matches_brute_force():
+    rng = random.Random(3)
+    for _ in range(200):
+        n, m = rng.randint(1, 5), rng.randint(1, 5)
+        costs = [[rng.choice([rng.randint(0, 20), rng.random() * 20]) for _ in range(m)] for _ in range(n)]
+        result = hungarian(costs)
+        assert len(result) == n
+        assigned = [(row, col) for row, col in enumerate(result) if col is not None]
+        assert len(assigned) == min(n, m)
+        assert len({col for _, col in assigned}) == len(assigned)
+        total = sum(costs[row][col] for row, col in assigned)
+        if n <= m:
+            expected = best_total(costs)
+        else:
+            # Зайві рядки лишаються без стовпця: оптимум по транспонованій матриці
+            expected = best_total([list(column) for column in zip(*costs)])
+        assert abs(total - expected) < 1e-9
+
+
+def test_hungarian_empty():
+    assert hungarian([]) == []
+    assert hungarian([[], []]) == [None, None]
+
+
+class FakeRobot:
+    max_capacity = 6
+    poll_interval = 1
+
+    def __init__(self, robot_id, position, battery_level=100):
+        self.robot_id = robot_id
+        self.position = position
+        self.battery_level = battery_level
+
+    def get_current_position(self):
+        return self.position
+
+    def travel_distance(self, start, target):
+        return abs(start[0] - target[0]) + abs(start[1] - target[1])
+
+
+def make_warehouse(orders):
+    # Палета 1 (товар 1) — у (0, 0), палета 2 (товар 2) — у (12, 0)
+    use_backend(SqliteBackend(":memory:", seed=lambda conn: seed_demo_data(
+        conn, {}, {1: (0, 0), 2: (12, 0)}, [], items=["A", "B"],
+    )))
+    with db_connection() as conn:
+        return insert_orders(conn, orders)
+
+
+def statuses():
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, status FROM orders ORDER BY id")
+        return dict(cursor.fetchall())
+
+
+def test_batch_minimises_total_distance():
+    first, second = make_warehouse([[(1, 1)], [(2, 1)]])
+    dispatcher = OrderDispatcher(waves=False)
+    try:
+        # Обидва замовлення на 6 кроків від near; far — за 2 кроки від палети 2 і за 14 від палети 1
+        near, far = FakeRobot(1, (6, 0)), FakeRobot(2, (14, 0))
+        assigned = dict((robot.robot_id, claimed) for robot, claimed in dispatcher._dispatch([near, far], 0))
+        assert assigned == {1: [first], 2: [second]}
+        assert statuses() == {first: "processing", second: "processing"}
+    finally:
+        dispatcher.close()
+
+
+def test_low_battery_robot_gets_the_shorter_trip():
+    first, second = make_warehouse([[(1, 1)], [(2, 1)]])
+    dispatcher = OrderDispatcher(waves=False, battery_weight=4)
+    try:
+        # Обидва за 4 і 8 кроків від палет; розряджений робот має їхати ближче
+        charged, drained = FakeRobot(1, (4, 0)), FakeRobot(2, (4, 0), battery_level=0)
+        assigned = dict((robot.robot_id, claimed) for robot, claimed in dispatcher._dispatch([charged, drained], 0))
+        assert assigned == {1: [second], 2: [first]}
+    finally:
+        dispatcher.close()
+
+
+def test_request_and_withdraw():
+    now = [0.0]
+    order_ids = make_warehouse([[(1, 2)], [(2, 2)], [(1, 1)]])
+    dispatcher = OrderDispatcher(batch_interval=5, clock=lambda: now[0])
+    try:
+        robot, other = FakeRobot(1, (0, 0)), FakeRobot(2, (12, 0))
+        # Хвиля: усі три замовлення влазять у робота (5 одиниць із 6)
+        assert sorted(dispatcher.request_orders(robot)) == order_ids
+        assert set(statuses().values()) == {"processing"}
+        now[0] = 1
+        assert dispatcher.request_orders(other) == []  # пакет щойно був — other чекає наступного
+
+        with db_connection() as conn:
+            far, near = insert_orders(conn, [[(2, 6)], [(1, 6)]])
+        now[0] = 10
+        assert dispatcher.request_orders(robot) == [near]  # пакет для обох роботів
+        assert statuses()[far] == "processing"
+        # other поїхав заряджатись, не забравши призначене
+        dispatcher.withdraw(other.robot_id)
+        assert statuses()[far] == "pending"
+        assert dispatcher.request_orders(other) == []
+    finally:
+        dispatcher.close()
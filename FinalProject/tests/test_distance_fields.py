@@ -0,0 +1,73 @@
+from array import array
+
+from db.backends import SqliteBackend, seed_demo_data
+from db.connection import use_backend
+from db.shelves import shelf_allocator
+from db.telemetry import telemetry
+from logic.distance_fields import DistanceFieldCache, get_distance_fields
+from logic.grid import SHELF, StaticGrid
+from logic.robot import RobotNavigator, reset_fleet_state
+
+
+def make_robot(shelves, pallets, position):
+    telemetry.reset()
+    reset_fleet_state()
+    use_backend(SqliteBackend(":memory:", seed=lambda conn: seed_demo_data(
+        conn, shelves, pallets, [1], robot_positions=[position],
+    )))
+    return RobotNavigator(1, 10, 10, shelves, pallets, (0, 9))
+
+
+def test_lru_keeps_only_declared_targets():
+    grid = StaticGrid(5, 5)
+    cache = DistanceFieldCache(grid, max_size=2)
+    cache.declare([(0, 0), (4, 4), (2, 2)])
+    for target in ((0, 0), (4, 4), (2, 2), (1, 1)):
+        cache.field(target)
+    assert cache.evictions == 1
+    assert set(cache._fields) == {grid.index(4, 4), grid.index(2, 2)}  # (1, 1) не оголошена
+    assert cache.distance((0, 0), (2, 2)) == 4
+
+
+def test_layout_change_invalidates_fields():
+    grid = StaticGrid(5, 3)
+    cache = DistanceFieldCache(grid)
+    cache.declare([(4, 0)])
+    assert cache.distance((0, 0), (4, 0)) == 4
+    grid.set_cell(2, 0, SHELF)
+    grid.set_cell(2, 1, SHELF)
+    assert cache.distance((0, 0), (4, 0)) == 8
+    grid.set_cell(2, 2, SHELF)
+    assert cache.distance((0, 0), (4, 0)) is None
+
+
+def test_pallet_approach_uses_real_distance():
+    # Стіна полиць у ряду 3 з проходом лише в колонці 0; верхній підхід до палети — глухий кут
+    shelves = {f"S{x}": (x, 3) for x in range(1, 10)}
+    shelves.update(A=(4, 4), B=(6, 4))
+    robot = make_robot(shelves, {1: (5, 5)}, (5, 0))
+    for cell in ((5, 4), (4, 5), (6, 5), (5, 6)):
+        assert robot.distance_fields.covers(cell)
+    # За манхеттенською відстанню найближчим був би недосяжний (5, 4)
+    assert robot.find_approach_position_for_pallet((5, 5)) == (4, 5)
+    assert robot.find_closest_accessible_cell((5, 5)) == (4, 5)
+
+
+def test_shelf_heap_does_not_hold_distance_field():
+    shelves = {"S1": (2, 2), "S2": (2, 7)}
+    robot = make_robot(shelves, {}, (8, 7))
+    shelf = robot.find_free_shelf()
+    assert shelf[1] == "S2"
+    shelf_allocator.release(shelf[0])
+    # Поле від робота — у LRU-кеші полів, а не в замиканні ключа купи
+    fields = get_distance_fields(robot.static_grid)
+    assert robot.static_grid.index(8, 7) in fields._fields
+    _, key, _ = shelf_allocator._heaps[(8, 7)]
+    pending = [key]
+    while pending:
+        function = pending.pop()
+        for cell in function.__closure__ or ():
+            value = cell.cell_contents
+            assert not isinstance(value, (array, list))
+            if callable(value) and hasattr(value, "__closure__"):
+                pending.append(value)
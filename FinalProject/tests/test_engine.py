@@ -0,0 +1,18 @@
+from simulation.engine import simulate_shift
+
+
+def run(seed):
+    positions = {}
+    robots = []
+    result = simulate_shift(15, 0.25, 600, seed=seed, on_start=lambda layout, started: robots.extend(started))
+    for robot in robots:
+        positions[robot.robot_id] = robot.get_current_position()
+    result.pop("wall_seconds")
+    return result, positions
+
+
+def test_same_seed_gives_same_shift():
+    # Друга зміна в тому ж процесі не має бачити позицій, резервувань і маршрутів першої
+    first = run(5)
+    assert first[0]["trips"] > 0
+    assert run(5) == first
@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from logic.distance_fields import get_distance_fields
+from logic.fleet_planner import plan_fleet, plan_prioritized, reserve_fleet_plan
+from logic.grid import FREE, SHELF, StaticGrid
+from logic.reservations import ReservationTable, find_conflicts
+
+
+def check_plan(grid, agents, plan):
+    """Маршрути йдуть сусідніми вільними клітинками від старту до цілі й не конфліктують"""
+    timed = {}
+    for robot_id, start, goal in agents:
+        path = plan["paths"][robot_id]
+        assert path[0] == start and path[-1] == goal
+        for (x, y), (nx, ny) in zip(path, path[1:]):
+            assert abs(x - nx) + abs(y - ny) <= 1
+            assert grid.cells[grid.index(nx, ny)] == FREE
+        timed[robot_id] = [(grid.index(*cell), t) for t, cell in enumerate(path)]
+    assert find_conflicts(timed) == []
+
+
+def test_swap_in_corridor_with_bay():
+    # Коридор 5 × 1 з нішею під серединою: зустрічним роботам треба розминутися
+    grid = StaticGrid(5, 2)
+    for x in (0, 1, 3, 4):
+        grid.set_cell(x, 1, SHELF)
+    agents = [(1, (0, 0), (4, 0)), (2, (4, 0), (0, 0))]
+    plan = plan_fleet(grid, agents)
+    assert plan["method"] == "cbs" and not plan["failed"]
+    check_plan(grid, agents, plan)
+    assert plan["sum_of_costs"] == 11  # один чекає такт (5), інший заїжджає в нішу (6)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_fleets_are_conflict_free(seed):
+    rng = random.Random(seed)
+    grid = StaticGrid(10, 10)
+    for index in range(100):
+        if rng.random() < 0.15:
+            grid.set_cell(index % 10, index // 10, SHELF)
+    free = [grid.coords(index) for index in range(100) if grid.cells[index] == FREE]
+    # Лише пари, що лежать в одній компоненті зв'язності, щоб кожна ціль була досяжна
+    fields = get_distance_fields(grid)
+    starts = rng.sample(free, 6)
+    goals = []
+    for start in starts:
+        field = fields.field(start)
+        options = [cell for cell in free if field[grid.index(*cell)] >= 0 and cell not in goals]
+        goals.append(rng.choice(options))
+    agents = [(robot_id, start, goal) for robot_id, (start, goal) in enumerate(zip(starts, goals), 1)]
+
+    plan = plan_fleet(grid, agents, time_budget=5.0)
+    assert not plan["failed"]
+    check_plan(grid, agents, plan)
+    prioritized = plan_prioritized(grid, agents)
+    if plan["method"] == "cbs" and not prioritized["failed"]:
+        assert plan["sum_of_costs"] <= prioritized["sum_of_costs"]
+
+
+def test_reserved_plan_blocks_other_robots():
+    grid = StaticGrid(5, 1)
+    plan = plan_fleet(grid, [(1, (0, 0), (4, 0))])
+    table = ReservationTable()
+    assert reserve_fleet_plan(table, grid, plan, 10) == [1]
+    assert not table.is_free(grid.index(2, 0), 12, 2)
+    assert table.is_free(grid.index(2, 0), 12, 1)
@@ -0,0 +1,98 @@
+import random
+
+import pytest
+
+from logic.grid import FREE, SHELF, StaticGrid
+from logic.hierarchy import HierarchicalPlanner
+from logic.navigator import GridPlanner
+
+
+def is_valid(grid, start, goal, path, blocked=()):
+    """Шлях іде сусідніми клітинками, не крізь полиці й заблоковані клітинки (ціль — можна)"""
+    previous = start
+    for x, y in path:
+        if abs(x - previous[0]) + abs(y - previous[1]) != 1:
+            return False
+        if (x, y) != goal and (grid.is_blocked(x, y) or grid.index(x, y) in blocked):
+            return False
+        previous = (x, y)
+    return not path or previous == goal
+
+
+def random_grid(rng, max_side=14):
+    grid = StaticGrid(rng.randint(1, max_side), rng.randint(1, max_side))
+    for index in range(grid.width * grid.height):
+        if rng.random() < 0.25:
+            grid.set_cell(index % grid.width, index // grid.width, SHELF)
+    return grid
+
+
+def random_queries(rng, grid, count):
+    for _ in range(count):
+        start = (rng.randrange(grid.width), rng.randrange(grid.height))
+        goal = (rng.randrange(grid.width), rng.randrange(grid.height))
+        if not grid.is_blocked(*start):
+            yield start, goal
+
+
+def test_single_cluster_column():
+    # Сітка не ширша за кластер: нижній сусід кластера має номер a + 1
+    grid = StaticGrid(2, 3)
+    grid.set_cell(0, 2, SHELF)
+    path = HierarchicalPlanner(grid, 2).find_path((0, 1), (1, 2))
+    assert path == GridPlanner(grid).find_path((0, 1), (1, 2))
+
+
+def test_goal_shelf_entered_from_neighbour_cluster():
+    grid = StaticGrid(3, 9)
+    for x, y in ((2, 0), (0, 1), (1, 2), (1, 3), (2, 3), (0, 4), (1, 4), (2, 4), (1, 7), (1, 8), (2, 8)):
+        grid.set_cell(x, y, SHELF)
+    path = HierarchicalPlanner(grid, 2).find_path((1, 0), (1, 2))
+    assert path == [(1, 1), (1, 2)]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_matches_a_star_on_random_grids(seed):
+    rng = random.Random(seed)
+    longer = 0
+    queries = 0
+    for _ in range(300):
+        grid = random_grid(rng)
+        hierarchy = HierarchicalPlanner(grid, rng.randint(2, 5))
+        planner = GridPlanner(grid)
+        for start, goal in random_queries(rng, grid, 4):
+            expected = planner.find_path(start, goal)
+            path = hierarchy.find_path(start, goal)
+            assert bool(path) == bool(expected), (grid.width, grid.height, start, goal)
+            assert is_valid(grid, start, goal, path)
+            assert len(path) >= len(expected)
+            longer += len(path) > len(expected)
+            queries += 1
+    assert longer <= queries * 0.02
+
+
+def test_repair_avoids_blocked_cells():
+    rng = random.Random(7)
+    for _ in range(200):
+        grid = random_grid(rng)
+        hierarchy = HierarchicalPlanner(grid, 3)
+        planner = GridPlanner(grid)
+        for start, goal in random_queries(rng, grid, 3):
+            blocked = {index for index in range(grid.width * grid.height)
+                       if rng.random() < 0.1 and index not in (grid.index(*start), grid.index(*goal))}
+            path = hierarchy.repair(start, hierarchy.find_path(start, goal), blocked, planner)
+            assert bool(path) == bool(planner.find_path(start, goal, blocked))
+            assert is_valid(grid, start, goal, path, blocked)
+
+
+def test_layout_changes_are_picked_up():
+    rng = random.Random(11)
+    for _ in range(200):
+        grid = random_grid(rng)
+        hierarchy = HierarchicalPlanner(grid, rng.randint(2, 5))
+        planner = GridPlanner(grid)
+        for _ in range(3):
+            for _ in range(3):
+                grid.set_cell(rng.randrange(grid.width), rng.randrange(grid.height), rng.choice((SHELF, FREE)))
+            for start, goal in random_queries(rng, grid, 2):
+                assert bool(hierarchy.find_path(start, goal)) == bool(planner.find_path(start, goal))
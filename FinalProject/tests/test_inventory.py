@@ -0,0 +1,72 @@
+from db.backends import SqliteBackend, seed_demo_data
+from db.connection import db_connection, use_backend
+from db.inventory import InventoryIndex
+
+
+def make_warehouse():
+    # Дві палети з товаром 1 по 5 одиниць: палета 1 — у (0, 0), палета 2 — у (5, 0)
+    use_backend(SqliteBackend(":memory:", seed=lambda conn: seed_demo_data(
+        conn, {}, {1: (0, 0), 2: (5, 0)}, [], items=["A"], pallet_stock=5,
+    )))
+
+
+def db_totals():
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT location_id, SUM(quantity) FROM inventory WHERE location_type = 'pallet' "
+                       "GROUP BY location_id")
+        return dict(cursor.fetchall())
+
+
+def test_take_and_put_back_keep_index_and_db_in_step():
+    make_warehouse()
+    index = InventoryIndex()
+    assert index.pallets(1) == [(1, 5, 0, 0), (2, 5, 5, 0)]
+    assert index.take(1, 1, 3) == 3
+    assert index.take(1, 1, 9) == 2  # більше, ніж лежить, не взяти
+    assert index.pallet_totals() == db_totals() == {2: 5}
+    assert index.pallets(1) == [(2, 5, 5, 0)]
+    # Рядок спорожнілої палети видалено — put_back створює його заново
+    index.put_back(1, 1, 4, 0, 0)
+    assert index.pallet_totals() == db_totals() == {1: 4, 2: 5}
+    assert sorted(index.item_cells()[1]) == [(0, 0), (5, 0)]
+
+
+def test_reservations_hide_stock_from_other_robots():
+    make_warehouse()
+    index = InventoryIndex()
+    assert index.reserve("r1", 1, 1, 4) == 4
+    assert index.pallets(1, 2) == [(2, 5, 5, 0)]
+    assert index.pallets(1, 2, owner="r1") == [(1, 5, 0, 0), (2, 5, 5, 0)]
+    assert index.take(1, 1, 5, owner="r2") == 1
+    index.release("r1")
+    assert index.pallets(1, 4) == [(1, 4, 0, 0), (2, 5, 5, 0)]
+
+
+def test_reserve_many_then_batch_write():
+    make_warehouse()
+    index = InventoryIndex()
+    plan = index.reserve_many("r1", [(1, 7), (1, 4)])
+    assert [sum(quantity for _, quantity in parts) for parts, _ in plan] == [7, 3]
+    assert [short for _, short in plan] == [0, 1]
+    assert index.pallets(1) == []
+    taken = [part for parts, _ in plan for part in parts]
+    with db_connection() as conn:
+        index.write_taken_many(conn.cursor(), taken)
+        conn.commit()
+    index.apply_taken(taken, owner="r1")
+    assert index.pallet_totals() == db_totals() == {}
+
+
+def test_reload_after_backend_switch_or_invalidate():
+    make_warehouse()
+    index = InventoryIndex()
+    assert index.pallet_totals() == {1: 5, 2: 5}
+    with db_connection() as conn:
+        conn.execute("UPDATE inventory SET quantity = 1 WHERE location_id = 1")
+        conn.commit()
+    assert index.pallet_totals() == {1: 5, 2: 5}  # зміна в обхід індексу
+    index.invalidate()
+    assert index.pallet_totals() == {1: 1, 2: 5}
+    make_warehouse()
+    assert index.pallet_totals() == {1: 5, 2: 5}
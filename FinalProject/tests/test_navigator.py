@@ -0,0 +1,111 @@
+import random
+from collections import deque
+
+import pytest
+
+from logic.grid import FREE, SHELF, StaticGrid
+from logic.navigator import GridPlanner
+from logic.reservations import ReservationTable
+
+
+def bfs_length(grid, start, goal, blocked):
+    """Довжина найкоротшого шляху в 4 напрямках (ціль прохідна) або None"""
+    width = grid.width
+    s, g = grid.index(*start), grid.index(*goal)
+    seen = {s: 0}
+    queue = deque([s])
+    while queue:
+        current = queue.popleft()
+        if current == g:
+            return seen[current]
+        x, y = current % width, current // width
+        for nx, ny in ((x, y - 1), (x + 1, y), (x, y + 1), (x - 1, y)):
+            if not grid.in_bounds(nx, ny):
+                continue
+            nxt = grid.index(nx, ny)
+            if nxt in seen or nxt != g and (grid.cells[nxt] != FREE or nxt in blocked):
+                continue
+            seen[nxt] = seen[current] + 1
+            queue.append(nxt)
+    return None
+
+
+def is_valid(grid, start, goal, path, blocked):
+    previous = start
+    for x, y in path:
+        if abs(x - previous[0]) + abs(y - previous[1]) != 1:
+            return False
+        if (x, y) != goal and (grid.cells[grid.index(x, y)] != FREE or grid.index(x, y) in blocked):
+            return False
+        previous = (x, y)
+    return previous == goal
+
+
+def random_case(rng):
+    grid = StaticGrid(rng.randint(2, 20), rng.randint(2, 20))
+    for index in range(grid.width * grid.height):
+        if rng.random() < 0.25:
+            grid.set_cell(index % grid.width, index // grid.width, SHELF)
+    free = [grid.coords(index) for index, kind in enumerate(grid.cells) if kind == FREE]
+    blocked = {grid.index(*cell) for cell in rng.sample(free, len(free) // 10)}
+    return grid, free, blocked
+
+
+@pytest.mark.parametrize("algorithm", ["a_star", "dijkstra", "jps"])
+def test_paths_are_shortest(algorithm):
+    rng = random.Random(7)
+    for _ in range(40):
+        grid, free, blocked = random_case(rng)
+        planner = GridPlanner(grid)  # буфери перевикористовуються між запитами
+        for _ in range(20):
+            start, goal = rng.choice(free), rng.choice(free)
+            path = planner.find_path(start, goal, blocked, algorithm=algorithm)
+            best = bfs_length(grid, start, goal, blocked - {grid.index(*start)})
+            if start == goal or best is None:
+                assert path == []
+            else:
+                assert len(path) == best
+                assert is_valid(grid, start, goal, path, blocked)
+
+
+def test_jps_sees_layout_changes():
+    # Карта з рамкою для JPS кешується за версією — нова полиця має її скинути
+    grid = StaticGrid(5, 3)
+    planner = GridPlanner(grid)
+    assert len(planner.find_path((0, 1), (4, 1), algorithm="jps")) == 4
+    for y in range(2):
+        grid.set_cell(2, y, SHELF)
+    path = planner.find_path((0, 1), (4, 1), algorithm="jps")
+    assert len(path) == 6 and is_valid(grid, (0, 1), (4, 1), path, set())
+    grid.set_cell(2, 2, SHELF)
+    assert planner.find_path((0, 1), (4, 1), algorithm="jps") == []
+
+
+def test_goal_on_shelf_is_reachable():
+    grid = StaticGrid(3, 1)
+    grid.set_cell(2, 0, SHELF)
+    assert GridPlanner(grid).find_path((0, 0), (2, 0)) == [(1, 0), (2, 0)]
+
+
+def test_planner_follows_grid_resize():
+    grid = StaticGrid(3, 3)
+    planner = GridPlanner(grid)
+    assert len(planner.find_path((0, 0), (2, 2))) == 4
+    planner.grid = StaticGrid(6, 6)
+    assert len(planner.find_path((0, 0), (5, 5))) == 10
+
+
+def test_timed_path_waits_for_reserved_cell():
+    # Коридор у ряду 0 і ніша (1, 1): інший робот стоїть у (1, 0) до такту 2, потім з'їжджає в нішу
+    grid = StaticGrid(3, 2)
+    grid.set_cell(0, 1, SHELF)
+    grid.set_cell(2, 1, SHELF)
+    table = ReservationTable()
+    middle, bay = grid.index(1, 0), grid.index(1, 1)
+    table.reserve_path(2, [(middle, 0), (middle, 1), (middle, 2), (bay, 3)])
+    path = GridPlanner(grid).find_timed_path((0, 0), (2, 0), 0, table, 1)
+    assert path == [((0, 0), 0), ((0, 0), 1), ((0, 0), 2), ((1, 0), 3), ((2, 0), 4)]
+
+    # У цілі стоїть інший робот — жоден розклад не допоможе
+    table.park(3, grid.index(2, 0), 0)
+    assert GridPlanner(grid).find_timed_path((0, 0), (2, 0), 0, table, 1) == []
@@ -0,0 +1,41 @@
+from db.backends import SqliteBackend, seed_demo_data
+from db.connection import use_backend
+from logic.grid import StaticGrid
+from logic.path_cache import PathCache, get_path_cache
+from logic.robot import RobotNavigator
+
+
+def test_lru_eviction_and_blocked_lookup():
+    cache = PathCache(max_size=2)
+    cache.put((0, 0), (0, 2), 0, [(0, 1), (0, 2)])
+    cache.put((0, 0), (2, 0), 0, [(1, 0), (2, 0)])
+    assert cache.get((0, 0), (0, 2), 0) == [(0, 1), (0, 2)]
+    cache.put((1, 1), (1, 2), 0, [(1, 2)])  # витісняє найдавніше використаний (0, 0) -> (2, 0)
+    assert cache.get((0, 0), (2, 0), 0) is None
+    assert cache.get((0, 0), (0, 2), 1) is None  # інша версія планування
+    assert cache.get((0, 0), (0, 2), 0, lambda cell: cell == (0, 1)) is None
+    # Ціль не перевіряється на зайнятість
+    assert cache.get((0, 0), (0, 2), 0, lambda cell: cell == (0, 2)) == [(0, 1), (0, 2)]
+    stats = cache.stats()
+    assert (stats["evictions"], stats["blocked"]) == (1, 1)
+
+
+def test_one_cache_per_grid():
+    first, second = StaticGrid(5, 5), StaticGrid(5, 5)
+    assert get_path_cache(first) is get_path_cache(first)
+    assert get_path_cache(first) is not get_path_cache(second)
+
+
+def test_second_layout_does_not_reuse_first_layouts_routes():
+    width = height = 30
+    wall = {f"W{y}": (10, y) for y in range(1, height)}  # стіна полиць у колонці 10, прохід лише в ряду 0
+    use_backend(SqliteBackend(":memory:", seed=lambda conn: seed_demo_data(
+        conn, {}, {}, [1, 2], robot_positions=[(9, 20), (9, 20)],
+    )))
+    open_robot = RobotNavigator(1, width, height, {}, {}, (0, 0))
+    walled_robot = RobotNavigator(2, width, height, wall, {}, (0, 0))
+    assert open_robot.find_path((9, 20), (11, 20)) == [(10, 20), (11, 20)]
+
+    path = walled_robot.find_path((9, 20), (11, 20))
+    assert path and all(cell not in wall.values() for cell in path)
+    assert len(path) == 2 + 2 * 20
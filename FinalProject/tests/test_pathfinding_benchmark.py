@@ -0,0 +1,18 @@
+import config
+from logic.grid import StaticGrid
+from logic.hierarchy import HierarchicalPlanner
+from simulation.pathfinding_benchmark import run_planner
+
+
+def test_hpa_expansions_are_counted_per_query():
+    grid = StaticGrid(30, 1)
+    blocked = {grid.index(15, 0)}
+    # Перший запит упирається в робота (repair шукає об'їзд), другий його не зачіпає
+    pairs = [((0, 0), (29, 0)), ((0, 0), (10, 0)), ((3, 0), (3, 0))]
+    run = run_planner("hpa", grid, pairs, blocked, repeat=1, warmup=0)
+    assert run["paths"][0] == []
+
+    fresh = HierarchicalPlanner(grid, config.HPA_CLUSTER_SIZE)
+    fresh.find_path(*pairs[1])
+    assert run["expansions"][1] == fresh.expansions
+    assert run["expansions"][2] == 0
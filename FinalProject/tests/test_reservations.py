@@ -0,0 +1,45 @@
+from logic.reservations import ReservationTable, find_conflicts
+
+
+def test_reserved_path_blocks_cells_and_swaps():
+    table = ReservationTable()
+    assert table.reserve_path(1, [(0, 0), (1, 1), (2, 2)])
+    assert not table.is_free(1, 1, 2)
+    assert table.is_free(1, 1, 1)
+    # Зустрічний обмін клітинками 0 <-> 1 між тактами 0 і 1
+    assert not table.can_move(1, 0, 0, 2)
+    # Робот 1 стоїть у кінцевій клітинці назавжди
+    assert not table.is_free(2, 100, 2)
+    assert not table.reserve_path(2, [(3, 0), (2, 1), (2, 2)])
+
+
+def test_release_frees_everything():
+    table = ReservationTable()
+    table.reserve_path(1, [(0, 0), (1, 1)])
+    table.release(1)
+    assert table.is_free(0, 0, 2) and table.is_free(1, 5, 2)
+    assert table.can_park(1, 0, 2)
+    assert table.path_of(1) == []
+
+
+def test_prune_forgets_past_ticks_but_keeps_parking():
+    table = ReservationTable()
+    table.reserve_path(1, [(0, 0), (1, 1), (2, 2), (3, 3)])
+    table.prune(2)
+    assert table.path_of(1) == [(2, 2), (3, 3)]
+    assert table.is_free(0, 0, 2) and table.is_free(1, 1, 2)
+    assert not table.is_free(2, 2, 2)
+    assert table._last_visit.keys() == {2, 3}
+    table.prune(10)
+    assert table.path_of(1) == [(3, 3)]
+    assert table.parked_by(3) == 1
+    table.release(1)
+    assert not table._cells and not table._edges and not table._parked and not table._last_visit
+
+
+def test_find_conflicts():
+    assert find_conflicts({1: [(0, 0), (1, 1)], 2: [(2, 0), (1, 1)]}) == [("vertex", 1, 2, 1, 1)]
+    assert find_conflicts({1: [(0, 0), (1, 1)], 2: [(1, 0), (0, 1)]}) == [("edge", 1, 2, (1, 0), 0)]
+    # Агент, що вже приїхав, стоїть у цілі
+    assert find_conflicts({1: [(5, 0)], 2: [(4, 0), (5, 1)]}) == [("vertex", 1, 2, 5, 1)]
+    assert find_conflicts({1: [(0, 0), (1, 1)], 2: [(2, 0), (3, 1)]}) == []
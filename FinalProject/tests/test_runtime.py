@@ -0,0 +1,70 @@
+import asyncio
+import threading
+import time
+
+from logic.runtime import FleetRuntime, run_fleet
+
+
+class FakeRobot:
+    """Робот, чиї кроки лише рахуються (замість RobotNavigator.run_steps)"""
+
+    def __init__(self, robot_id, wait=0.01, steps=None, crash_at=None):
+        self.robot_id = robot_id
+        self.wait = wait
+        self.limit = steps
+        self.crash_at = crash_at
+        self.steps = 0
+        self.closed = False
+        self.threads = set()
+
+    def run_steps(self):
+        try:
+            while self.limit is None or self.steps < self.limit:
+                self.steps += 1
+                self.threads.add(threading.current_thread().name)
+                if self.steps == self.crash_at:
+                    raise RuntimeError("поломка")
+                yield self.wait
+        finally:
+            self.closed = True
+
+
+def test_fleet_shares_a_few_threads():
+    robots = [FakeRobot(robot_id) for robot_id in range(200)]
+    started = time.perf_counter()
+    run_fleet(robots, duration=0.3, max_workers=4)
+    assert time.perf_counter() - started < 5
+    threads = set().union(*(robot.threads for robot in robots))
+    assert len(threads) <= 4 and all(name.startswith("fleet") for name in threads)
+    assert all(robot.steps >= 2 and robot.closed for robot in robots)
+
+
+def test_finished_and_crashed_robots_do_not_stop_the_fleet():
+    finished = FakeRobot(1, steps=3)
+    crashed = FakeRobot(2, crash_at=2)
+    working = FakeRobot(3)
+    run_fleet([finished, crashed, working], duration=0.2, max_workers=2)
+    assert finished.steps == 3 and finished.closed
+    assert crashed.steps == 2
+    assert working.steps > 5 and working.closed
+
+
+def test_stop_from_another_thread_and_late_robots():
+    runtime = FleetRuntime(max_workers=2)
+    first = FakeRobot(1)
+    runtime.add_robot(first)
+    late = FakeRobot(2)
+
+    def control():
+        time.sleep(0.1)
+        runtime.add_robot(late)
+        time.sleep(0.1)
+        runtime.stop()
+
+    controller = threading.Thread(target=control)
+    controller.start()
+    started = time.perf_counter()
+    asyncio.run(runtime.run(duration=10))
+    controller.join()
+    assert time.perf_counter() - started < 5
+    assert first.closed and late.closed and late.steps > 0
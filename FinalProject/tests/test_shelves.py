@@ -0,0 +1,53 @@
+from db.backends import SqliteBackend, seed_demo_data
+from db.connection import db_connection, use_backend
+from db.shelves import ShelfAllocator
+
+SHELVES = {"S1": (0, 0), "S2": (5, 0), "S3": (9, 0)}
+
+
+def make_warehouse():
+    use_backend(SqliteBackend(":memory:", seed=lambda conn: seed_demo_data(conn, SHELVES, {}, [])))
+
+
+def distance(near, cell):
+    return abs(near[0] - cell[0]) + abs(near[1] - cell[1])
+
+
+def test_nearest_free_shelf_is_handed_out_once():
+    make_warehouse()
+    shelves = ShelfAllocator()
+    assert shelves.allocate("r1", near=(8, 0), distance=distance)[1] == "S3"
+    assert shelves.allocate("r2", near=(8, 0), distance=distance)[1] == "S2"
+    assert shelves.allocate("r3", near=(8, 0), distance=distance, exclude={1}) is None  # лишилась лише S1
+    assert shelves.allocate("r3", near=(8, 0), distance=distance)[1] == "S1"
+    assert shelves.free_count() == 0
+
+
+def test_released_and_freed_shelves_come_back():
+    make_warehouse()
+    shelves = ShelfAllocator()
+    first = shelves.allocate("r1", near=(0, 0), distance=distance)
+    second = shelves.allocate("r1", near=(0, 0), distance=distance)
+    assert (first[1], second[1]) == ("S1", "S2")
+    shelves.commit(first[0])
+    shelves.release_owner("r1")  # S2 так і не записали — повертається
+    assert shelves.statuses() == {"S1": "busy", "S2": "free", "S3": "free"}
+    assert shelves.allocate("r2", near=(0, 0), distance=distance)[1] == "S2"
+    shelves.free(first[0])
+    assert shelves.allocate("r2", near=(0, 0), distance=distance)[1] == "S1"
+    assert shelves.allocate("r2")[1] == "S3"  # без near — найменший id
+    assert shelves.allocate("r2") is None
+
+
+def test_reload_after_backend_switch_or_invalidate():
+    make_warehouse()
+    shelves = ShelfAllocator()
+    assert shelves.free_count() == 3
+    with db_connection() as conn:
+        conn.execute("UPDATE shelves SET status = 'busy' WHERE shelf_code = 'S1'")
+        conn.commit()
+    assert shelves.free_count() == 3  # зміна в обхід алокатора
+    shelves.invalidate()
+    assert shelves.allocate("r1", near=(0, 0), distance=distance)[1] == "S2"
+    make_warehouse()
+    assert shelves.free_count() == 3
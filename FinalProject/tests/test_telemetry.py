@@ -0,0 +1,67 @@
+from db.backends import SqliteBackend, seed_demo_data
+from db.connection import db_connection, use_backend
+from db.telemetry import TelemetryBuffer
+
+
+def robot_row(robot_id):
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT x, y, battery, status FROM robots WHERE id = ?", (robot_id,))
+        return tuple(cursor.fetchone())
+
+
+def rename_robots(old, new):
+    with db_connection() as conn:
+        conn.execute(f"ALTER TABLE {old} RENAME TO {new}")
+        conn.commit()
+
+
+def test_writes_are_batched_until_flush():
+    use_backend(SqliteBackend(":memory:", seed=lambda conn: seed_demo_data(
+        conn, {}, {}, [1, 2], robot_positions=[(0, 0), (1, 1)],
+    )))
+    buffer = TelemetryBuffer(flush_interval=3600, max_pending=100)
+    try:
+        buffer.record(1, position=(3, 4))
+        buffer.record(1, position=(5, 6), battery=80)
+        buffer.record(2, status="moving")
+        assert buffer.latest(1, "position") == (5, 6)
+        assert robot_row(1) == (0, 0, 100, "idle")  # у БД — ще нічого
+        assert buffer.flush() == 2
+        assert robot_row(1) == (5, 6, 80, "idle")
+        assert robot_row(2) == (1, 1, 100, "moving")
+        assert buffer.flush() == 0
+    finally:
+        buffer.close()
+
+
+def test_failed_flush_keeps_changes_without_overwriting_newer_ones():
+    use_backend(SqliteBackend(":memory:", seed=lambda conn: seed_demo_data(
+        conn, {}, {}, [1], robot_positions=[(0, 0)],
+    )))
+    buffer = TelemetryBuffer(flush_interval=3600, max_pending=100)
+    try:
+        buffer.record(1, position=(2, 2), battery=50)
+        rename_robots("robots", "robots_away")
+        assert buffer.flush() == 0
+        buffer.record(1, battery=40)
+        rename_robots("robots_away", "robots")
+        assert buffer.flush() == 1
+        assert robot_row(1)[:3] == (2, 2, 40)
+    finally:
+        buffer.close()
+
+
+def test_reset_and_forget():
+    buffer = TelemetryBuffer(flush_interval=3600)
+    try:
+        buffer.record(1, position=(1, 1))
+        buffer.record(2, position=(2, 2))
+        buffer.forget(1)
+        assert buffer.latest(1, "position") is None
+        assert buffer.latest(2, "position") == (2, 2)
+        buffer.reset()
+        assert buffer.latest(2, "position") is None
+        assert buffer.flush() == 0
+    finally:
+        buffer.close()
@@ -0,0 +1,101 @@
+from simulation.visual import PALLET_FULL, SHELF_COLORS, WarehouseCanvas
+
+LAYOUT = {
+    "grid_width": 4, "grid_height": 3,
+    "shelf_coords": {"A1": (0, 0), "A2": (0, 1)},
+    "pallet_coords": {1: (3, 0)},
+    "charging_stations": [(3, 2)],
+}
+
+
+class FakeCanvas:
+    """Записує виклики замість tk.Canvas (у тестах немає дисплея)"""
+
+    def __init__(self):
+        self.items = {}
+        self.calls = []
+        self.scheduled = []
+        self._next = 0
+
+    def _create(self, kind, *coords, **options):
+        self._next += 1
+        self.items[self._next] = (kind, list(coords), options)
+        self.calls.append(("create", kind))
+        return self._next
+
+    def create_line(self, *coords, **options):
+        return self._create("line", *coords, **options)
+
+    def create_text(self, *coords, **options):
+        return self._create("text", *coords, **options)
+
+    def create_rectangle(self, *coords, **options):
+        return self._create("rectangle", *coords, **options)
+
+    def create_oval(self, *coords, **options):
+        return self._create("oval", *coords, **options)
+
+    def itemconfigure(self, item, **options):
+        self.items[item][2].update(options)
+        self.calls.append(("configure", item))
+
+    def coords(self, item, *coords):
+        self.items[item][1][:] = coords
+        self.calls.append(("coords", item))
+
+    def delete(self, item):
+        del self.items[item]
+        self.calls.append(("delete", item))
+
+    def after(self, delay, callback):
+        self.scheduled.append(callback)
+
+    def tag_raise(self, tag):
+        pass
+
+    def configure(self, **options):
+        pass
+
+    def run_frames(self):
+        while self.scheduled:
+            self.scheduled.pop(0)()
+
+
+def make_map(**options):
+    canvas = FakeCanvas()
+    view = WarehouseCanvas(canvas, LAYOUT, cell_size=10, **options)
+    canvas.calls.clear()
+    return canvas, view
+
+
+def test_only_changed_cells_are_repainted():
+    canvas, view = make_map()
+    view.set_shelves({"A1": "free", "A2": "busy"})
+    assert len(canvas.calls) == 1
+    assert canvas.items[canvas.calls[0][1]][2]["fill"] == SHELF_COLORS["busy"]
+    view.set_shelves({"A1": "free", "A2": "busy", "ZZ": "busy"})
+    view.set_pallets({1: ("P1", "Товар 1", 5)})
+    assert len(canvas.calls) == 4  # прямокутник, підпис і вміст палети
+    view.set_pallets({1: ("P1", "Товар 1", 5)})
+    assert len(canvas.calls) == 4
+    assert canvas.items[canvas.calls[1][1]][2]["fill"] == PALLET_FULL
+
+
+def test_robots_are_moved_not_recreated():
+    canvas, view = make_map(animation_ms=0)
+    view.set_robots([(1, "R1", 1, 1), (2, "R2", 2, 1)])
+    assert [call for call in canvas.calls if call[0] == "create"] == [("create", "oval"), ("create", "text")] * 2
+    canvas.calls.clear()
+
+    view.set_robots([(1, "R1", 1, 2), (2, "R2", 2, 1)])
+    view.move_robot(1, "R1", 2, 2)
+    assert len(canvas.scheduled) == 1  # один цикл анімації на всі рухи
+    canvas.run_frames()
+    assert all(call[0] == "coords" for call in canvas.calls)
+    ovals = [coords for kind, coords, options in canvas.items.values() if kind == "oval" and options["tags"] == "robot"]
+    assert ovals[0] == [15, 15, 35, 35]  # центр клітинки (2, 2) ± радіус
+
+    canvas.calls.clear()
+    view.set_robots([(2, "R2", 2, 1)])
+    assert [call[0] for call in canvas.calls] == ["delete", "delete"]
+    assert not canvas.scheduled
@@ -0,0 +1,34 @@
+from collections import Counter
+
+from logic.waves import plan_trips
+
+CELLS = {1: (0, 0), 2: (0, 1), 3: (9, 9), 4: (0, 2)}
+
+
+def totals(lines):
+    counts = Counter()
+    for order_id, item_id, quantity in lines:
+        counts[order_id, item_id] += quantity
+    return counts
+
+
+def test_trips_carry_every_line_within_capacity():
+    lines = [(1, 1, 9), (1, 2, 2), (2, 3, 4), (3, 4, 1), (3, 1, 5)]
+    trips = plan_trips(lines, 6, CELLS.get)
+    assert all(sum(quantity for _, _, quantity in trip) <= 6 for trip in trips)
+    assert totals(part for trip in trips for part in trip) == totals(lines)
+    assert len(trips) == 4  # 21 одиниця по 6 — не менше 4 рейсів
+
+
+def test_same_order_and_nearby_pallets_go_together():
+    # Рядок того самого замовлення — у той самий рейс, навіть якщо його палета далі
+    trips = plan_trips([(1, 1, 3), (2, 2, 2), (1, 3, 2)], 6, CELLS.get)
+    assert trips[0] == [(1, 1, 3), (1, 3, 2)]
+    # Серед чужих замовлень — найближча палета
+    trips = plan_trips([(1, 1, 3), (2, 3, 2), (3, 2, 2)], 6, CELLS.get)
+    assert trips[0] == [(1, 1, 3), (3, 2, 2)]
+
+
+def test_unknown_pallets_and_empty_input():
+    assert plan_trips([], 6, CELLS.get) == []
+    assert plan_trips([(1, 99, 2), (2, 98, 3)], 6, lambda item_id: None) == [[(2, 98, 3), (1, 99, 2)]]